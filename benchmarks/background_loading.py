@@ -0,0 +1,86 @@
+"""
+How long the UI waits for a score, loaded in the foreground or with ScoreLoader.
+
+For synthetic piano scores of increasing length, uncached, with the
+streaming parser: the foreground parse time (how long the window used to
+freeze), then with ScoreLoader the time to the first batch of moments (when
+the first systems can be drawn), the time to the whole score, and the
+longest gap a 60 fps loop on the main thread saw while the worker parsed.
+Last, the time from cancel() to the worker stopping, halfway through a load.
+
+Run from the repository root:
+    python -m benchmarks.background_loading --measures 500 2000
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from src.parsing.score_loader import ScoreLoader
+from src.parsing.streaming_parser import StreamingMusicXMLParser
+from benchmarks.scores import write_score
+
+FRAME = 1 / 60
+
+
+def background_load(loader: ScoreLoader, path: str) -> dict:
+    started = time.perf_counter()
+    first_batch = []
+    batches = []
+    finished = threading.Event()
+
+    def on_progress(load, fraction, moments):
+        if not first_batch:
+            first_batch.append(time.perf_counter() - started)
+        batches.append(len(moments))
+
+    load = loader.load(path, on_progress=on_progress, on_done=lambda load, sheet_music: finished.set())
+    # Stands in for the Kivy main loop: a frame every 1/60 s, timing how late each one runs.
+    longest_frame = 0.0
+    last = time.perf_counter()
+    while not finished.is_set():
+        time.sleep(FRAME)
+        current = time.perf_counter()
+        longest_frame = max(longest_frame, current - last)
+        last = current
+    return {
+        'first_batch_ms': round(first_batch[0] * 1000, 1) if first_batch else None,
+        'done_ms': round((time.perf_counter() - started) * 1000, 1),
+        'batches': len(batches),
+        'longest_frame_ms': round(longest_frame * 1000, 1),
+        'moments': len(load.result().moments),
+    }
+
+
+def cancel_latency(loader: ScoreLoader, path: str, after: float) -> float:
+    load = loader.load(path)
+    time.sleep(after)
+    cancelled_at = time.perf_counter()
+    loader.cancel()
+    load.result()
+    return time.perf_counter() - cancelled_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--measures', nargs='+', type=int, default=[500, 2000],
+                        help='Lengths of the synthetic scores, in measures.')
+    args = parser.parse_args()
+
+    score_parser = StreamingMusicXMLParser()
+    loader = ScoreLoader(score_parser)
+    with tempfile.TemporaryDirectory() as directory:
+        for measures in args.measures:
+            path = write_score(os.path.join(directory, f"synthetic_{measures}.mxl"), measures)
+            started = time.perf_counter()
+            score_parser.parse(path)
+            foreground = time.perf_counter() - started
+            result = {'file': os.path.basename(path), 'foreground_ms': round(foreground * 1000, 1)}
+            result.update(background_load(loader, path))
+            result['cancel_ms'] = round(cancel_latency(loader, path, foreground / 2) * 1000, 2)
+            print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
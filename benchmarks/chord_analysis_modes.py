@@ -0,0 +1,76 @@
+"""
+Compares ChordDetector's analysis ('chunked' / 'sliding') and verification
+('peaks' / 'templates' / 'constant_q') modes offline.
+
+Run from the repository root:
+    python -m benchmarks.chord_analysis_modes
+"""
+import queue
+import time
+import numpy as np
+
+from src.input.chord_detector import ChordDetector
+from benchmarks.signals import note_to_frequency, piano_tone, with_silence
+
+CHORDS = [
+    {'C4', 'E4', 'G4'},
+    {'G3', 'B3', 'D4'},
+    {'A3', 'C4', 'E4', 'A4'},
+    {'F4', 'A4', 'C5'},
+    {'E2', 'G2', 'B2'},
+    {'A1', 'E2'},
+]
+
+
+def run_mode(analysis_mode: str, hop_size: int, verification_mode: str = 'peaks', decimation_factor: int = 1,
+             detector_class=ChordDetector) -> dict:
+    latencies_ms = []
+    cpu_seconds = 0.0
+    audio_seconds = 0.0
+
+    for chord in CHORDS:
+        kwargs = {'decimation_factor': decimation_factor}
+        if detector_class is ChordDetector:
+            kwargs['verification_mode'] = verification_mode
+        detector = detector_class(queue.Queue(), analysis_mode=analysis_mode, hop_size=hop_size, **kwargs)
+        detector.warm_up()  # Untimed, as in the app: the first run shouldn't pay for FFT planning or imports.
+        detector.set_target_notes(chord)
+        tone = piano_tone([note_to_frequency(n) for n in chord], duration=2.0)
+        signal, onset = with_silence(tone, lead_in=0.5)
+        signal *= detector.INT16_SCALE
+
+        # Feed blocks of the size the live loop reads from the AudioEngine.
+        block_size = len(detector.hop_buffer)
+        confirmed_at = None
+        start = time.process_time()
+        for block_start in range(0, len(signal), block_size):
+            updates = detector.process_samples(signal[block_start:block_start + block_size])
+            if confirmed_at is None and any(u['is_correct'] for u in updates):
+                confirmed_at = block_start + block_size
+        cpu_seconds += time.process_time() - start
+        audio_seconds += len(signal) / detector.CAPTURE_RATE
+
+        if confirmed_at is not None:
+            latencies_ms.append((confirmed_at - onset) * 1000 / detector.CAPTURE_RATE)
+
+    return {
+        'mode': analysis_mode,
+        'hop': hop_size if analysis_mode == 'sliding' else 'n/a',
+        'verification': verification_mode,
+        'decimation': decimation_factor,
+        'confirmed': f"{len(latencies_ms)}/{len(CHORDS)}",
+        'mean_latency_ms': round(float(np.mean(latencies_ms)), 1) if latencies_ms else None,
+        'cpu_ms_per_audio_s': round(cpu_seconds * 1000 / audio_seconds, 2),
+    }
+
+
+def main():
+    results = [run_mode('chunked', 0)] + [run_mode('sliding', hop) for hop in (2048, 1024, 512)]
+    results += [run_mode('chunked', 0, 'templates'), run_mode('sliding', 1024, 'templates')]
+    results += [run_mode('sliding', 1024, 'constant_q')]
+    for result in results:
+        print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
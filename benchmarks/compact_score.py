@@ -0,0 +1,96 @@
+"""
+Memory and speed of CompactScore against the SheetMusic dataclass tree.
+
+For synthetic piano scores of increasing length: the memory each form
+holds (from tracemalloc), the time to load each from a score cache entry,
+the time to walk every note, and the cost of the practice engine's per-tick
+question "which notes does this moment ask for?", answered by walking the
+moment's events (as it used to be) or by looking up the set precomputed
+at load.
+
+Run from the repository root:
+    python -m benchmarks.compact_score --measures 1000 8000
+"""
+import argparse
+import gc
+import io
+import time
+import tracemalloc
+
+from src.core.sheet_music import Chord, Note
+from src.parsing.score_cache import decode_sheet_music, encode_sheet_music
+from src.parsing.streaming_parser import StreamingMusicXMLParser
+from benchmarks.scores import score_xml
+
+LOOKUPS = 100_000
+
+
+def held_bytes(build) -> tuple:
+    """What build() returns, and the bytes it still holds."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held
+
+
+def timed(function, repeats: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def walk_targets(moment) -> set[str]:
+    """The pitch names a moment asks for, found by walking its events."""
+    target_notes = set()
+    for event in moment.events:
+        notes = event.notes if isinstance(event, Chord) else [event] if isinstance(event, Note) else []
+        target_notes.update(note.pitch for note in notes)
+    return target_notes
+
+
+def compare(measures: int) -> dict:
+    parsed = StreamingMusicXMLParser().parse_stream(io.BytesIO(score_xml(measures).encode()))
+    data = encode_sheet_music(parsed)
+    del parsed
+
+    compact, compact_bytes = held_bytes(lambda: decode_sheet_music(data))
+    tree, tree_bytes = held_bytes(compact.to_sheet_music)
+    moments = tree.moments
+    indices = [i % len(moments) for i in range(LOOKUPS)]
+
+    def walk_tree():
+        return sum(len(event.notes) if isinstance(event, Chord) else isinstance(event, Note)
+                   for moment in tree.moments for event in moment.events)
+
+    return {
+        'measures': measures,
+        'moments': len(moments),
+        'notes': len(compact.notes),
+        'tree_mb': round(tree_bytes / 2 ** 20, 2),
+        'compact_mb': round(compact_bytes / 2 ** 20, 2),
+        'tree_load_ms': round(timed(lambda: decode_sheet_music(data).to_sheet_music()) * 1000, 1),
+        'compact_load_ms': round(timed(lambda: decode_sheet_music(data)) * 1000, 1),
+        'tree_walk_ms': round(timed(walk_tree) * 1000, 2),
+        'compact_walk_ms': round(timed(lambda: int((compact.notes['midi'] >= 0).sum())) * 1000, 3),
+        'walk_targets_us': round(timed(lambda: [walk_targets(moments[i]) for i in indices]) / LOOKUPS * 1e6, 3),
+        'precomputed_us': round(timed(lambda: [compact.target_sets[i] for i in indices]) / LOOKUPS * 1e6, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--measures', nargs='+', type=int, default=[1000, 8000],
+                        help='Lengths of the synthetic scores, in measures.')
+    args = parser.parse_args()
+    for measures in args.measures:
+        result = compare(measures)
+        print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures analysis CPU per second of audio with and without the decimating
+front end, for ChordDetector, TranscriptionDetector and MicListener's YIN.
+
+Run from the repository root:
+    python -m benchmarks.decimation
+"""
+import queue
+import time
+
+from src.input.audio_engine import AudioEngine
+from src.input.transcription_detector import TranscriptionDetector
+from benchmarks.chord_analysis_modes import run_mode
+from benchmarks.signals import note_to_frequency, piano_tone
+
+SINGLE_NOTES = ['A1', 'E2', 'C3', 'G3', 'C4', 'A4', 'E5', 'C6', 'G6']
+FACTORS = (1, 2, 4)
+
+
+def run_yin(decimation_factor: int) -> dict:
+    from src.input.mic_listener import MicListener  # Needs aubio.
+
+    correct = 0
+    cpu_seconds = 0.0
+    audio_seconds = 0.0
+    for note in SINGLE_NOTES:
+        listener = MicListener(queue.Queue(), AudioEngine(), decimation_factor=decimation_factor)
+        listener.warm_up()
+        estimator = listener.estimator()
+        signal = piano_tone([note_to_frequency(note)], duration=1.0)
+        block = listener.BUFFER_SIZE * decimation_factor
+        detected = None
+
+        start = time.process_time()
+        for block_start in range(0, len(signal) - block + 1, block):
+            samples = listener.decimator.process(signal[block_start:block_start + block])
+            estimate = estimator.process(samples)
+            if estimate.confidence > listener.CONFIDENCE_THRESHOLD and estimate.notes:
+                detected = estimate.notes[0]
+        cpu_seconds += time.process_time() - start
+        audio_seconds += len(signal) / 44100
+        correct += detected == note
+
+    return {
+        'detector': 'MicListener (yin)',
+        'decimation': decimation_factor,
+        'correct': f"{correct}/{len(SINGLE_NOTES)}",
+        'cpu_ms_per_audio_s': round(cpu_seconds * 1000 / audio_seconds, 2),
+    }
+
+
+def main():
+    results = []
+    for verification_mode in ('peaks', 'templates'):
+        for factor in FACTORS:
+            result = run_mode('sliding', 1024, verification_mode, decimation_factor=factor)
+            results.append({'detector': f"ChordDetector ({verification_mode})", **result})
+    for factor in FACTORS:
+        result = run_mode('sliding', 1024, decimation_factor=factor, detector_class=TranscriptionDetector)
+        results.append({'detector': 'TranscriptionDetector', **result})
+    try:
+        results += [run_yin(factor) for factor in FACTORS]
+    except ImportError:
+        print("aubio is not installed; skipping MicListener.")
+
+    for result in results:
+        print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Latency and accuracy of every detector on a synthesized corpus.
+
+The corpus has single notes and major triads in each register. Each item is
+rendered clean, with white noise at NOISE_SNR_DB, and detuned by DETUNE_CENTS.
+Each item is streamed through each detector in hop-sized blocks, as the live
+loop would deliver it. The suite reports:
+  - time from the note's onset to its confirmation (quantiles per register),
+  - precision and recall per register. Chord detectors are also given a
+    decoy target one semitone off, and confirming it counts as a false
+    positive. For MicListener, a first reported note that isn't the target
+    counts as a false positive.
+  - analysed frames per CPU second and CPU time per frame.
+
+Results go to stdout as a summary and, with --output, to a JSON file for
+comparing versions.
+
+Run from the repository root:
+    python -m benchmarks.detection_suite --output results.json
+"""
+import argparse
+import json
+import platform
+import queue
+import subprocess
+import sys
+import time
+import numpy as np
+
+from src.core.pitch import MIDI_NAMES
+from src.input.audio_engine import AudioEngine
+from src.input.chord_detector import ChordDetector
+from src.input.synth import midi_to_frequency, piano_tone
+from src.input.transcription_detector import TranscriptionDetector
+
+RATE = 44100
+LEAD_IN = 0.3
+NOTE_SECONDS = 1.5
+REGISTERS = {  # Name -> inclusive MIDI range.
+    'A0-B1': (21, 35),
+    'C2-B3': (36, 59),
+    'C4-B5': (60, 83),
+    'C6-C8': (84, 108),
+}
+NOTES_PER_REGISTER = 6
+CHORDS_PER_REGISTER = 4
+NOISE_SNR_DB = 20.0
+DETUNE_CENTS = 20.0
+VARIANTS = ('clean', 'noise', 'detune')
+
+DETECTORS = {
+    'chord-peaks': lambda: ChordDetector(queue.Queue(), verification_mode='peaks'),
+    'chord-templates': lambda: ChordDetector(queue.Queue(), verification_mode='templates'),
+    'chord-constant-q': lambda: ChordDetector(queue.Queue(), verification_mode='constant_q'),
+    'transcription': lambda: TranscriptionDetector(queue.Queue()),
+    'yin': lambda: _mic_listener(),
+}
+
+
+def _mic_listener():
+    from src.input.mic_listener import MicListener  # Needs aubio.
+    return MicListener(queue.Queue(), AudioEngine())
+
+
+def build_corpus(notes_per_register: int = NOTES_PER_REGISTER,
+                 chords_per_register: int = CHORDS_PER_REGISTER) -> list[dict]:
+    """Returns one entry per (register, pitches) with no audio yet."""
+    corpus = []
+    for register, (low, high) in REGISTERS.items():
+        for midi in np.unique(np.linspace(low, high, notes_per_register).round().astype(int)):
+            corpus.append({'register': register, 'kind': 'note', 'midi': [int(midi)]})
+        # Major triads whose root is in the register; the top note may spill over.
+        roots = np.linspace(low, min(high, 108 - 7), chords_per_register).round().astype(int)
+        for root in np.unique(roots):
+            corpus.append({'register': register, 'kind': 'chord', 'midi': [int(root), int(root) + 4, int(root) + 7]})
+    return corpus
+
+
+def render(midi: list[int], variant: str, rng: np.random.Generator) -> np.ndarray:
+    cents = DETUNE_CENTS if variant == 'detune' else 0.0
+    frequencies = [midi_to_frequency(m + cents / 100) for m in midi]
+    tone = piano_tone(frequencies, NOTE_SECONDS, RATE)
+    signal = np.concatenate([np.zeros(int(LEAD_IN * RATE), dtype=np.float32), tone])
+    if variant == 'noise':
+        noise_rms = np.sqrt(np.mean(tone ** 2)) / 10 ** (NOISE_SNR_DB / 20)
+        signal += rng.normal(0, noise_rms, len(signal)).astype(np.float32)
+    return signal
+
+
+def decoy(midi: list[int]) -> list[int]:
+    """The same notes with the top one a semitone higher (lower at the top of the keyboard)."""
+    top = midi[-1] + 1 if midi[-1] < 108 else midi[-1] - 1
+    return midi[:-1] + [top]
+
+
+def stream_chord_detector(detector: ChordDetector, signal: np.ndarray, target: list[int]):
+    """Returns the sample where the target was first confirmed (or None) and per-frame CPU seconds."""
+    detector.reset_analysis()
+    detector.set_target_notes({MIDI_NAMES[m] for m in target})
+    scaled = signal * detector.INT16_SCALE
+    block_size = len(detector.hop_buffer)
+    confirmed_at = None
+    frame_seconds = []
+    for block_start in range(0, len(scaled), block_size):
+        start = time.process_time()
+        updates = detector.process_samples(scaled[block_start:block_start + block_size])
+        elapsed = time.process_time() - start
+        if updates:
+            frame_seconds.extend([elapsed / len(updates)] * len(updates))
+        if confirmed_at is None and any(update['is_correct'] for update in updates):
+            confirmed_at = block_start + block_size
+    return confirmed_at, frame_seconds
+
+
+def stream_mic_listener(listener, signal: np.ndarray, position: int):
+    """Returns the first reported note with its sample (or None, None) and per-frame CPU seconds."""
+    listener.decimator.reset()
+    listener.onset_detector.reset()
+    block_size = listener.BUFFER_SIZE * listener.DECIMATION_FACTOR
+    first_note, reported_at = None, None
+    frame_seconds = []
+    for block_start in range(0, len(signal) - block_size + 1, block_size):
+        start = time.process_time()
+        # Positions keep growing across items, as they would in one long session.
+        note_name = listener.process_buffer(signal[block_start:block_start + block_size], position + block_start)
+        frame_seconds.append(time.process_time() - start)
+        if note_name is not None and first_note is None:
+            first_note, reported_at = note_name, block_start + block_size
+    return first_note, reported_at, frame_seconds
+
+
+def latency_summary(latencies_ms: list[float]) -> dict:
+    if not latencies_ms:
+        return {'count': 0}
+    values = np.array(latencies_ms)
+    return {
+        'count': len(values),
+        'mean_ms': round(float(values.mean()), 1),
+        'p50_ms': round(float(np.percentile(values, 50)), 1),
+        'p90_ms': round(float(np.percentile(values, 90)), 1),
+        'max_ms': round(float(values.max()), 1),
+    }
+
+
+def run_detector(name: str, corpus: list[dict], seed: int = 0) -> dict:
+    detector = DETECTORS[name]()
+    detector.warm_up()  # Untimed, so the first frames don't pay for FFT planning or imports.
+    is_yin = name == 'yin'
+    rng = np.random.default_rng(seed)
+    onset = int(LEAD_IN * RATE)
+    counts = {register: {'positives': 0, 'true_positives': 0, 'false_positives': 0, 'latencies_ms': []}
+              for register in REGISTERS}
+    frame_seconds = []
+    session_position = 0
+
+    for item in corpus:
+        if is_yin and item['kind'] == 'chord':
+            continue  # MicListener is monophonic.
+        for variant in VARIANTS:
+            signal = render(item['midi'], variant, rng)
+            register = counts[item['register']]
+            register['positives'] += 1
+
+            if is_yin:
+                note_name, reported_at, frames = stream_mic_listener(detector, signal, session_position)
+                session_position += len(signal)
+                frame_seconds += frames
+                if note_name == MIDI_NAMES[item['midi'][0]]:
+                    register['true_positives'] += 1
+                    register['latencies_ms'].append((reported_at - onset) * 1000 / RATE)
+                elif note_name is not None:
+                    register['false_positives'] += 1
+                continue
+
+            confirmed_at, frames = stream_chord_detector(detector, signal, item['midi'])
+            frame_seconds += frames
+            if confirmed_at is not None:
+                register['true_positives'] += 1
+                register['latencies_ms'].append((confirmed_at - onset) * 1000 / RATE)
+            decoy_confirmed_at, frames = stream_chord_detector(detector, signal, decoy(item['midi']))
+            frame_seconds += frames
+            if decoy_confirmed_at is not None:
+                register['false_positives'] += 1
+
+    per_register = {}
+    all_latencies = []
+    for register, result in counts.items():
+        reported = result['true_positives'] + result['false_positives']
+        all_latencies += result['latencies_ms']
+        per_register[register] = {
+            'positives': result['positives'],
+            'true_positives': result['true_positives'],
+            'false_positives': result['false_positives'],
+            'precision': round(result['true_positives'] / reported, 3) if reported else None,
+            'recall': round(result['true_positives'] / result['positives'], 3) if result['positives'] else None,
+            'time_to_confirmation': latency_summary(result['latencies_ms']),
+        }
+
+    frame_seconds = np.array(frame_seconds)
+    cpu_seconds = float(frame_seconds.sum())
+    return {
+        'detector': name,
+        'frames': len(frame_seconds),
+        'frames_per_cpu_second': round(len(frame_seconds) / cpu_seconds, 1) if cpu_seconds else None,
+        'cpu_ms_per_frame': {
+            'mean': round(float(frame_seconds.mean()) * 1000, 3) if len(frame_seconds) else None,
+            'p95': round(float(np.percentile(frame_seconds, 95)) * 1000, 3) if len(frame_seconds) else None,
+        },
+        'time_to_confirmation': latency_summary(all_latencies),
+        'registers': per_register,
+    }
+
+
+def environment() -> dict:
+    try:
+        revision = subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        'revision': revision,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--detectors', nargs='+', choices=list(DETECTORS), default=list(DETECTORS))
+    parser.add_argument('--quick', action='store_true', help='Fewer notes and chords per register.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    args = parser.parse_args()
+
+    corpus = build_corpus(3, 2) if args.quick else build_corpus()
+    results = {
+        'environment': environment(),
+        'corpus': {'items': len(corpus), 'variants': list(VARIANTS), 'note_seconds': NOTE_SECONDS,
+                   'noise_snr_db': NOISE_SNR_DB, 'detune_cents': DETUNE_CENTS},
+        'detectors': [],
+    }
+    for name in args.detectors:
+        try:
+            result = run_detector(name, corpus)
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        results['detectors'].append(result)
+        print(f"{name}: frames/s={result['frames_per_cpu_second']}  "
+              f"cpu_ms/frame={result['cpu_ms_per_frame']['mean']}  "
+              f"p50={result['time_to_confirmation'].get('p50_ms')}ms")
+        for register, stats in result['registers'].items():
+            print(f"    {register}: precision={stats['precision']}  recall={stats['recall']}  "
+                  f"p50={stats['time_to_confirmation'].get('p50_ms')}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
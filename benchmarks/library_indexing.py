@@ -0,0 +1,73 @@
+"""
+Time to index a library of scores, serially and with a pool of processes.
+
+A synthetic library of piano scores of mixed length is written to a
+temporary directory and indexed from cold (empty index and score cache)
+with one worker and then with each requested number, then indexed again
+with nothing changed, and again after touching one file and rewriting
+another. Last, the time of a search over the index.
+
+Run from the repository root:
+    python -m benchmarks.library_indexing --files 48 --workers 1 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from src.parsing.score_library import ScoreLibrary
+from benchmarks.scores import write_score
+
+SEARCHES = 1000
+
+
+def timed_update(library: ScoreLibrary, workers: int, cache_directory: str) -> tuple:
+    started = time.perf_counter()
+    counts = library.update(workers=workers, cache_directory=cache_directory)
+    return time.perf_counter() - started, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--files', type=int, default=48, help='Scores in the synthetic library.')
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, os.cpu_count() or 1],
+                        help='Worker process counts to index with from cold.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = os.path.join(directory, 'scores')
+        for index in range(args.files):
+            subdirectory = os.path.join(root, f"book{index % 4}")
+            os.makedirs(subdirectory, exist_ok=True)
+            write_score(os.path.join(subdirectory, f"piece{index}.mxl"), 50 + 25 * (index % 8), seed=index)
+        print(f"files={args.files}  cores={os.cpu_count()}")
+
+        for workers in dict.fromkeys(args.workers):
+            cache_directory = os.path.join(directory, f"cache_{workers}")
+            index_path = os.path.join(directory, f"index_{workers}.json")
+            library = ScoreLibrary(root, index_path)
+            cold, counts = timed_update(library, workers, cache_directory)
+            unchanged, _ = timed_update(library, workers, cache_directory)
+            print(f"workers={workers}  cold_s={cold:.2f}  indexed={counts['indexed']}  "
+                  f"unchanged_rerun_ms={unchanged * 1000:.1f}")
+            shutil.rmtree(cache_directory)
+
+        # Touched: new mtime, same content, so only re-hashed. Rewritten: parsed again.
+        cache_directory = os.path.join(directory, 'cache_incremental')
+        library = ScoreLibrary(root, os.path.join(directory, 'index_incremental.json'))
+        library.update(workers=1, cache_directory=cache_directory)
+        os.utime(library.path_of(next(iter(library.entries))))
+        write_score(library.path_of(list(library.entries)[-1]), 120, seed=args.files)
+        incremental, counts = timed_update(library, 1, cache_directory)
+        print(f"incremental_ms={incremental * 1000:.1f}  indexed={counts['indexed']}  "
+              f"unchanged={counts['unchanged']}")
+
+        started = time.perf_counter()
+        for _ in range(SEARCHES):
+            matches = library.search('synthetic major')
+        print(f"search_us={(time.perf_counter() - started) / SEARCHES * 1e6:.1f}  matches={len(matches)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+What the chord detector confirms when the student is ahead of the cursor.
+
+The cursor is on the first of three chords and the detector is given the
+practice engine's look-ahead window. Each case plays some of the chords,
+struck together, and reports whether the detector confirmed and which
+moment it matched: the current chord alone should confirm moment 0; the
+current chord with the next should jump to moment 1; the next chord alone
+never heard the current moment, so it must not confirm anything.
+
+Run from the repository root:
+    python -m benchmarks.look_ahead
+"""
+import argparse
+import queue
+
+import numpy as np
+
+from src.core.pitch import FIRST_KEY_MIDI, NUM_KEYS, name_to_midi
+from src.input.chord_detector import ChordDetector
+from src.input.synth import midi_to_frequency
+from benchmarks.signals import piano_tone, with_silence
+
+# No key a semitone from another chord's: constant-Q's local-maximum rule can't hear both.
+MOMENTS = [{'C4', 'E4', 'G4'}, {'A4', 'C5', 'E5'}, {'D5', 'F5', 'A5'}]
+CASES = {
+    'current_only': [0],
+    'current_and_next': [0, 1],
+    'next_only': [1],
+    'silence': [],
+}
+EXPECTED = {'current_only': 0, 'current_and_next': 1, 'next_only': None, 'silence': None}
+
+
+def target_window() -> np.ndarray:
+    window = np.zeros((len(MOMENTS), NUM_KEYS), dtype=bool)
+    for row, notes in enumerate(MOMENTS):
+        window[row, [name_to_midi(note) - FIRST_KEY_MIDI for note in notes]] = True
+    return window
+
+
+def first_confirmation(moments: list[int], verification_mode: str) -> int | None:
+    """The moment the detector first confirmed, or None."""
+    detector = ChordDetector(queue.Queue(), verification_mode=verification_mode)
+    detector.set_target_notes(MOMENTS[0], (0, target_window()))
+    notes = sorted(set().union(*(MOMENTS[moment] for moment in moments)))
+    tone = piano_tone([midi_to_frequency(name_to_midi(note)) for note in notes], duration=2.0)
+    signal, _ = with_silence(tone, lead_in=0.5)
+    signal *= detector.INT16_SCALE
+    block_size = len(detector.hop_buffer)
+    for block_start in range(0, len(signal), block_size):
+        for update in detector.process_samples(signal[block_start:block_start + block_size]):
+            if update['is_correct']:
+                return update['matched_moment']
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--verification', nargs='+', default=['peaks', 'templates', 'constant_q'],
+                        choices=['peaks', 'templates', 'constant_q'], help='Verification modes to run.')
+    args = parser.parse_args()
+    for verification_mode in args.verification:
+        for case, moments in CASES.items():
+            matched = first_confirmation(moments, verification_mode)
+            print(f"verification={verification_mode}  case={case}  matched_moment={matched}  "
+                  f"expected={EXPECTED[case]}  ok={matched == EXPECTED[case]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Compares the detectors with and without onset gating on a short practice
+take: a chord, the same chord struck again while it still rings, a pause, and
+then ten seconds of near-silence. Reports how many times the chord was
+confirmed (two strikes should give two confirmations) and the analysis CPU
+per second of audio, overall and during the idle stretch.
+
+Then a single sustained strike, with the detector restarted at several
+delays while it still rings, as the app does when it moves to the next
+moment. Each restart replays the detector's lead-in, and a ringing note must
+not count as a new strike: a restart should add no reports to the ones the
+same take gives without it.
+
+Run from the repository root:
+    python -m benchmarks.onset_gating
+"""
+import queue
+import time
+import numpy as np
+
+from src.input.audio_engine import AudioEngine
+from src.input.chord_detector import ChordDetector
+from benchmarks.signals import note_to_frequency, piano_tone
+
+RATE = 44100
+CHORD = {'C4', 'E4', 'G4'}
+NOTE = 'A3'
+STRIKES = (0.5, 1.5)     # Seconds. The second strike lands while the first still rings.
+TONE_SECONDS = 3.0
+IDLE_SECONDS = 10.0
+NOISE_LEVEL = 0.0005     # Roughly a quiet room through a laptop microphone.
+RESTART_DELAYS = (0.0, 0.05, 0.1, 0.2, 0.5)  # Seconds after the first report.
+
+
+def practice_take(notes: list[str]) -> tuple[np.ndarray, int]:
+    """Returns the take and the sample index where the idle stretch starts."""
+    idle_start = int((STRIKES[-1] + TONE_SECONDS) * RATE)
+    signal = np.zeros(idle_start + int(IDLE_SECONDS * RATE), dtype=np.float32)
+    tone = piano_tone([note_to_frequency(note) for note in notes], duration=TONE_SECONDS)
+    for strike in STRIKES:
+        start = int(strike * RATE)
+        signal[start:start + len(tone)] += tone
+    # The tone decays, but cut it off so the idle stretch really is idle.
+    signal[idle_start:] = 0
+    signal += np.random.default_rng(0).normal(0, NOISE_LEVEL, len(signal)).astype(np.float32)
+    return signal, idle_start
+
+
+def run_chord(onset_gating: bool) -> dict:
+    detector = ChordDetector(queue.Queue(), onset_gating=onset_gating)
+    detector.warm_up()  # Untimed, so neither run pays for importing scipy.signal.
+    detector.set_target_notes(CHORD)
+    signal, idle_start = practice_take(sorted(CHORD))
+    signal *= detector.INT16_SCALE
+
+    confirmations = 0
+    cpu = {'active': 0.0, 'idle': 0.0}
+    block_size = len(detector.hop_buffer)
+    for block_start in range(0, len(signal), block_size):
+        start = time.process_time()
+        updates = detector.process_samples(signal[block_start:block_start + block_size])
+        cpu['idle' if block_start >= idle_start else 'active'] += time.process_time() - start
+        if any(update['is_correct'] for update in updates):
+            confirmations += 1
+            # The practice engine re-targets after a confirmation; here the next target is the same chord.
+            detector.set_target_notes(CHORD)
+    return summarise('ChordDetector', onset_gating, f"{confirmations} (expected {len(STRIKES)})",
+                     cpu, len(signal), idle_start)
+
+
+def run_yin(onset_gating: bool) -> dict:
+    from src.input.mic_listener import MicListener  # Needs aubio.
+
+    listener = MicListener(queue.Queue(), AudioEngine(), onset_gating=onset_gating)
+    listener.warm_up()
+    signal, idle_start = practice_take([NOTE])
+
+    notes = []
+    cpu = {'active': 0.0, 'idle': 0.0}
+    block_size = listener.BUFFER_SIZE
+    for block_start in range(0, len(signal) - block_size + 1, block_size):
+        start = time.process_time()
+        note_name = listener.process_buffer(signal[block_start:block_start + block_size], block_start)
+        cpu['idle' if block_start >= idle_start else 'active'] += time.process_time() - start
+        if note_name is not None:
+            notes.append(note_name)
+    # Without gating, the wall-clock cooldown decides instead, so the count is meaningless offline.
+    reported = f"{len(notes)} (expected {len(STRIKES)})" if onset_gating else 'n/a'
+    return summarise('MicListener (yin)', onset_gating, reported, cpu, len(signal), idle_start)
+
+
+def sustained_strike(notes: list[str]) -> np.ndarray:
+    signal = np.zeros(int((STRIKES[0] + TONE_SECONDS) * RATE), dtype=np.float32)
+    tone = piano_tone([note_to_frequency(note) for note in notes], duration=TONE_SECONDS)
+    start = int(STRIKES[0] * RATE)
+    signal[start:start + len(tone)] = tone
+    return signal + np.random.default_rng(0).normal(0, NOISE_LEVEL, len(signal)).astype(np.float32)
+
+
+def restart_chord(delay: float | None) -> int:
+    """Confirmations of one sustained strike, restarting `delay` s after the first (never if None)."""
+    detector = ChordDetector(queue.Queue())
+    detector.set_target_notes(CHORD)
+    signal = sustained_strike(sorted(CHORD)) * detector.INT16_SCALE
+    block_size = len(detector.hop_buffer)
+    lead_in = (detector.WINDOW_SIZE - detector.HOP_SIZE) * detector.DECIMATION_FACTOR
+    confirmations, restart_at, position = 0, None, 0
+    while position + block_size <= len(signal):
+        if restart_at is not None and position >= restart_at:
+            # What audio_processing_loop does on start: reset, then re-read the lead-in.
+            restart_at = None
+            detector.set_target_notes(CHORD)
+            detector.reset_analysis()
+            position = detector.position = position - lead_in
+        updates = detector.process_samples(signal[position:position + block_size])
+        position += block_size
+        if any(update['is_correct'] for update in updates):
+            confirmations += 1
+            if confirmations == 1 and delay is not None:
+                restart_at = position + int(delay * RATE)
+    return confirmations
+
+
+def restart_listener(delay: float | None) -> int:
+    """Notes reported for one sustained strike, restarting `delay` s after the first (never if None)."""
+    from src.input.mic_listener import MicListener
+
+    listener = MicListener(queue.Queue(), AudioEngine(), pitch_estimator='fft-peaks')
+    signal = sustained_strike([NOTE])
+    block_size = listener.BUFFER_SIZE
+    notes, restart_at, position = 0, None, 0
+    while position + block_size <= len(signal):
+        if restart_at is not None and position >= restart_at:
+            # What _listen_thread does on start: reset, then re-read two buffers of lead-in.
+            restart_at = None
+            listener.decimator.reset()
+            listener.onset_detector.reset()
+            position -= 2 * block_size
+        if listener.process_buffer(signal[position:position + block_size], position) is not None:
+            notes += 1
+            if notes == 1 and delay is not None:
+                restart_at = position + block_size + int(delay * RATE)
+        position += block_size
+    return notes
+
+
+def summarise(detector: str, onset_gating: bool, reported: str, cpu: dict, length: int, idle_start: int) -> dict:
+    active_seconds, idle_seconds = idle_start / RATE, (length - idle_start) / RATE
+    return {
+        'detector': detector,
+        'onset_gating': onset_gating,
+        'reported': reported,
+        'cpu_ms_per_audio_s': round((cpu['active'] + cpu['idle']) * 1000 / (active_seconds + idle_seconds), 2),
+        'idle_cpu_ms_per_audio_s': round(cpu['idle'] * 1000 / idle_seconds, 2),
+    }
+
+
+def main():
+    results = [run_chord(True), run_chord(False)]
+    try:
+        results += [run_yin(True), run_yin(False)]
+    except ImportError:
+        print("aubio is not installed; skipping MicListener.")
+
+    for result in results:
+        print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+    for detector, restart in (('ChordDetector', restart_chord), ('MicListener (fft-peaks)', restart_listener)):
+        without_restart = restart(None)
+        extra = [restart(delay) - without_restart for delay in RESTART_DELAYS]
+        print(f"detector={detector}  restart_delays_ms={[int(delay * 1000) for delay in RESTART_DELAYS]}  "
+              f"extra_reports={extra} (expected 0 each)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+The music21 parser against the streaming parser, uncached.
+
+Parses the bundled sample, a few files from music21's corpus whose
+measures or spelling once tripped the streaming parser, and synthetic
+piano scores of increasing length with both MusicXMLParser and
+StreamingMusicXMLParser. Reports the wall time
+of each, the peak Python memory of each (measured in a second run under
+tracemalloc, which slows parsing down), and whether the two return the same
+SheetMusic. music21 is imported before timing starts, so the second or so
+its import takes is not counted against it.
+
+Run from the repository root:
+    python -m benchmarks.parser_comparison --measures 100 500 1000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from src.parsing.musicxml_parser import MusicXMLParser
+from src.parsing.streaming_parser import StreamingMusicXMLParser
+from benchmarks.scores import write_score
+
+SAMPLE = 'assets/sample.mxl'
+# Measures of only <forward> or whole-measure rests; an <accidental> without an <alter>.
+CORPUS = ('monteverdi/madrigal.3.13.mxl', 'liliuokalani/aloha_oe.mxl', 'trecento/PMFC_13_04-Credo Cursor.xml')
+PARSERS = {'music21': MusicXMLParser, 'streaming': StreamingMusicXMLParser}
+
+
+def measure(parser, path: str) -> tuple:
+    gc.collect()
+    start = time.perf_counter()
+    sheet_music = parser.parse(path)
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    parser.parse(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sheet_music, seconds, peak
+
+
+def compare(path: str) -> dict:
+    result = {'file': os.path.basename(path), 'file_kb': round(os.path.getsize(path) / 1024, 1)}
+    parsed = {}
+    for name, parser_class in PARSERS.items():
+        sheet_music, seconds, peak = measure(parser_class(), path)
+        parsed[name] = sheet_music
+        result[f'{name}_ms'] = round(seconds * 1000, 1)
+        result[f'{name}_peak_mb'] = round(peak / 2 ** 20, 1)
+    result['moments'] = len(parsed['music21'].moments)
+    result['speedup'] = round(result['music21_ms'] / max(result['streaming_ms'], 1e-3), 1)
+    result['identical'] = parsed['music21'] == parsed['streaming']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--measures', nargs='+', type=int, default=[100, 500, 1000],
+                        help='Lengths of the synthetic scores, in measures.')
+    args = parser.parse_args()
+
+    import music21  # See the module docstring.
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [SAMPLE] + [str(music21.corpus.getWork(work)) for work in CORPUS]
+        paths += [write_score(os.path.join(directory, f"synthetic_{measures}.mxl"), measures)
+                  for measures in args.measures]
+        for path in paths:
+            result = compare(path)
+            print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
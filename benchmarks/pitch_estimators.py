@@ -0,0 +1,119 @@
+"""
+Compares the registered pitch estimators (src/input/pitch_estimators.py) on
+the detection suite's synthesized corpus: single notes for every estimator,
+chords as well for the polyphonic ones. Frames are fed back to back, as
+MicListener does. For each estimator it reports:
+  - CPU time per frame;
+  - latency from the onset to the first confident, correct estimate;
+  - accuracy of the first confident estimate (a wrong one is a false positive);
+  - the share of frames after the onset that are estimated correctly.
+Estimators whose optional dependency (aubio, librosa) is missing are skipped.
+
+Run from the repository root:
+    python -m benchmarks.pitch_estimators --output estimators.json
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from src.core.pitch import MIDI_NAMES
+from src.input.pitch_estimators import ESTIMATORS, create_estimator
+from benchmarks.detection_suite import LEAD_IN, RATE, VARIANTS, build_corpus, environment, latency_summary, render
+
+FRAME_SIZE = 2048
+CONFIDENCE_THRESHOLD = 0.8  # MicListener's.
+
+
+def is_correct(notes: list[str], target: list[str], polyphonic: bool) -> bool:
+    if not notes:
+        return False
+    return set(target).issubset(notes) if polyphonic else notes[0] == target[0]
+
+
+def run_estimator(name: str, corpus: list[dict], seed: int = 0) -> dict:
+    estimator = create_estimator(name, FRAME_SIZE, RATE)
+    # One untimed frame, so the first timed one doesn't pay for FFT planning or imports.
+    estimator.process(np.zeros(FRAME_SIZE, dtype=np.float32))
+    rng = np.random.default_rng(seed)
+    onset = int(LEAD_IN * RATE)
+    frame_seconds = []
+    latencies_ms = []
+    items = true_positives = false_positives = 0
+    frames_after_onset = correct_frames = 0
+
+    for item in corpus:
+        if item['kind'] == 'chord' and not estimator.polyphonic:
+            continue
+        target = [MIDI_NAMES[midi] for midi in item['midi']]
+        for variant in VARIANTS:
+            signal = render(item['midi'], variant, rng)
+            estimator.reset()
+            items += 1
+            first_confident = None
+            for frame_start in range(0, len(signal) - FRAME_SIZE + 1, FRAME_SIZE):
+                frame = signal[frame_start:frame_start + FRAME_SIZE]
+                start = time.process_time()
+                estimate = estimator.process(frame)
+                frame_seconds.append(time.process_time() - start)
+
+                frame_end = frame_start + FRAME_SIZE
+                if frame_end <= onset:
+                    continue
+                correct = is_correct(estimate.notes, target, estimator.polyphonic)
+                frames_after_onset += 1
+                correct_frames += correct
+                if first_confident is None and estimate.notes and estimate.confidence >= CONFIDENCE_THRESHOLD:
+                    first_confident = correct
+                    if correct:
+                        latencies_ms.append((frame_end - onset) * 1000 / RATE)
+            if first_confident is True:
+                true_positives += 1
+            elif first_confident is False:
+                false_positives += 1
+
+    frame_seconds = np.array(frame_seconds)
+    reported = true_positives + false_positives
+    return {
+        'estimator': name,
+        'polyphonic': estimator.polyphonic,
+        'items': items,
+        'cpu_ms_per_frame': {
+            'mean': round(float(frame_seconds.mean()) * 1000, 3),
+            'p95': round(float(np.percentile(frame_seconds, 95)) * 1000, 3),
+        },
+        'precision': round(true_positives / reported, 3) if reported else None,
+        'recall': round(true_positives / items, 3) if items else None,
+        'frame_accuracy': round(correct_frames / frames_after_onset, 3) if frames_after_onset else None,
+        'time_to_estimate': latency_summary(latencies_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--estimators', nargs='+', choices=sorted(ESTIMATORS), default=sorted(ESTIMATORS))
+    parser.add_argument('--quick', action='store_true', help='Fewer notes and chords per register.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    args = parser.parse_args()
+
+    corpus = build_corpus(3, 2) if args.quick else build_corpus()
+    results = {'environment': environment(), 'frame_size': FRAME_SIZE, 'estimators': []}
+    for name in args.estimators:
+        try:
+            result = run_estimator(name, corpus)
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        results['estimators'].append(result)
+        print(f"{name}: cpu_ms/frame={result['cpu_ms_per_frame']['mean']}  precision={result['precision']}  "
+              f"recall={result['recall']}  frame_accuracy={result['frame_accuracy']}  "
+              f"p50={result['time_to_estimate'].get('p50_ms')}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
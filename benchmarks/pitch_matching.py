@@ -0,0 +1,99 @@
+"""
+Matching by pitch name against matching by key mask.
+
+Random chords are written with a random mix of sharp and flat spellings,
+and "heard" exactly, as detectors name pitches (MIDI_NAMES). The report
+gives how many chords each way confirms, and the cost per frame of turning
+the heard keys into a result: the name set and subset test detectors used
+to run, or a key mask compared with the target's. Last, flat-spelled chords
+are synthesized and played to ChordDetector in each verification mode.
+
+Run from the repository root:
+    python -m benchmarks.pitch_matching
+"""
+import queue
+import time
+
+import numpy as np
+
+from src.core.pitch import FIRST_KEY_MIDI, MIDI_NAMES, NUM_KEYS, keys_to_mask, name_to_mask, name_to_midi
+from src.input.chord_detector import ChordDetector
+from src.input.synth import midi_to_frequency
+from benchmarks.signals import piano_tone, with_silence
+
+SHARP_SPELLINGS = {1: 'C#', 3: 'D#', 6: 'F#', 8: 'G#', 10: 'A#'}
+FLAT_SPELLINGS = {1: 'D-', 3: 'E-', 6: 'G-', 8: 'A-', 10: 'B-'}
+NATURALS = {0: 'C', 2: 'D', 4: 'E', 5: 'F', 7: 'G', 9: 'A', 11: 'B'}
+NUM_CHORDS = 2000
+FLAT_CHORDS = [{'D-4', 'F4', 'A-4'}, {'E-3', 'G3', 'B-3'}, {'G-4', 'B-4', 'D-5'}]
+
+
+def spell(midi: int, rng) -> str:
+    pitch_class = midi % 12
+    if pitch_class in NATURALS:
+        name = NATURALS[pitch_class]
+    else:
+        name = (SHARP_SPELLINGS if rng.random() < 0.5 else FLAT_SPELLINGS)[pitch_class]
+    return f"{name}{midi // 12 - 1}"
+
+
+def by_name(target_notes: set[str], heard_midi) -> tuple:
+    detected_note_set = {MIDI_NAMES[midi] for midi in heard_midi}
+    return {note: note in detected_note_set for note in target_notes}, target_notes.issubset(detected_note_set)
+
+
+def by_mask(target_bits: dict, target_mask: int, heard_keys: np.ndarray) -> tuple:
+    present_mask = keys_to_mask(heard_keys)
+    return ({note: bool(present_mask & bit) for note, bit in target_bits.items()},
+            present_mask & target_mask == target_mask)
+
+
+def synthetic_matching() -> dict:
+    rng = np.random.default_rng(0)
+    cases = []
+    for _ in range(NUM_CHORDS):
+        chord = sorted(rng.choice(np.arange(48, 84), size=int(rng.integers(1, 5)), replace=False).tolist())
+        target_notes = {spell(midi, rng) for midi in chord}
+        heard_keys = np.zeros(NUM_KEYS, dtype=bool)
+        heard_keys[np.array(chord) - FIRST_KEY_MIDI] = True
+        target_bits = {note: name_to_mask(note) for note in target_notes}
+        target_mask = 0
+        for bit in target_bits.values():
+            target_mask |= bit
+        # Detectors hold the heard MIDI numbers as an array (peak picking) as well as the key array.
+        cases.append((target_notes, np.array(chord), heard_keys, target_bits, target_mask))
+
+    start = time.perf_counter()
+    name_matches = sum(by_name(target_notes, chord)[1] for target_notes, chord, _, _, _ in cases)
+    name_us = (time.perf_counter() - start) / NUM_CHORDS * 1e6
+    start = time.perf_counter()
+    mask_matches = sum(by_mask(bits, mask, keys)[1] for _, _, keys, bits, mask in cases)
+    mask_us = (time.perf_counter() - start) / NUM_CHORDS * 1e6
+    return {'chords': NUM_CHORDS, 'by_name_confirmed': name_matches, 'by_mask_confirmed': mask_matches,
+            'by_name_us': round(name_us, 2), 'by_mask_us': round(mask_us, 2)}
+
+
+def detector_confirms(chord: set[str], verification_mode: str) -> bool:
+    detector = ChordDetector(queue.Queue(), verification_mode=verification_mode)
+    detector.set_target_notes(chord)
+    tone = piano_tone([midi_to_frequency(name_to_midi(note)) for note in chord], duration=2.0)
+    signal, _ = with_silence(tone, lead_in=0.5)
+    signal *= detector.INT16_SCALE
+    block_size = len(detector.hop_buffer)
+    for block_start in range(0, len(signal), block_size):
+        updates = detector.process_samples(signal[block_start:block_start + block_size])
+        if any(update['is_correct'] for update in updates):
+            return True
+    return False
+
+
+def main():
+    result = synthetic_matching()
+    print("  ".join(f"{key}={value}" for key, value in result.items()))
+    for verification_mode in ('peaks', 'templates', 'constant_q'):
+        confirmed = sum(detector_confirms(chord, verification_mode) for chord in FLAT_CHORDS)
+        print(f"verification={verification_mode}  flat_spelled_chords_confirmed={confirmed}/{len(FLAT_CHORDS)}")
+
+
+if __name__ == '__main__':
+    main()
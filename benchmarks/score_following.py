@@ -0,0 +1,116 @@
+"""
+Score following on a synthesized performance.
+
+A random score of single notes and triads is rendered as a performance that
+plays the first passage, skips ahead, and then goes back to repeat an earlier
+passage. The audio streams through a TranscriptionDetector following the
+whole score. The benchmark reports how many performed moments the follower
+was on by the time the next one started, and how long it took to re-sync
+after the skip and the repeat. It also times ScoreFollower.update() alone on
+scores of increasing length: the per-frame cost is capped by the window and
+search slice sizes, not by the length of the score.
+
+Run from the repository root:
+    python -m benchmarks.score_following
+"""
+import queue
+import time
+import numpy as np
+
+from src.core.pitch import MIDI_NAMES
+from src.core.practice_engine import build_follow_templates
+from src.core.score_follower import ScoreFollower
+from src.core.sheet_music import Chord, Moment, Note, SheetMusic
+from src.input.synth import render_sheet_music
+from src.input.transcription_detector import TranscriptionDetector
+
+RATE = 44100
+TEMPO_BPM = 100
+SCORE_MOMENTS = 120
+# Performed passages as [start, end) moment ranges: a skip forward, then a repeat.
+PASSAGES = ((0, 30), (60, 90), (20, 50))
+SCALING_LENGTHS = (100, 1000, 10000)
+SCALING_FRAMES = 5000
+
+
+def random_score(num_moments: int, seed: int = 0) -> SheetMusic:
+    """One quarter note or triad per beat, between C3 and C6."""
+    rng = np.random.default_rng(seed)
+    moments = []
+    for index in range(num_moments):
+        root = int(rng.integers(48, 84))
+        if rng.random() < 0.3:
+            event = Chord([Note(MIDI_NAMES[root + step], 1.0, 'treble') for step in (0, 4, 7)], 1.0, 'treble')
+        else:
+            event = Note(MIDI_NAMES[root], 1.0, 'treble')
+        moments.append(Moment([event], float(index)))
+    return SheetMusic(moments)
+
+
+def performance(score: SheetMusic) -> tuple[SheetMusic, list[int]]:
+    """The moments of PASSAGES played back to back, and the score index of each one played."""
+    played = [index for start, end in PASSAGES for index in range(start, end)]
+    moments = [Moment(score.moments[index].events, float(beat)) for beat, index in enumerate(played)]
+    return SheetMusic(moments), played
+
+
+def run_tracking() -> dict:
+    score = random_score(SCORE_MOMENTS)
+    performed, played = performance(score)
+    samples, timeline = render_sheet_music(performed, TEMPO_BPM, RATE)
+    starts = [int(start * RATE) for start, _ in timeline] + [len(samples)]
+
+    detector = TranscriptionDetector(queue.Queue())
+    detector.follow_score(build_follow_templates(score), played[0])
+    scaled = samples * detector.INT16_SCALE
+    block_size = len(detector.hop_buffer)
+    followed = []  # (sample position, followed moment) per update.
+    for block_start in range(0, len(scaled), block_size):
+        for update in detector.process_samples(scaled[block_start:block_start + block_size]):
+            followed.append((block_start + block_size, update['followed_moment']))
+
+    positions = np.array([position for position, _ in followed])
+    moments = np.array([moment for _, moment in followed])
+    on_time = 0
+    for index, moment in enumerate(played):
+        # Where the follower was just before the next moment started.
+        last = np.searchsorted(positions, starts[index + 1]) - 1
+        on_time += bool(last >= 0 and moments[last] == moment)
+
+    resync_ms = []
+    first_played = np.cumsum([end - start for start, end in PASSAGES])
+    for (start, end), first in zip(PASSAGES[1:], first_played):
+        onset = starts[first]
+        # The first update after the jump that has the follower inside the new passage.
+        inside = (positions >= onset) & (moments >= start) & (moments < end)
+        resync_ms.append(round(float(positions[inside][0] - onset) * 1000 / RATE, 1) if inside.any() else None)
+
+    return {'moments_played': len(played), 'on_time': on_time,
+            'on_time_fraction': round(on_time / len(played), 3), 'resync_ms': resync_ms}
+
+
+def run_scaling() -> list[dict]:
+    results = []
+    for length in SCALING_LENGTHS:
+        templates = build_follow_templates(random_score(length, seed=length))
+        follower = ScoreFollower(templates)
+        rng = np.random.default_rng(length)
+        frames = templates[rng.integers(0, length, SCALING_FRAMES // 15).repeat(15)] > 0
+        start = time.perf_counter()
+        for index, keys in enumerate(frames):
+            follower.update(keys, onset=index % 15 == 0)
+        elapsed = time.perf_counter() - start
+        results.append({'moments': length, 'us_per_frame': round(elapsed * 1e6 / len(frames), 1)})
+    return results
+
+
+def main():
+    tracking = run_tracking()
+    print(f"Tracking: {tracking['on_time']}/{tracking['moments_played']} moments on time "
+          f"({tracking['on_time_fraction']:.1%}), re-sync after skip/repeat: {tracking['resync_ms']} ms")
+    for result in run_scaling():
+        print(f"  {result['moments']:>6} moments: {result['us_per_frame']} us per frame")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Score load time with and without the parsed-score cache.
+
+Parses the bundled sample, a few files from music21's corpus with triplet
+durations and offsets, and synthetic piano scores of increasing length
+with music21 (a cold load, which fills the cache), then loads each again
+from the cache (a warm load). Reports both times, the cache entry size
+next to the file size, and checks the warm load returns exactly the same
+moments, Fraction quarterLengths included.
+
+Run from the repository root:
+    python -m benchmarks.score_loading
+"""
+import os
+import tempfile
+import time
+
+from src.parsing.musicxml_parser import MusicXMLParser
+from src.parsing.score_cache import ScoreCache, file_hash
+from benchmarks.scores import write_score
+
+SAMPLE = 'assets/sample.mxl'
+# Triplets, so durations and offsets music21 keeps as Fractions.
+CORPUS = ('haydn/opus74no1/movement2.mxl', 'beethoven/opus74.mxl', 'schumann/opus41no1/movement1.mxl')
+MEASURES = (100, 500, 2000)
+
+
+def load(path: str, cache: ScoreCache) -> dict:
+    parser = MusicXMLParser(cache=cache)
+    start = time.perf_counter()
+    cold = parser.parse(path)
+    cold_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    warm = parser.parse(path)
+    warm_seconds = time.perf_counter() - start
+    entry = cache.path_for(file_hash(path), parser.cache_key)
+    return {
+        'file': os.path.basename(path),
+        'moments': len(cold.moments),
+        'cold_ms': round(cold_seconds * 1000, 1),
+        'warm_ms': round(warm_seconds * 1000, 1),
+        'file_kb': round(os.path.getsize(path) / 1024, 1),
+        'cache_kb': round(os.path.getsize(entry) / 1024, 1),
+        'identical': list(cold.moments) == list(warm.moments),
+    }
+
+
+def main():
+    import music21  # To find the corpus files; imported before timing, so no cold load pays for it.
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ScoreCache(os.path.join(directory, 'cache'))
+        paths = [SAMPLE] + [str(music21.corpus.getWork(work)) for work in CORPUS]
+        paths += [write_score(os.path.join(directory, f"synthetic_{measures}.mxl"), measures)
+                            for measures in MEASURES]
+        for path in paths:
+            result = load(path, cache)
+            print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
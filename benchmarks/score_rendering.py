@@ -0,0 +1,73 @@
+"""
+What moving the cursor costs ScoreRenderer, against redrawing the score.
+
+For synthetic piano scores of increasing length, laid out at a fixed
+width: the time and canvas instructions of a full draw_score (what every
+cursor move used to cost), and the time per cursor move now that only the
+overlays are repositioned, with and without a wrong note shown. The
+per-move time should stay flat as the score grows.
+
+Run from the repository root:
+    python -m benchmarks.score_rendering --measures 100 1000
+"""
+import argparse
+import io
+import os
+import time
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')  # Keep Kivy from reading this script's arguments.
+
+from src.parsing.streaming_parser import StreamingMusicXMLParser
+from src.ui.score_renderer import ScoreRenderer
+from benchmarks.scores import score_xml
+
+WIDTH = 1200
+MOVES = 2000
+
+
+def count_instructions(group) -> int:
+    return sum(count_instructions(child) if hasattr(child, 'children') else 1 for child in group.children)
+
+
+def compare(measures: int) -> dict:
+    sheet_music = StreamingMusicXMLParser().parse_stream(io.BytesIO(score_xml(measures).encode()))
+    renderer = ScoreRenderer(size_hint_y=None, width=WIDTH)
+    started = time.perf_counter()
+    renderer.sheet_music = sheet_music
+    full_draw = time.perf_counter() - started
+
+    num_moments = len(sheet_music.moments)
+    started = time.perf_counter()
+    for move in range(MOVES):
+        renderer.cursor_index = move % num_moments
+    cursor_move = (time.perf_counter() - started) / MOVES
+
+    renderer.wrong_note_to_draw = 'C#5'
+    started = time.perf_counter()
+    for move in range(MOVES):
+        renderer.cursor_index = move % num_moments
+    wrong_note_move = (time.perf_counter() - started) / MOVES
+
+    return {
+        'measures': measures,
+        'moments': num_moments,
+        'score_instructions': count_instructions(renderer.note_instructions),
+        'overlay_instructions': count_instructions(renderer.overlay_instructions),
+        'full_draw_ms': round(full_draw * 1000, 1),
+        'cursor_move_us': round(cursor_move * 1e6, 2),
+        'with_wrong_note_us': round(wrong_note_move * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--measures', nargs='+', type=int, default=[100, 1000],
+                        help='Lengths of the synthetic scores, in measures.')
+    args = parser.parse_args()
+    for measures in args.measures:
+        result = compare(measures)
+        print("  ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Synthetic MusicXML piano scores of any length, for the loading benchmarks."""
+import zipfile
+import numpy as np
+
+STEPS = ('C', 'D', 'E', 'F', 'G', 'A', 'B')
+
+
+def _pitch(step: str, alter: int, octave: int) -> str:
+    alter_xml = f"<alter>{alter}</alter>" if alter else ''
+    return f"<pitch><step>{step}</step>{alter_xml}<octave>{octave}</octave></pitch>"
+
+
+def _note(pitch: str, duration: int, note_type: str, staff: int, chord: bool = False) -> str:
+    chord_xml = '<chord/>' if chord else ''
+    return (f"<note>{chord_xml}{pitch}<duration>{duration}</duration><voice>{staff}</voice>"
+            f"<type>{note_type}</type><staff>{staff}</staff></note>")
+
+
+def score_xml(num_measures: int, seed: int = 0) -> str:
+    """
+    A one-part, two-staff piano score in 4/4: quarter notes and the odd triad
+    or rest in the right hand, a whole-note chord in the left, joined by
+    <backup> the way notation programs write them.
+    """
+    rng = np.random.default_rng(seed)
+    measures = []
+    for number in range(1, num_measures + 1):
+        parts = []
+        if number == 1:
+            parts.append("<attributes><divisions>1</divisions><key><fifths>0</fifths></key>"
+                         "<time><beats>4</beats><beat-type>4</beat-type></time><staves>2</staves>"
+                         "<clef number=\"1\"><sign>G</sign><line>2</line></clef>"
+                         "<clef number=\"2\"><sign>F</sign><line>4</line></clef></attributes>")
+        for _ in range(4):
+            roll = rng.random()
+            step = int(rng.integers(0, 7))
+            octave = int(rng.integers(4, 6))
+            if roll < 0.1:
+                parts.append("<note><rest/><duration>1</duration><voice>1</voice><type>quarter</type>"
+                             "<staff>1</staff></note>")
+                continue
+            alter = 1 if roll > 0.9 else 0
+            parts.append(_note(_pitch(STEPS[step], alter, octave), 1, 'quarter', 1))
+            if roll < 0.3:
+                for interval in (2, 4):
+                    upper = step + interval
+                    parts.append(_note(_pitch(STEPS[upper % 7], 0, octave + upper // 7), 1, 'quarter', 1, chord=True))
+        parts.append("<backup><duration>4</duration></backup>")
+        root = int(rng.integers(0, 7))
+        for index, interval in enumerate((0, 2, 4)):
+            step = root + interval
+            parts.append(_note(_pitch(STEPS[step % 7], 0, 2 + step // 7), 4, 'whole', 2, chord=index > 0))
+        measures.append(f"<measure number=\"{number}\">{''.join(parts)}</measure>")
+
+    return ("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n"
+            "<score-partwise version=\"3.1\"><work><work-title>Synthetic</work-title></work>"
+            "<part-list><score-part id=\"P1\"><part-name>Piano</part-name></score-part></part-list>"
+            f"<part id=\"P1\">{''.join(measures)}</part></score-partwise>\n")
+
+
+def write_score(path: str, num_measures: int, seed: int = 0) -> str:
+    """Writes a synthetic score as .musicxml, or as a compressed .mxl if the path ends in .mxl."""
+    xml = score_xml(num_measures, seed)
+    if path.endswith('.mxl'):
+        container = ("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<container><rootfiles>"
+                     "<rootfile full-path=\"score.xml\"/></rootfiles></container>\n")
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('META-INF/container.xml', container)
+            archive.writestr('score.xml', xml)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(xml)
+    return path
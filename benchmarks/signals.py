@@ -0,0 +1,18 @@
+import numpy as np
+
+from src.input.synth import piano_tone  # noqa: F401  (re-exported for the benchmarks)
+
+A4_FREQ = 440.0
+NOTE_INDEX = {'C': 0, 'C#': 1, 'D': 2, 'D#': 3, 'E': 4, 'F': 5, 'F#': 6, 'G': 7, 'G#': 8, 'A': 9, 'A#': 10, 'B': 11}
+
+
+def note_to_frequency(note_name: str) -> float:
+    """'C#4' -> 277.18. Sharps only, which is all the benchmarks need."""
+    midi = NOTE_INDEX[note_name[:-1]] + (int(note_name[-1]) + 1) * 12
+    return A4_FREQ * 2 ** ((midi - 69) / 12)
+
+
+def with_silence(samples: np.ndarray, lead_in: float, rate: int = 44100) -> tuple[np.ndarray, int]:
+    """Prepends `lead_in` seconds of silence. Returns the signal and the onset sample index."""
+    onset = int(lead_in * rate)
+    return np.concatenate([np.zeros(onset, dtype=np.float32), samples]), onset
@@ -0,0 +1,89 @@
+"""
+Import-time report for the app's modules, from `python -X importtime`.
+
+Each target module is imported in a fresh interpreter. The report gives the
+total import time, the slowest imports by cumulative time, and whether any
+of the heavy optional dependencies (music21, scipy.signal, aubio, tkinter)
+were loaded, which startup is supposed to defer until they are first used.
+Targets whose own dependencies aren't installed (Kivy for the UI modules)
+are reported as skipped.
+
+Run from the repository root:
+    python -m benchmarks.startup --output startup.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+TARGETS = (
+    'src.core.practice_engine',
+    'src.parsing.musicxml_parser',
+    'src.input.chord_detector',
+    'src.input.mic_listener',
+    'src.input.transcription_detector',
+    'src.ui.score_renderer',
+    'src.ui.app_view',
+)
+DEFERRED = ('music21', 'scipy.signal', 'aubio', 'tkinter')
+TOP = 8
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """The '-X importtime' lines as {'module', 'self_us', 'cumulative_us'}, in import order."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports.append({'module': module.strip(), 'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+    return imports
+
+
+def measure(target: str) -> dict:
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {target}"],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'target': target, 'skipped': completed.stderr.strip().splitlines()[-1]}
+    imports = parse_importtime(completed.stderr)
+    modules = {entry['module'] for entry in imports}
+    # Every import's self time counted once adds up to the total.
+    total_us = sum(entry['self_us'] for entry in imports)
+    slowest = sorted((entry for entry in imports if not entry['module'].startswith('src')),
+                     key=lambda entry: entry['cumulative_us'], reverse=True)[:TOP]
+    return {
+        'target': target,
+        'total_ms': round(total_us / 1000, 1),
+        'modules': len(imports),
+        'deferred_loaded': [name for name in DEFERRED if name in modules],
+        'slowest': [{'module': entry['module'], 'cumulative_ms': round(entry['cumulative_us'] / 1000, 1)}
+                    for entry in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--targets', nargs='+', default=list(TARGETS))
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    args = parser.parse_args()
+
+    results = []
+    for target in args.targets:
+        result = measure(target)
+        results.append(result)
+        if 'skipped' in result:
+            print(f"{target}: skipped ({result['skipped']})")
+            continue
+        loaded = ', '.join(result['deferred_loaded']) or 'none'
+        print(f"{target}: {result['total_ms']} ms, {result['modules']} modules, deferred deps loaded: {loaded}")
+        for entry in result['slowest']:
+            print(f"    {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from src.ui.app_view import PianoTutorApp
-
 if __name__ == '__main__':
-    PianoTutorApp().run()
\ No newline at end of file
+    # Imported here so a spawned detector process, which re-imports this module, doesn't load Kivy.
+    from src.ui.app_view import PianoTutorApp
+    PianoTutorApp().run()
@@ -0,0 +1,221 @@
+import functools
+from collections.abc import Sequence
+from fractions import Fraction
+
+import numpy as np
+
+from src.core.pitch import FIRST_KEY_MIDI, NUM_KEYS, name_to_midi
+from src.core.sheet_music import SheetMusic, Note, Chord, Rest, Moment
+
+EVENT_NOTE, EVENT_CHORD, EVENT_REST = 0, 1, 2
+STAVES = ('treble', 'bass')
+# music21 keeps a quarterLength whose denominator isn't a power of two (a triplet's 1/3) as a
+# Fraction, with at most this denominator. The columns hold floats; reading them back restores it.
+DENOMINATOR_LIMIT = 65535
+
+EVENT_DTYPE = np.dtype([('kind', 'u1'), ('staff', 'u1'), ('duration', 'f8')])
+# midi is -1 for a name name_to_midi can't read; pitch indexes CompactScore.pitch_names.
+NOTE_DTYPE = np.dtype([('midi', 'i2'), ('pitch', 'u2'), ('onset', 'f8'), ('duration', 'f8'),
+                       ('staff', 'u1'), ('moment', 'i4')])
+
+
+class CompactScore:
+    """
+    A score as flat NumPy arrays instead of a tree of dataclasses.
+
+    `events` and `notes` are structured arrays (EVENT_DTYPE, NOTE_DTYPE).
+    Index arrays in CSR style say where each group starts: moment i's events
+    are events[event_starts[i]:event_starts[i + 1]], event j's notes are
+    notes[note_starts[j]:note_starts[j + 1]], and moment i's notes are
+    notes[moment_note_starts[i]:moment_note_starts[i + 1]]. Each moment's
+    set of pitch names to play, and the same as a key mask (see
+    src.core.pitch), are worked out once, when the score is built.
+
+    `moments` reads the score back as Moment dataclasses, built on access,
+    so a CompactScore can stand in wherever a SheetMusic is read. They are
+    copies: changing one doesn't change the score. Offsets and durations
+    come back as the parsers give them, Fractions where music21 uses one.
+    """
+
+    __slots__ = ('offsets', 'event_starts', 'events', 'note_starts', 'notes', 'moment_note_starts',
+                 'pitch_names', 'target_sets', 'target_masks', 'moments')
+
+    def __init__(self, offsets, event_starts, kinds, event_staves, event_durations,
+                 note_starts, pitches, note_staves, note_durations, pitch_names):
+        """Takes the columns as stored by the score cache; the rest is derived from them."""
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.event_starts = np.asarray(event_starts, dtype=np.uint32)
+        self.note_starts = np.asarray(note_starts, dtype=np.uint32)
+        self.pitch_names = tuple(pitch_names)
+
+        self.events = np.empty(len(kinds), dtype=EVENT_DTYPE)
+        self.events['kind'] = kinds
+        self.events['staff'] = event_staves
+        self.events['duration'] = event_durations
+
+        self.moment_note_starts = self.note_starts[self.event_starts]
+        midi_by_pitch = np.array([-1 if midi is None else midi for midi in map(name_to_midi, self.pitch_names)],
+                                 dtype=np.int16)
+        self.notes = np.empty(len(pitches), dtype=NOTE_DTYPE)
+        self.notes['pitch'] = pitches
+        self.notes['midi'] = midi_by_pitch[self.notes['pitch']]
+        self.notes['staff'] = note_staves
+        self.notes['duration'] = note_durations
+        self.notes['moment'] = np.repeat(np.arange(len(self.offsets)), np.diff(self.moment_note_starts))
+        self.notes['onset'] = self.offsets[self.notes['moment']]
+
+        self.target_sets = self._build_target_sets()
+        packed = np.packbits(self.target_matrix(), axis=1, bitorder='little')  # As keys_to_mask, row by row.
+        self.target_masks = [int.from_bytes(row.tobytes(), 'little') for row in packed]
+        self.moments = MomentsView(self)
+
+    @classmethod
+    def from_sheet_music(cls, sheet_music: SheetMusic) -> 'CompactScore':
+        pitch_index = {}
+        offsets, event_starts = [], []
+        kinds, event_staves, event_durations, note_starts = [], [], [], []
+        pitches, note_staves, note_durations = [], [], []
+        for moment in sheet_music.moments:
+            offsets.append(moment.offset)
+            event_starts.append(len(kinds))
+            for event in moment.events:
+                kinds.append(EVENT_CHORD if isinstance(event, Chord) else EVENT_NOTE if isinstance(event, Note)
+                             else EVENT_REST)
+                event_staves.append(STAVES.index(event.staff))
+                event_durations.append(event.duration)
+                note_starts.append(len(pitches))
+                notes = event.notes if isinstance(event, Chord) else [event] if isinstance(event, Note) else []
+                for note in notes:
+                    pitches.append(pitch_index.setdefault(note.pitch, len(pitch_index)))
+                    note_staves.append(STAVES.index(note.staff))
+                    note_durations.append(note.duration)
+        event_starts.append(len(kinds))
+        note_starts.append(len(pitches))
+        return cls(np.array(offsets, dtype=np.float64), event_starts, kinds, event_staves,
+                   np.array(event_durations, dtype=np.float64), note_starts, pitches, note_staves,
+                   np.array(note_durations, dtype=np.float64), pitch_index)
+
+    def to_sheet_music(self) -> SheetMusic:
+        return SheetMusic(moments=list(self.moments))
+
+    def _build_target_sets(self) -> list[frozenset[str]]:
+        # Moments asking for the same notes share one frozenset.
+        names = [self.pitch_names[pitch] for pitch in self.notes['pitch'].tolist()]
+        starts = self.moment_note_starts.tolist()
+        shared = {}
+        target_sets = []
+        for start, stop in zip(starts, starts[1:]):
+            target_set = frozenset(names[start:stop])
+            target_sets.append(shared.setdefault(target_set, target_set))
+        return target_sets
+
+    def target_matrix(self) -> np.ndarray:
+        """One row of 88 piano keys per moment, True where the moment asks for that key."""
+        matrix = np.zeros((len(self.offsets), NUM_KEYS), dtype=bool)
+        keys = self.notes['midi'].astype(np.intp) - FIRST_KEY_MIDI
+        on_piano = (self.notes['midi'] >= 0) & (keys >= 0) & (keys < NUM_KEYS)
+        matrix[self.notes['moment'][on_piano], keys[on_piano]] = True
+        return matrix
+
+    def follow_templates(self, held_weight: float = 0.5) -> np.ndarray:
+        """
+        One row of 88 keys per moment for the score follower: 1 for the notes the
+        moment starts, `held_weight` for earlier notes still sounding then, since
+        a microphone hears those too. Rests get an empty row.
+        """
+        num_moments = len(self.offsets)
+        keys = self.notes['midi'].astype(np.intp) - FIRST_KEY_MIDI
+        on_piano = (self.notes['midi'] >= 0) & (keys >= 0) & (keys < NUM_KEYS)
+        notes, keys = self.notes[on_piano], keys[on_piano]
+        # A note is held from the moment after its own up to the last moment that starts before it ends.
+        held_from = notes['moment'].astype(np.intp) + 1
+        held_until = np.searchsorted(self.offsets, notes['onset'] + notes['duration'] - 1e-6, side='left')
+        held_until = np.maximum(held_until, held_from)
+        changes = np.zeros((num_moments + 1, NUM_KEYS), dtype=np.int32)
+        np.add.at(changes, (held_from, keys), 1)
+        np.add.at(changes, (held_until, keys), -1)
+        held = np.cumsum(changes[:num_moments], axis=0) > 0
+
+        templates = np.zeros((num_moments, NUM_KEYS), dtype=np.float32)
+        templates[held] = held_weight
+        templates[notes['moment'], keys] = 1.0
+        return templates
+
+    def build_moments(self, start: int, stop: int) -> list[Moment]:
+        """Moments start..stop - 1 as dataclasses."""
+        first_event, last_event = int(self.event_starts[start]), int(self.event_starts[stop])
+        first_note, last_note = int(self.note_starts[first_event]), int(self.note_starts[last_event])
+        note_slice = self.notes[first_note:last_note]
+        notes = [Note(self.pitch_names[pitch], duration, STAVES[staff]) for pitch, duration, staff in
+                 zip(note_slice['pitch'].tolist(), quarter_lengths(note_slice['duration']),
+                     note_slice['staff'].tolist())]
+        event_slice = self.events[first_event:last_event]
+        note_starts = (self.note_starts[first_event:last_event + 1] - first_note).tolist()
+        events = []
+        for index, (kind, staff, duration) in enumerate(zip(event_slice['kind'].tolist(),
+                                                            event_slice['staff'].tolist(),
+                                                            quarter_lengths(event_slice['duration']))):
+            if kind == EVENT_CHORD:
+                events.append(Chord(notes[note_starts[index]:note_starts[index + 1]], duration, STAVES[staff]))
+            elif kind == EVENT_NOTE:
+                events.append(notes[note_starts[index]])
+            else:
+                events.append(Rest(duration, STAVES[staff]))
+        event_starts = (self.event_starts[start:stop + 1] - first_event).tolist()
+        return [Moment(events[event_starts[index]:event_starts[index + 1]], offset)
+                for index, offset in enumerate(quarter_lengths(self.offsets[start:stop]))]
+
+
+class MomentsView(Sequence):
+    """A CompactScore's moments as Moment dataclasses, built when they are read."""
+
+    __slots__ = ('score',)
+    CHUNK = 256  # Moments built at a time while iterating.
+
+    def __init__(self, score: CompactScore):
+        self.score = score
+
+    def __len__(self) -> int:
+        return len(self.score.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.score.build_moments(start, max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("moment index out of range")
+        return self.score.build_moments(index, index + 1)[0]
+
+    def __iter__(self):
+        for start in range(0, len(self), self.CHUNK):
+            yield from self.score.build_moments(start, min(start + self.CHUNK, len(self)))
+
+
+def quarter_lengths(values: np.ndarray) -> list:
+    """
+    The column as music21 quarterLengths: floats where they are multiples of
+    1/65536, as every binary fraction music21 keeps is, and otherwise the
+    Fraction they were stored from.
+    """
+    result = values.tolist()
+    scaled = values * 65536
+    for index in np.flatnonzero(scaled != np.round(scaled)).tolist():
+        result[index] = _as_fraction(result[index])
+    return result
+
+
+@functools.lru_cache(maxsize=4096)
+def _as_fraction(value: float) -> Fraction:
+    # The same few tuplet durations come up over and over.
+    return Fraction(value).limit_denominator(DENOMINATOR_LIMIT)
+
+
+def as_compact_score(sheet_music) -> CompactScore:
+    """The score as a CompactScore, converting a SheetMusic."""
+    if isinstance(sheet_music, CompactScore):
+        return sheet_music
+    return CompactScore.from_sheet_music(sheet_music)
@@ -0,0 +1,80 @@
+import json
+import threading
+import time
+import numpy as np
+
+# Every timestamp in the pipeline comes from this clock. It is monotonic, and on
+# Linux and macOS it is shared by all processes, so detector-process timestamps
+# can be compared with UI timestamps.
+now = time.perf_counter
+
+
+class RollingHistogram:
+    """The last `size` durations of one stage, kept in a fixed array."""
+
+    def __init__(self, size: int = 1024):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.count = 0
+
+    def add(self, seconds: float):
+        self.values[self.count % len(self.values)] = seconds
+        self.count += 1
+
+    def percentiles(self, quantiles=(50, 95, 99)) -> list[float]:
+        filled = self.values[:min(self.count, len(self.values))]
+        return list(np.percentile(filled, quantiles)) if len(filled) else [float('nan')] * len(quantiles)
+
+
+class LatencyTracker:
+    """
+    Rolling per-stage latency histograms. Recording is an array store and a
+    counter bump, cheap enough to leave on. Percentiles are only computed
+    when a summary is asked for.
+    """
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self.histograms: dict[str, RollingHistogram] = {}
+        self.lock = threading.Lock()  # Only taken when a stage is seen for the first time.
+
+    def record(self, stage: str, seconds: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(stage, RollingHistogram(self.size))
+        histogram.add(seconds)
+
+    def record_since(self, stage: str, start: float) -> float:
+        """Records now() - start for `stage` and returns now(), to chain stages."""
+        end = now()
+        self.record(stage, end - start)
+        return end
+
+    def summary(self) -> dict:
+        """{stage: {'count', 'p50_ms', 'p95_ms', 'p99_ms'}} over each stage's rolling window."""
+        result = {}
+        for stage, histogram in sorted(self.histograms.items()):
+            p50, p95, p99 = (round(value * 1000, 3) for value in histogram.percentiles())
+            result[stage] = {'count': histogram.count, 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99}
+        return result
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+
+def format_summary(summary: dict) -> str:
+    lines = [f"{'stage':<32}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for stage, stats in summary.items():
+        lines.append(f"{stage:<32}{stats['count']:>7}{stats['p50_ms']:>10.2f}"
+                     f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    return "\n".join(lines)
+
+
+def dump_summary(summary: dict, path: str):
+    with open(path, 'w') as f:
+        json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'stages': summary}, f, indent=2)
+
+
+# One tracker per process. The detectors record into it directly.
+latency = LatencyTracker()
@@ -0,0 +1,64 @@
+import threading
+
+
+class Mailbox:
+    """
+    Latest-value hand-off from a detector thread to the UI.
+
+    put() overwrites the current value and bumps a generation number, so a
+    reader that falls behind gets the newest state instead of a backlog, and
+    memory stays constant. When `key` is given, a value whose key matches the
+    current one is dropped: nothing the UI shows would change. A value for
+    which `hold` is true (a confirmation) is kept until it has been taken, so
+    later states can't overwrite it before the UI sees it. `on_change` is
+    called from the producer's thread after each accepted put; the app passes
+    a Kivy Clock trigger, which coalesces wake-ups to at most one per frame.
+
+    put() also lets a Mailbox stand in for the queue.Queue detectors write to.
+    """
+
+    def __init__(self, key=None, hold=None, on_change=None):
+        self.key = key
+        self.hold = hold
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.value = None
+        self.value_key = None
+        self.held = False
+        self.generation = 0
+        self.taken_generation = 0
+
+    def put(self, value):
+        value_key = self.key(value) if self.key else None
+        with self.lock:
+            if self.held:
+                return
+            if self.key and self.value is not None and value_key == self.value_key:
+                return
+            self.value = value
+            self.value_key = value_key
+            self.held = bool(self.hold and self.hold(value))
+            self.generation += 1
+        if self.on_change:
+            self.on_change()
+
+    def take(self):
+        """
+        Returns the value if it has changed since the last take(), else None.
+        Meant for the one consumer; taking a held value releases it.
+        """
+        with self.lock:
+            if self.generation == self.taken_generation:
+                return None
+            self.taken_generation = self.generation
+            self.held = False
+            return self.value
+
+    def clear(self):
+        """Forgets the current value, e.g. when its detector stops."""
+        with self.lock:
+            self.value = None
+            self.value_key = None
+            self.held = False
+            self.generation += 1
+            self.taken_generation = self.generation
@@ -0,0 +1,13 @@
+import os
+
+
+def cache_dir(*parts: str) -> str:
+    """
+    Returns (and creates) a directory under the app's cache root.
+    The root is ~/.cache/piano-note-recognition unless PIANO_TUTOR_CACHE is set.
+    """
+    root = os.environ.get('PIANO_TUTOR_CACHE') or os.path.join(os.path.expanduser('~'), '.cache',
+                                                                 'piano-note-recognition')
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,88 @@
+"""
+Pitch-name helpers that work without constructing music21 objects, and
+88-bit key masks.
+
+A key mask is an int with bit k set for piano key k (bit 0 is A0, MIDI
+21). Detectors report what they hear as MIDI numbers or masks, and the
+practice engine keeps one mask per moment, so any spelling of a pitch
+(C#4, D-4) matches the same key.
+"""
+import numpy as np
+
+# Fixed spelling for detected pitches, using music21's '-' for flats. music21 itself
+# flips between e.g. A# and B- depending on which way the frequency is detuned.
+NOTE_NAMES = ['C', 'C#', 'D', 'E-', 'E', 'F', 'F#', 'G', 'G#', 'A', 'B-', 'B']
+STEP_SEMITONES = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+ACCIDENTAL_SEMITONES = {'#': 1, '-': -1, 'b': -1}
+
+FIRST_KEY_MIDI = 21  # A0, the lowest piano key.
+NUM_KEYS = 88
+
+
+def midi_to_name(midi: int) -> str:
+    """61 -> 'C#4', 70 -> 'B-4'."""
+    return f"{NOTE_NAMES[midi % 12]}{midi // 12 - 1}"
+
+
+# Every name a detector can produce, indexed by MIDI number.
+MIDI_NAMES = [midi_to_name(midi) for midi in range(128)]
+
+
+def split_name(name: str) -> tuple[str, int, int] | None:
+    """
+    'C#4' -> ('C', 1, 4), 'E-5' / 'Eb5' -> ('E', -1, 5): step, alteration in
+    semitones and octave. Accepts music21's nameWithOctave spelling ('-' for
+    flats) as well as 'b'. Returns None if the name can't be read.
+    """
+    if len(name) < 2 or name[0] not in STEP_SEMITONES:
+        return None
+    index = 1
+    alteration = 0
+    while index < len(name) and name[index] in ACCIDENTAL_SEMITONES:
+        alteration += ACCIDENTAL_SEMITONES[name[index]]
+        index += 1
+    try:
+        octave = int(name[index:])
+    except ValueError:
+        return None
+    return name[0], alteration, octave
+
+
+def name_to_midi(name: str) -> int | None:
+    """'C#4' / 'D-4' / 'Db4' -> 61. Returns None if the name can't be read."""
+    parts = split_name(name)
+    if parts is None:
+        return None
+    step, alteration, octave = parts
+    return (octave + 1) * 12 + STEP_SEMITONES[step] + alteration
+
+
+def midi_to_mask(midi_numbers) -> int:
+    """The key mask of the MIDI numbers that are piano keys."""
+    mask = 0
+    for midi in midi_numbers:
+        key = midi - FIRST_KEY_MIDI
+        if 0 <= key < NUM_KEYS:
+            mask |= 1 << key
+    return mask
+
+
+def name_to_mask(name: str) -> int:
+    """'C#4' / 'D-4' -> the mask of that key; 0 if the name can't be read or is off the keyboard."""
+    midi = name_to_midi(name)
+    return 0 if midi is None else midi_to_mask((midi,))
+
+
+def mask_to_midi(mask: int) -> list[int]:
+    """The MIDI numbers of the keys in a mask, lowest first."""
+    midi_numbers = []
+    while mask:
+        lowest = mask & -mask
+        midi_numbers.append(FIRST_KEY_MIDI + lowest.bit_length() - 1)
+        mask ^= lowest
+    return midi_numbers
+
+
+def keys_to_mask(keys: np.ndarray) -> int:
+    """The mask of a bool array with one entry per key."""
+    return int.from_bytes(np.packbits(keys, bitorder='little').tobytes(), 'little')
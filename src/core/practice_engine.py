@@ -1,48 +1,76 @@
-import music21
-from src.core.sheet_music import SheetMusic, Note, Chord
+import numpy as np
+from src.core.compact_score import CompactScore, as_compact_score
+from src.core.pitch import NUM_KEYS, midi_to_mask
+from src.core.sheet_music import SheetMusic
 
 
 class PracticeEngine:
     def __init__(self):
-        self.sheet_music: SheetMusic | None = None
+        # Held as a CompactScore; its `moments` read like a SheetMusic's.
+        self.sheet_music: CompactScore | None = None
         self.current_moment_index: int = 0
         self.is_listening: bool = False
+        # How many moments, counting the current one, the detectors may match ahead.
+        self.LOOK_AHEAD_MOMENTS = 4
+        self.target_matrix = np.zeros((0, NUM_KEYS), dtype=bool)
+        self.follow_templates = np.zeros((0, NUM_KEYS), dtype=np.float32)
 
-    def load_sheet_music(self, sheet_music: SheetMusic):
-        self.sheet_music = sheet_music
+    def load_sheet_music(self, sheet_music: SheetMusic | CompactScore):
+        self.sheet_music = as_compact_score(sheet_music)
         self.current_moment_index = 0
+        self.target_matrix = self.sheet_music.target_matrix()
+        self.follow_templates = self.sheet_music.follow_templates()
 
-    def get_current_target_notes(self) -> set[str]:
-        if not self.sheet_music or not self.sheet_music.moments: return set()
-        target_notes = set()
-        current_moment = self.sheet_music.moments[self.current_moment_index]
-        for event in current_moment.events:
-            if isinstance(event, Note):
-                target_notes.add(event.pitch)
-            elif isinstance(event, Chord):
-                for note in event.notes:
-                    target_notes.add(note.pitch)
-        return target_notes
-
-    def check_single_note(self, played_note_str: str) -> bool:
+    def get_current_target_notes(self) -> frozenset[str]:
+        """The current moment's pitch names, worked out when the score was loaded."""
+        if not self.sheet_music or not self.sheet_music.moments: return frozenset()
+        return self.sheet_music.target_sets[self.current_moment_index]
+
+    def get_current_target_mask(self) -> int:
+        """The current moment's keys as a key mask (see src.core.pitch)."""
+        if not self.sheet_music or not self.sheet_music.moments: return 0
+        return self.sheet_music.target_masks[self.current_moment_index]
+
+    def compare_keys(self, played_mask: int) -> tuple[int, int]:
+        """(missing, extra): the current moment's keys not played, and the keys played it doesn't ask for."""
+        target_mask = self.get_current_target_mask()
+        return target_mask & ~played_mask, played_mask & ~target_mask
+
+    def get_target_window(self) -> tuple[int, np.ndarray]:
+        """
+        Returns (first moment index, moments x 88 key matrix) for the current
+        moment and the LOOK_AHEAD_MOMENTS - 1 after it. Rows are views into
+        the matrix built when the piece was loaded.
+        """
+        first = self.current_moment_index
+        return first, self.target_matrix[first:first + self.LOOK_AHEAD_MOMENTS]
+
+    def check_single_note(self, played_midi: int) -> bool:
         """
-        Performs a a strict, octave-correct check for single notes.
+        Performs a strict, octave-correct check for single notes, by key, so
+        a played C#4 matches a written D-4.
         This is the method for the single-note detector.
         """
-        target_notes = self.get_current_target_notes()
-        if len(target_notes) != 1: return False
+        target_mask = self.get_current_target_mask()
+        if target_mask.bit_count() != 1: return False
 
-        # A simple, direct, and strict comparison.
-        if played_note_str in target_notes:
-            print(f"Correct (Single Note)! Played: {played_note_str}, Target was: {target_notes}")
+        if midi_to_mask((played_midi,)) == target_mask:
+            print(f"Correct (Single Note)! Played MIDI {played_midi}, Target was: {self.get_current_target_notes()}")
             self.go_to_next_moment()
             return True
 
         return False
 
-    def advance_after_chord(self):
-        """Called by the AppView when the chord detector confirms a correct chord."""
-        print("Correct (Chord)! Advancing.")
+    def advance_after_chord(self, matched_moment: int | None = None):
+        """
+        Called by the AppView when the chord detector confirms a correct chord.
+        A look-ahead match names a later moment; the cursor moves past it.
+        """
+        if matched_moment is not None and matched_moment > self.current_moment_index:
+            print(f"Correct (Chord)! Matched {matched_moment - self.current_moment_index} moments ahead.")
+            self.set_moment(matched_moment)
+        else:
+            print("Correct (Chord)! Advancing.")
         self.go_to_next_moment()
 
     def go_to_next_moment(self):
@@ -61,4 +89,9 @@ class PracticeEngine:
     def set_moment(self, index: int):
         if not self.sheet_music: return
         if 0 <= index < len(self.sheet_music.moments):
-            self.current_moment_index = index
\ No newline at end of file
+            self.current_moment_index = index
+
+
+def build_follow_templates(sheet_music: SheetMusic | CompactScore, held_weight: float = 0.5) -> np.ndarray:
+    """Score-follower templates, one row of 88 keys per moment; see CompactScore.follow_templates."""
+    return as_compact_score(sheet_music).follow_templates(held_weight)
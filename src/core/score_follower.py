@@ -0,0 +1,170 @@
+import collections
+import numpy as np
+
+from src.core.pitch import NUM_KEYS
+
+
+class ScoreFollower:
+    """
+    Follows a play-through of the whole score from per-frame 88-key vectors.
+
+    Alignment is online dynamic time warping restricted to WINDOW moments
+    around the current position. Each frame, every moment in the window may
+    either keep its alignment (the note is still sounding) or take over from
+    the moment before it (the next note was played). Only cost differences
+    are kept, so nothing grows with the length of the performance, and the
+    per-frame work is one WINDOW x 88 product whatever the score length.
+
+    DTW only moves forward, one moment at a time. To follow skips and
+    repeats, the follower keeps the key sets of the last few strikes and,
+    after each strike, sweeps the whole score for the passage that best
+    explains them, SEARCH_SLICE moments per frame. If the sweep finds a
+    clearly better place than the followed one, it jumps there. Per-frame
+    cost stays bounded during a sweep too.
+
+    Templates are moments x 88 key rows (see build_follow_templates in the practice engine). Rows
+    without notes, rests, are left out of the alignment.
+    """
+
+    def __init__(self, templates: np.ndarray, start_moment: int = 0, window: int = 12):
+        self.moment_indices = np.flatnonzero(np.asarray(templates).any(axis=1))
+        self.templates = np.asarray(templates, dtype=np.float32)[self.moment_indices]
+        norms = np.linalg.norm(self.templates, axis=1, keepdims=True)
+        self.templates /= np.maximum(norms, 1e-9)
+        self.num_rows = len(self.moment_indices)
+
+        self.WINDOW = max(1, min(window, self.num_rows))
+        self.ADVANCE_PENALTY = 0.05
+        # On a fresh strike, staying on the same moment costs this much: a new attack
+        # usually starts the next moment, which also makes repeated notes advance.
+        self.ONSET_STAY_PENALTY = 0.3
+        self.HISTORY_LENGTH = 4  # Strikes compared when searching the score.
+        self.MIN_SEARCH_STRIKES = 2  # Finished strikes needed before a search may jump.
+        self.SEARCH_SLICE = 256
+        self.JUMP_MARGIN = 0.15  # How much better a found passage must explain the strikes.
+
+        self.cost = np.empty(self.WINDOW, dtype=np.float32)
+        self.step = np.empty(self.WINDOW, dtype=np.float32)
+        self.local = np.empty(self.WINDOW, dtype=np.float32)
+        self.frame = np.empty(NUM_KEYS, dtype=np.float32)
+        self.strikes = collections.deque(maxlen=self.HISTORY_LENGTH)
+        self.current_strike = np.zeros(NUM_KEYS, dtype=np.float32)
+        self.reset(start_moment)
+
+    @property
+    def position(self) -> int:
+        """Moment index the performer is at."""
+        if not self.num_rows:
+            return 0
+        return int(self.moment_indices[self.row])
+
+    def reset(self, moment_index: int = 0):
+        """Starts following at `moment_index` (or the first moment with notes after it)."""
+        self.row = min(int(np.searchsorted(self.moment_indices, moment_index)), max(self.num_rows - 1, 0))
+        self.window_start = self._window_start_for(self.row)
+        self.cost.fill(np.inf)
+        if self.num_rows:
+            self.cost[self.row - self.window_start] = 0
+        self.heard_anything = False  # The first strike after a reset is the moment reset to.
+        self.strikes.clear()
+        self.current_strike.fill(0)
+        self._stop_search()
+
+    def update(self, keys: np.ndarray, onset: bool = False) -> int:
+        """
+        Aligns one frame. `keys` is the frame's 88-key vector (booleans or
+        activations), `onset` whether a new attack started since the last
+        frame. Returns the moment index the performer is at.
+        """
+        if not self.num_rows:
+            return 0
+        np.copyto(self.frame, keys, casting='unsafe')
+        norm = float(np.linalg.norm(self.frame))
+        if norm == 0:
+            return self.position  # Silence says nothing about where the performer is.
+        self.frame /= norm
+
+        onset = onset and self.heard_anything
+        self.heard_anything = True
+        if onset and self.current_strike.any():
+            self.strikes.append(self.current_strike / np.linalg.norm(self.current_strike))
+            self.current_strike = np.zeros(NUM_KEYS, dtype=np.float32)
+        np.maximum(self.current_strike, self.frame, out=self.current_strike)
+
+        window = self.templates[self.window_start:self.window_start + self.WINDOW]
+        np.dot(window, self.frame, out=self.local)
+        np.subtract(1, self.local, out=self.local)
+
+        # Stay on a moment, or advance from the one before it.
+        np.copyto(self.step, self.cost)
+        if onset:
+            self.step += self.ONSET_STAY_PENALTY
+        self.step[1:] = np.minimum(self.step[1:], self.cost[:-1] + self.ADVANCE_PENALTY)
+        np.add(self.step, self.local, out=self.cost)
+        self.cost -= self.cost.min()  # Only differences matter; this keeps the values bounded.
+
+        # The followed path only moves forward, so moments it has left can't take it back.
+        self.row = max(self.row, self.window_start + int(np.argmin(self.cost)))
+        self.cost[:self.row - self.window_start] = np.inf
+        self._slide_window()
+
+        if onset or self.search_row:
+            self._search_step()
+        return self.position
+
+    def _window_start_for(self, row: int) -> int:
+        # The window starts at the position, unless that would run it past the end.
+        return max(0, min(row, self.num_rows - self.WINDOW))
+
+    def _slide_window(self):
+        start = self._window_start_for(self.row)
+        shift = start - self.window_start
+        if shift > 0:
+            self.cost[:-shift] = self.cost[shift:]
+            self.cost[-shift:] = np.inf
+            self.window_start = start
+
+    def _stop_search(self):
+        self.search_row = 0
+        self.best_row = -1
+        self.best_score = -np.inf
+
+    def _strike_history(self) -> np.ndarray:
+        """The recent strikes, oldest first, ending with the one still sounding."""
+        current = self.current_strike / max(float(np.linalg.norm(self.current_strike)), 1e-9)
+        return np.vstack([*self.strikes, current])
+
+    def _sequence_scores(self, history: np.ndarray, first: int, last: int) -> np.ndarray:
+        """Mean cosine of the strikes against the moments ending at each row in [first, last)."""
+        depth = len(history)
+        low = max(0, first - depth + 1)
+        similarity = self.templates[low:last] @ history.T
+        rows = np.arange(first, last)
+        scores = np.zeros(len(rows), dtype=np.float32)
+        for back in range(depth):
+            source = rows - back
+            valid = source >= 0
+            scores[valid] += similarity[source[valid] - low, depth - 1 - back]
+        return scores / depth
+
+    def _search_step(self):
+        """Scores the next SEARCH_SLICE rows; after a full sweep, jumps if a better passage was found."""
+        history = self._strike_history()
+        last = min(self.search_row + self.SEARCH_SLICE, self.num_rows)
+        scores = self._sequence_scores(history, self.search_row, last)
+        best = int(np.argmax(scores))
+        if scores[best] > self.best_score:
+            self.best_score, self.best_row = float(scores[best]), self.search_row + best
+        self.search_row = last
+        if self.search_row < self.num_rows:
+            return
+
+        here = float(self._sequence_scores(history, self.row, self.row + 1)[0])
+        if (len(self.strikes) >= self.MIN_SEARCH_STRIKES and self.best_row >= 0 and self.best_row != self.row
+                and self.best_score > here + self.JUMP_MARGIN):
+            self.row = self.best_row
+            self.window_start = self._window_start_for(self.row)
+            self.cost.fill(np.inf)
+            self.cost[self.row - self.window_start] = 0
+        self._stop_search()
+
@@ -1,21 +1,21 @@
 from dataclasses import dataclass, field
 from typing import List, Union
 
-@dataclass
+@dataclass(slots=True)
 class Note:
     """Represents a single musical note."""
     pitch: str
     duration: float
     staff: str  # <-- ADDED: 'treble' or 'bass'
 
-@dataclass
+@dataclass(slots=True)
 class Chord:
     """Represents multiple notes played at the same time in a single hand/staff."""
     notes: List[Note]
     duration: float
     staff: str  # <-- ADDED: 'treble' or 'bass'
 
-@dataclass
+@dataclass(slots=True)
 class Rest:
     """Represents a period of silence."""
     duration: float
@@ -23,13 +23,13 @@ class Rest:
 
 MusicalEvent = Union[Note, Chord, Rest]
 
-@dataclass
+@dataclass(slots=True)
 class Moment:
     """Represents a single point in time, containing all events that start at this offset."""
     events: List[MusicalEvent]
     offset: float
 
-@dataclass
+@dataclass(slots=True)
 class SheetMusic:
     """Represents the entire piece of music as a sequence of Moments."""
     moments: List[Moment] = field(default_factory=list)
\ No newline at end of file
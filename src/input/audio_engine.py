@@ -0,0 +1,182 @@
+import threading
+import weakref
+import numpy as np
+
+from src.core.latency import now
+from src.input.audio_source import AudioSource, MicrophoneSource
+
+
+class RingBuffer:
+    """
+    Single-producer ring buffer of float32 samples.
+    The capture callback is the only writer. It copies the block in and then
+    publishes it by bumping a monotonic sample counter, so readers never take a
+    lock and never hold up the audio thread.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.write_count = 0  # Total samples ever written; only the writer touches it.
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            self.write_count += n - self.capacity
+            n = self.capacity
+        start = self.write_count % self.capacity
+        first = min(n, self.capacity - start)
+        self.buffer[start:start + first] = samples[:first]
+        self.buffer[:n - first] = samples[first:]
+        self.write_count += n  # Publish only after the data is in place.
+
+    def copy_out(self, position: int, out: np.ndarray):
+        """Copies len(out) samples starting at the absolute sample `position`."""
+        n = len(out)
+        start = position % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.buffer[start:start + first]
+        out[first:] = self.buffer[:n - first]
+
+
+class RingReader:
+    """An independent read cursor into the engine's ring buffer."""
+
+    def __init__(self, engine: 'AudioEngine', position: int):
+        self.engine = engine
+        self.position = position
+        self.dropped_samples = 0
+
+    def read(self, num_samples: int, timeout: float = 0.1, out: np.ndarray | None = None) -> np.ndarray | None:
+        """
+        Returns the next `num_samples` samples, or None if they did not arrive
+        within `timeout` seconds. If the reader fell so far behind that the
+        writer lapped it, the oldest audio is skipped rather than returned stale.
+        Pass `out` to reuse a float32 buffer instead of allocating one per call.
+        """
+        ring = self.engine.ring
+        if not self.engine.wait_for(self.position + num_samples, timeout):
+            return None
+
+        oldest_available = ring.write_count - ring.capacity
+        if self.position < oldest_available:
+            self.dropped_samples += oldest_available - self.position
+            self.position = oldest_available
+
+        if out is None:
+            out = np.empty(num_samples, dtype=np.float32)
+        ring.copy_out(self.position, out)
+        self.position += num_samples
+        self.engine.reader_advanced()
+        return out
+
+    def skip_to_latest(self, keep: int = 0):
+        """Moves the cursor to the newest audio, keeping `keep` samples of history."""
+        ring = self.engine.ring
+        self.position = max(0, ring.write_count - min(keep, ring.capacity))
+
+
+class AudioEngine:
+    """
+    Owns the one input stream for the whole session.
+    The source (the microphone unless another AudioSource is given) is opened
+    once and every block is written into a shared ring buffer. Detectors each
+    take a RingReader, so switching the active detector or its target never
+    closes or reopens the device.
+    """
+
+    def __init__(self, source: AudioSource | None = None):
+        self.source = source or MicrophoneSource()
+        self.SAMPLE_RATE = self.source.SAMPLE_RATE
+        self.BLOCK_SIZE = self.source.BLOCK_SIZE
+        self.RING_SECONDS = 4
+        self.ring = RingBuffer(self.SAMPLE_RATE * self.RING_SECONDS)
+        self.data_available = threading.Condition()
+        # Non-live sources wait on this for the slowest reader to make room.
+        self.space_available = threading.Condition()
+        self.readers = weakref.WeakSet()
+        self.readers_lock = threading.Lock()
+        # When the newest sample was captured, for latency timestamps.
+        self.capture_time = now()
+        self.capture_position = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self.source.is_running
+
+    def write_block(self, samples: np.ndarray, captured_at: float | None = None):
+        """
+        Called by the source with each new block of float32 samples.
+        `captured_at` is when the block's last sample was captured, if the source knows.
+        """
+        self.ring.write(samples)
+        self.capture_time = captured_at if captured_at is not None else now()
+        self.capture_position = self.ring.write_count
+        # Never block the audio thread: if a reader holds the lock right now it
+        # will pick the new data up on its next timed wait.
+        if self.data_available.acquire(blocking=False):
+            try:
+                self.data_available.notify_all()
+            finally:
+                self.data_available.release()
+
+    def wait_for(self, sample_count: int, timeout: float) -> bool:
+        """Blocks until at least `sample_count` samples have been written in total."""
+        if self.ring.write_count >= sample_count:
+            return True
+        with self.data_available:
+            return self.data_available.wait_for(lambda: self.ring.write_count >= sample_count, timeout)
+
+    def capture_time_of(self, position: int) -> float:
+        """Estimated capture time of the sample at absolute `position`, on the latency clock."""
+        return self.capture_time - (self.capture_position - position) / self.SAMPLE_RATE
+
+    def has_readers(self) -> bool:
+        with self.readers_lock:
+            return len(self.readers) > 0
+
+    def wait_for_space(self, num_samples: int, stop_event: threading.Event) -> bool:
+        """
+        Blocks a non-live source until writing `num_samples` more would not
+        overwrite audio some reader hasn't read yet. With no readers at all (say
+        a detector between stop and restart) it waits for one, so the source
+        pauses instead of playing on to nobody. Returns False if stopped.
+        """
+        needed_position = self.ring.write_count + num_samples - self.ring.capacity
+        with self.space_available:
+            while not stop_event.is_set():
+                with self.readers_lock:
+                    slowest = min((reader.position for reader in self.readers), default=None)
+                if slowest is not None and slowest >= needed_position:
+                    return True
+                # Timed, as readers only notify when they can take the lock without waiting.
+                self.space_available.wait(0.01)
+        return False
+
+    def reader_advanced(self):
+        if self.source.is_live:
+            return
+        if self.space_available.acquire(blocking=False):
+            try:
+                self.space_available.notify_all()
+            finally:
+                self.space_available.release()
+
+    def reader(self, history: int = 0) -> RingReader:
+        """Creates a reader positioned at the newest audio, with `history` samples of lead-in."""
+        reader = RingReader(self, 0)
+        reader.skip_to_latest(history)
+        with self.readers_lock:
+            self.readers.add(reader)
+        return reader
+
+    def start(self):
+        if self.is_running: return
+        self.source.start(self)
+        print(f"--- AudioEngine: Capture started ({type(self.source).__name__}) ---")
+
+    def stop(self):
+        if not self.is_running: return
+        self.source.stop()
+        print("--- AudioEngine: Capture stopped ---")
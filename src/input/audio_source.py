@@ -0,0 +1,213 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+
+from src.core.latency import latency, now
+from src.core.sheet_music import SheetMusic
+
+
+class AudioSource(ABC):
+    """
+    Where the AudioEngine's samples come from.
+
+    A source delivers mono float32 blocks in [-1, 1] at SAMPLE_RATE by calling
+    engine.write_block(). Live sources (the microphone) deliver whenever the
+    hardware has audio. Recorded and generated sources can instead run as fast
+    as the detectors keep up: the engine then holds the writer back until every
+    reader has room, so nothing is dropped.
+    """
+
+    is_live = False
+
+    def __init__(self):
+        self.SAMPLE_RATE = 44100
+        self.BLOCK_SIZE = 512
+
+    @property
+    @abstractmethod
+    def is_running(self) -> bool: ...
+
+    @abstractmethod
+    def start(self, engine): ...
+
+    @abstractmethod
+    def stop(self): ...
+
+
+class MicrophoneSource(AudioSource):
+    """The default input device, opened once through PyAudio in callback mode."""
+
+    is_live = True
+
+    def __init__(self):
+        super().__init__()
+        self.pyaudio_instance = None
+        self.stream = None
+        self.callback_result = None
+        self.engine = None
+        self.input_latency = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self.stream is not None
+
+    def _audio_callback(self, in_data, frame_count, time_info, status):
+        # PortAudio's stream clock says how long ago the block's first sample hit the ADC.
+        # Some host APIs leave it at zero; the stream's nominal input latency stands in then.
+        device_delay = time_info['current_time'] - time_info['input_buffer_adc_time']
+        if device_delay <= 0:
+            device_delay = self.input_latency
+        latency.record('capture.device_buffer', device_delay)
+        captured_at = now() - device_delay + frame_count / self.SAMPLE_RATE
+        self.engine.write_block(np.frombuffer(in_data, dtype=np.float32), captured_at)
+        return self.callback_result
+
+    def start(self, engine):
+        if self.is_running: return
+        # Imported here so the detectors can run offline on machines without PortAudio.
+        import pyaudio
+        self.engine = engine
+        self.callback_result = (None, pyaudio.paContinue)
+        self.pyaudio_instance = pyaudio.PyAudio()
+        self.stream = self.pyaudio_instance.open(format=pyaudio.paFloat32, channels=1, rate=self.SAMPLE_RATE,
+                                                 input=True, frames_per_buffer=self.BLOCK_SIZE,
+                                                 stream_callback=self._audio_callback)
+        self.input_latency = self.stream.get_input_latency()
+        self.stream.start_stream()
+
+    def stop(self):
+        if not self.is_running: return
+        stream, self.stream = self.stream, None
+        stream.stop_stream()
+        stream.close()
+        self.pyaudio_instance.terminate()
+        self.pyaudio_instance = None
+
+
+class ArraySource(AudioSource):
+    """
+    Plays a NumPy array into the engine from a background thread.
+
+    With realtime=False (the default) blocks are written as fast as the slowest
+    reader consumes them; with realtime=True they are paced to the wall clock
+    like a microphone. Samples at another rate are resampled on construction.
+    Writing only begins once a detector has taken a reader, so nothing is
+    played to an empty room. `finished` is set after the last block.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int = 44100, realtime: bool = False):
+        super().__init__()
+        self.samples = _to_mono_float32(samples, sample_rate, self.SAMPLE_RATE)
+        self.realtime = realtime
+        self.thread = None
+        self.stop_event = None
+        self.finished = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.SAMPLE_RATE
+
+    def _play(self, engine, stop_event: threading.Event):
+        while not engine.has_readers():
+            if stop_event.wait(0.01):
+                return
+        started = time.perf_counter()
+        for start in range(0, len(self.samples), self.BLOCK_SIZE):
+            if stop_event.is_set():
+                return
+            block = self.samples[start:start + self.BLOCK_SIZE]
+            if self.realtime:
+                delay = started + start / self.SAMPLE_RATE - time.perf_counter()
+                if delay > 0:
+                    stop_event.wait(delay)
+            elif not engine.wait_for_space(len(block), stop_event):
+                return
+            engine.write_block(block)
+        self.finished.set()
+
+    def start(self, engine):
+        if self.is_running: return
+        self.finished.clear()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._play, args=(engine, self.stop_event), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.is_running: return
+        self.stop_event.set()
+        self.thread.join()
+
+
+class FileSource(ArraySource):
+    """
+    A recording on disk. WAV files are read with the standard library; FLAC and
+    anything else libsndfile understands need the optional `soundfile` package.
+    """
+
+    def __init__(self, path: str, realtime: bool = False):
+        samples, sample_rate = read_audio_file(path)
+        super().__init__(samples, sample_rate, realtime)
+        self.path = path
+
+
+class SynthSource(ArraySource):
+    """
+    A SheetMusic rendered to decaying piano-like tones, for exercising the
+    detectors against a known score. `timeline` lists each moment's start time
+    in seconds with the pitches that start there.
+    """
+
+    def __init__(self, sheet_music: SheetMusic, tempo_bpm: float = 90.0, a4_freq: float = 440.0,
+                 realtime: bool = False):
+        from src.input.synth import render_sheet_music
+        samples, self.timeline = render_sheet_music(sheet_music, tempo_bpm, a4_freq=a4_freq)
+        super().__init__(samples, realtime=realtime)
+
+
+def read_audio_file(path: str) -> tuple[np.ndarray, int]:
+    """Returns the file's samples (frames x channels, or mono) and its sample rate."""
+    if path.lower().endswith('.wav'):
+        import wave
+        with wave.open(path, 'rb') as wav_file:
+            width = wav_file.getsampwidth()
+            channels = wav_file.getnchannels()
+            sample_rate = wav_file.getframerate()
+            raw = wav_file.readframes(wav_file.getnframes())
+        if width == 1:
+            samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif width == 3:
+            # 24-bit: widen each little-endian triple to an int32 with the sign in the top byte.
+            triples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+            widened = np.zeros((len(triples), 4), dtype=np.uint8)
+            widened[:, 1:] = triples
+            samples = widened.view('<i4').ravel().astype(np.float32) / 2 ** 31
+        elif width in (2, 4):
+            dtype = '<i2' if width == 2 else '<i4'
+            samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / 2 ** (8 * width - 1)
+        else:
+            raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+        return samples.reshape(-1, channels), sample_rate
+
+    try:
+        import soundfile
+    except ImportError:
+        raise ImportError(f"Reading {path} needs the 'soundfile' package (pip install soundfile)")
+    samples, sample_rate = soundfile.read(path, dtype='float32', always_2d=True)
+    return samples, sample_rate
+
+
+def _to_mono_float32(samples: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+    if sample_rate != target_rate:
+        from math import gcd
+        from scipy.signal import resample_poly
+        divisor = gcd(sample_rate, target_rate)
+        samples = resample_poly(samples, target_rate // divisor, sample_rate // divisor).astype(np.float32)
+    return np.ascontiguousarray(samples)
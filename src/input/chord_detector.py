@@ -1,91 +1,369 @@
-# (imports remain the same)
-import pyaudio, numpy as np, music21, queue, threading, collections
-from scipy.signal import find_peaks
+import numpy as np, queue, threading, collections
+from dataclasses import dataclass
+
+from src.core.latency import latency, now
+from src.core.pitch import FIRST_KEY_MIDI, NUM_KEYS, keys_to_mask, mask_to_midi, name_to_mask
+from src.core.score_follower import ScoreFollower
+from src.input.audio_engine import AudioEngine
+from src.input.constant_q import ConstantQTransform
+from src.input.decimator import Decimator
+from src.input.dsp import FrameProcessor, find_peaks
+from src.input.harmonic_templates import HarmonicTemplateBank
+from src.input.note_mapper import NoteMapper
+from src.input.onset_detector import OnsetDetector
+
+
+@dataclass(slots=True)
+class Targets:
+    """
+    What one set_target_notes() call asked for. A new one is built whole and
+    swapped in, and each frame reads one of them, so the analysis thread never
+    matches against half of an update.
+    """
+    bits: dict[str, int]  # Target name -> its key's bit; 0 if the name isn't a piano key.
+    mask: int
+    template_bank: HarmonicTemplateBank
+    # Confirmation history: the furthest window row matched per frame (0 is the current moment, -1 nothing).
+    history: collections.deque
+    window: np.ndarray | None = None  # Look-ahead rows (moments x 88 keys), or None.
+    # Rows that can match: ones asking for a key no earlier row of the window does.
+    window_eligible: np.ndarray | None = None
+    first_moment: int = 0  # Index of the window's first row.
 
 
 class ChordDetector:
-    def __init__(self, update_queue: queue.Queue):
+    """
+    Verifies a target chord from FFT peaks.
+
+    Two analysis modes are available:
+      - 'chunked': analyse non-overlapping CHUNK-sized blocks (the original behaviour).
+      - 'sliding': keep the last CHUNK samples and re-analyse them every HOP_SIZE
+        samples. Frequency resolution is unchanged but the confirmation buffer
+        fills at hop rate, so a correct chord is confirmed several times sooner.
+
+    and three verification modes:
+      - 'peaks': find every spectral peak and check the targets are among their notes.
+      - 'templates': score only the bins around each target note's harmonics.
+      - 'constant_q': read per-semitone levels from a constant-Q front end, whose
+        longer bass windows separate low notes that CHUNK-sized FFT bins can't.
+
+    With decimation_factor > 1 the captured audio is low-pass filtered and
+    decimated before analysis. CHUNK and HOP_SIZE shrink by the same factor, so
+    each FFT covers the same time span for a fraction of the work. Piano
+    fundamentals stop at ~4.2 kHz, below the decimated Nyquist for factors up to 4.
+    `hop_size` and process_samples() are always in capture-rate samples.
+
+    With onset gating on, a cheap onset detector looks at every hop first and
+    the full verification only runs for ONSET_HOLD_SECONDS after an attack;
+    between notes each hop costs one dot product. A chord is also only
+    confirmed again after a fresh onset, so playing the same chord twice in a
+    row needs two strikes rather than one long sustain.
+
+    Given a look-ahead window (a moments x 88 key matrix from the practice
+    engine), every frame is also scored against all of its rows at once, and a
+    confirmation reports the furthest moment matched, so a student who is
+    already a few notes ahead moves the cursor there in one step.
+
+    In score-following mode (follow_score()), the keys heard in each frame are
+    also aligned to the whole score, and every update reports the moment the
+    performer is at as 'followed_moment'.
+    """
+
+    def __init__(self, update_queue: queue.Queue, audio_engine: AudioEngine | None = None,
+                 analysis_mode: str = 'sliding', hop_size: int = 1024, a4_freq: float = 440.0,
+                 verification_mode: str = 'peaks', decimation_factor: int = 1, onset_gating: bool = True):
+        if analysis_mode not in ('chunked', 'sliding'):
+            raise ValueError(f"Unknown analysis mode: {analysis_mode}")
+        if verification_mode not in ('peaks', 'templates', 'constant_q'):
+            raise ValueError(f"Unknown verification mode: {verification_mode}")
         self.update_queue = update_queue
+        self.audio_engine = audio_engine
         self.is_running = False
         self.thread = None
-        self.CHUNK = 2048 * 4
-        self.FORMAT = pyaudio.paInt16
-        self.CHANNELS = 1
-        self.RATE = 44100
+        self.stop_event = None
+        # Without an engine (process_samples() fed directly), samples are taken to be at 44.1 kHz.
+        self.CAPTURE_RATE = audio_engine.SAMPLE_RATE if audio_engine is not None else 44100
+        self.DECIMATION_FACTOR = decimation_factor
+        self.decimator = Decimator(decimation_factor)
+        self.CHUNK = 2048 * 4 // decimation_factor
+        self.RATE = self.CAPTURE_RATE // decimation_factor
+        # The engine captures float32 in [-1, 1]; the thresholds below were tuned on int16 samples.
+        self.INT16_SCALE = 32768.0
+        self.ANALYSIS_MODE = analysis_mode
+        self.HOP_SIZE = hop_size // decimation_factor if analysis_mode == 'sliding' else self.CHUNK
+        self.VERIFICATION_MODE = verification_mode
         self.TARGET_NOTE_SET = set()
-        self.PEAK_HEIGHT = 50000
-        self.PEAK_PROMINENCE = 10000
+        self.present_keys = np.zeros(NUM_KEYS, dtype=bool)  # Keys the last verification heard.
+        self.present_mask = 0  # The same, as a key mask.
+        self.follower = None
+        self.last_followed_onset_position = -1
+        # Tuned for an 8192-point FFT; FFT magnitudes grow with the chunk length.
+        self.PEAK_HEIGHT = 50000 * self.CHUNK / 8192
+        self.PEAK_PROMINENCE = 10000 * self.CHUNK / 8192
+        # Template scores must also reach this fraction of the frame's strongest bin,
+        # which rejects the broadband splatter of a note's attack.
+        self.TEMPLATE_RELATIVE_THRESHOLD = 0.1
         self.CONFIRMATION_BUFFER_SIZE = 4
-        self.correctness_history = collections.deque(maxlen=self.CONFIRMATION_BUFFER_SIZE)
 
-    def set_target_notes(self, notes: set[str]):
+        self.constant_q = None
+        if verification_mode == 'constant_q':
+            self.constant_q = ConstantQTransform(self.RATE, a4_freq, max_window=16384 // decimation_factor)
+        # Constant-Q bass atoms are longer than CHUNK, so that mode keeps more history.
+        self.WINDOW_SIZE = self.constant_q.n_fft if self.constant_q else self.CHUNK
+        # A partial of this amplitude gives a PEAK_HEIGHT peak in a Hann-windowed CHUNK FFT.
+        self.CONSTANT_Q_THRESHOLD = self.PEAK_HEIGHT / (self.CHUNK / 4)
+
+        self.analysis_window = np.zeros(self.WINDOW_SIZE, dtype=np.float32)
+        self.hop_buffer = np.empty(self.HOP_SIZE * decimation_factor, dtype=np.float32)
+        self.samples_buffered = 0
+        self.samples_since_analysis = 0
+        self.note_mapper = NoteMapper(a4_freq)
+        self.frame_processor = FrameProcessor(self.CHUNK, self.RATE, note_mapper=self.note_mapper)
+        self.targets = self._build_targets(set())
+
+        self.LATENCY_PREFIX = 'chord'  # Stage names in the latency tracker start with this.
+        self.ONSET_GATING = onset_gating
+        self.SILENCE_RMS = 100
+        self.ONSET_HOLD_SECONDS = 1.5
+        self.onset_detector = OnsetDetector(self.HOP_SIZE, self.RATE, self.SILENCE_RMS, self.ONSET_HOLD_SECONDS)
+        # Absolute capture-rate sample positions. They survive restarts, so audio
+        # re-read as lead-in can't pass for a new strike of an already confirmed chord.
+        self.position = 0
+        self.last_onset_position = -1
+        self.last_confirmed_position = -1
+
+    def set_target_notes(self, notes: set[str], window: tuple[int, np.ndarray] | None = None):
+        """
+        `notes` is the current moment. `window`, when given, is (index of the
+        current moment, moments x 88 key matrix) starting at that moment.
+        """
         print(f"ChordDetector: New target notes set -> {notes}")
         self.TARGET_NOTE_SET = notes
-        # --- FIX: ALWAYS clear the history when a new target is set ---
-        self.correctness_history.clear()
+        # Swapped in whole, like follow_score(); the new targets start with an empty history.
+        self.targets = self._build_targets(notes, window)
+
+    def _build_targets(self, notes: set[str], window: tuple[int, np.ndarray] | None = None) -> Targets:
+        # Targets are matched by key (src.core.pitch masks), so any spelling of a pitch counts.
+        bits = {note: name_to_mask(note) for note in notes}
+        mask = 0
+        for bit in bits.values():
+            mask |= bit
+        targets = Targets(bits, mask, HarmonicTemplateBank(self.CHUNK, self.RATE, note_mapper=self.note_mapper),
+                          collections.deque(maxlen=self.CONFIRMATION_BUFFER_SIZE))
+        template_midi = set(mask_to_midi(mask))
+        if window is not None and len(window[1]):
+            targets.first_moment, targets.window = window[0], np.asarray(window[1], dtype=bool)
+            # A later moment only counts if it asks for a key no earlier row of the window does.
+            # Otherwise the notes still ringing from those rows would match it by themselves.
+            earlier = np.logical_or.accumulate(targets.window, axis=0)
+            targets.window_eligible = targets.window.any(axis=1)
+            targets.window_eligible[1:] &= (targets.window[1:] & ~earlier[:-1]).any(axis=1)
+            template_midi.update(FIRST_KEY_MIDI + np.flatnonzero(targets.window.any(axis=0)))
+        targets.template_bank.set_targets(int(midi) for midi in template_midi)
+        return targets
+
+    def follow_score(self, templates: np.ndarray | None, moment_index: int = 0):
+        """
+        Starts following a play-through from `moment_index`. `templates` is the
+        practice engine's moments x 88 follow_templates; None stops following.
+        """
+        # A fresh follower is swapped in whole, so the analysis thread never sees one half reset.
+        self.follower = ScoreFollower(templates, moment_index) if templates is not None else None
+
+    def match_window(self, targets: Targets) -> int:
+        """Row of the furthest look-ahead moment whose keys were all heard in the last frame, or -1."""
+        if targets.window is None:
+            return -1
+        matched = ~(targets.window & ~self.present_keys).any(axis=1) & targets.window_eligible
+        rows = np.flatnonzero(matched)
+        return int(rows[-1]) if len(rows) else -1
+
+    def warm_up(self):
+        """
+        Runs an FFT of the analysis size and peak picking once on silence, so the
+        first real frame doesn't pay for FFT planning or importing scipy.signal.
+        Uses its own buffers; safe while the analysis thread runs.
+        """
+        spectrum = np.abs(np.fft.rfft(np.zeros(self.CHUNK, dtype=np.float32)))
+        find_peaks(spectrum, height=self.PEAK_HEIGHT)
+
+    def reset_analysis(self):
+        """Forgets buffered audio and confirmation history."""
+        self.analysis_window.fill(0)
+        self.samples_buffered = 0
+        self.samples_since_analysis = 0
+        self.decimator.reset()
+        self.onset_detector.reset()
+        self.targets.history.clear()
 
     def frequency_to_note(self, freq):
-        if freq < 20: return None
-        try:
-            p = music21.pitch.Pitch()
-            p.frequency = freq
-            return p.nameWithOctave
-        except music21.pitch.PitchException:
-            return None
-
-    def verify_chord(self, data):
-        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
-        rms_volume = np.sqrt(np.mean(samples ** 2))
-        if rms_volume < 100:
+        return self.note_mapper.frequency_to_note(freq)
+
+    def verify_chord(self, samples: np.ndarray, targets: Targets):
+        """Checks one chunk of float32 samples (int16 scale) against the target chord."""
+        rms_volume = self.frame_processor.rms(samples[-self.CHUNK:])
+        if rms_volume < self.SILENCE_RMS:
             # If volume is too low, it's definitely not correct
-            return {}, False
+            return self.verify_silence()
+
+        started = now()
+        if self.VERIFICATION_MODE == 'constant_q':
+            result = self._verify_with_constant_q(samples, targets)
+            latency.record_since(f'{self.LATENCY_PREFIX}.constant_q', started)
+            return result
+        magnitude_spectrum = self.frame_processor.magnitude_spectrum(samples)
+        started = latency.record_since(f'{self.LATENCY_PREFIX}.fft', started)
+        if self.VERIFICATION_MODE == 'templates':
+            result = self._verify_with_templates(magnitude_spectrum, targets)
+            latency.record_since(f'{self.LATENCY_PREFIX}.templates', started)
+            return result
 
-        samples *= np.hanning(len(samples))
-        fft_result = np.fft.rfft(samples)
-        fft_freqs = np.fft.rfftfreq(len(samples), 1.0 / self.RATE)
-        magnitude_spectrum = np.abs(fft_result)
         peak_indices, _ = find_peaks(magnitude_spectrum, height=self.PEAK_HEIGHT, prominence=self.PEAK_PROMINENCE)
-        found_peak_freqs = fft_freqs[peak_indices]
-        detected_note_set = {self.frequency_to_note(freq) for freq in found_peak_freqs if self.frequency_to_note(freq)}
-
-        # Check if ALL target notes are present in the detected notes
-        is_subset = self.TARGET_NOTE_SET.issubset(detected_note_set)
-        notes_found_this_chunk = {note: note in detected_note_set for note in self.TARGET_NOTE_SET}
-        return notes_found_this_chunk, is_subset
-
-    def audio_processing_loop(self):
-        p = pyaudio.PyAudio()
-        stream = p.open(format=self.FORMAT, channels=self.CHANNELS, rate=self.RATE,
-                        input=True, frames_per_buffer=self.CHUNK)
-        self.is_running = True
-        print("--- ChordDetector: Listening started ---")
+        started = latency.record_since(f'{self.LATENCY_PREFIX}.find_peaks', started)
+        peak_midi = self.frame_processor.bin_midi[peak_indices]
+        self._set_present_keys(peak_midi[peak_midi >= 0])
+        result = self.match_targets(targets)
+        latency.record_since(f'{self.LATENCY_PREFIX}.note_mapping', started)
+        return result
 
-        while self.is_running:
-            try:
-                data = stream.read(self.CHUNK, exception_on_overflow=False)
-                # --- FIX: Ensure a value is always put in the queue each loop ---
-                found_notes_dict, is_correct_now = self.verify_chord(data)
+    def verify_silence(self):
+        """The result for a frame that isn't worth analysing."""
+        self.present_keys.fill(False)
+        self.present_mask = 0
+        return {}, False
+
+    def match_targets(self, targets: Targets):
+        """
+        Compares present_keys with the targets. Returns ({target name: heard}, whether every
+        target key was heard). A name that isn't a piano key is never heard.
+        """
+        self.present_mask = present_mask = keys_to_mask(self.present_keys)
+        notes_found_this_chunk = {note: bool(present_mask & bit) for note, bit in targets.bits.items()}
+        is_match = present_mask & targets.mask == targets.mask and all(targets.bits.values())
+        return notes_found_this_chunk, is_match
+
+    def _set_present_keys(self, midi_numbers):
+        self.present_keys.fill(False)
+        keys = np.asarray(midi_numbers, dtype=np.intp) - FIRST_KEY_MIDI
+        self.present_keys[keys[(keys >= 0) & (keys < NUM_KEYS)]] = True
+
+    def _verify_with_templates(self, magnitude_spectrum: np.ndarray, targets: Targets):
+        # A note counts as found when its harmonic-weighted level clears the same bar as a peak.
+        scores = targets.template_bank.score(magnitude_spectrum)
+        threshold = max(self.PEAK_HEIGHT, self.TEMPLATE_RELATIVE_THRESHOLD * magnitude_spectrum.max())
+        found_midi = {int(midi) for midi, score in zip(targets.template_bank.target_midi, scores)
+                      if score >= threshold}
+        self._set_present_keys(list(found_midi))
+        return self.match_targets(targets)
 
-                self.correctness_history.append(is_correct_now)
-                is_stable_correct = (len(self.correctness_history) == self.CONFIRMATION_BUFFER_SIZE and
-                                     all(self.correctness_history))
+    def _verify_with_constant_q(self, samples: np.ndarray, targets: Targets):
+        levels = self.constant_q.semitone_levels(samples)
+        # Neighbouring keys share some leakage, so also require a local maximum.
+        present = levels >= self.CONSTANT_Q_THRESHOLD
+        present[1:] &= levels[1:] >= levels[:-1]
+        present[:-1] &= levels[:-1] >= levels[1:]
+        self.present_keys[:] = present
+        return self.match_targets(targets)
 
-                update_data = {'found_notes': found_notes_dict, 'is_correct': is_stable_correct}
-                self.update_queue.put(update_data)
+    def _analyse_window(self) -> dict:
+        targets = self.targets  # One set of targets for the whole frame, whatever set_target_notes() does meanwhile.
+        if self.ONSET_GATING and not self.onset_detector.is_active:
+            found_notes_dict, is_correct_now = self.verify_silence()
+        else:
+            found_notes_dict, is_correct_now = self.verify_chord(self.analysis_window, targets)
+
+        started = now()
+        # Every frame in the history must have matched at least the current moment,
+        # so a later row only counts in frames where the current moment was heard too.
+        history = targets.history
+        history.append(max(self.match_window(targets), 0) if is_correct_now else -1)
+        matched_row = min(history)
+        is_stable_correct = len(history) == self.CONFIRMATION_BUFFER_SIZE and matched_row >= 0
+        if self.ONSET_GATING and is_stable_correct:
+            # Each confirmation uses up the onset that led to it.
+            is_stable_correct = self.last_onset_position > self.last_confirmed_position
+            if is_stable_correct:
+                self.last_confirmed_position = self.position
+        analysed = latency.record_since(f'{self.LATENCY_PREFIX}.confirmation', started)
+        update_data = {'found_notes': found_notes_dict, 'is_correct': is_stable_correct,
+                       'present_mask': self.present_mask, 'timestamps': {'analysed': analysed}}
+        if is_stable_correct and targets.window is not None:
+            update_data['matched_moment'] = targets.first_moment + matched_row
+        follower = self.follower
+        if follower is not None:
+            onset = self.last_onset_position > self.last_followed_onset_position
+            self.last_followed_onset_position = self.last_onset_position
+            update_data['followed_moment'] = follower.update(self.present_keys, onset)
+            update_data['timestamps']['analysed'] = latency.record_since(f'{self.LATENCY_PREFIX}.follow', analysed)
+        return update_data
+
+    def process_samples(self, samples: np.ndarray) -> list[dict]:
+        """
+        Feeds float32 capture-rate samples (int16 scale) of any length into the
+        analysis window. Returns one update per completed hop once the window is full.
+        """
+        block_position = self.position
+        self.position += len(samples)
+        samples = self.decimator.process(samples)
+        updates = []
+        position = 0
+        while position < len(samples):
+            take = min(self.HOP_SIZE - self.samples_since_analysis, len(samples) - position)
+            self.analysis_window[:-take] = self.analysis_window[take:]
+            self.analysis_window[-take:] = samples[position:position + take]
+            position += take
+            self.samples_buffered = min(self.samples_buffered + take, self.WINDOW_SIZE)
+            self.samples_since_analysis += take
+
+            if self.samples_since_analysis == self.HOP_SIZE:
+                self.samples_since_analysis = 0
+                if self.ONSET_GATING:
+                    started = now()
+                    if self.onset_detector.process(self.analysis_window[-self.HOP_SIZE:]):
+                        self.last_onset_position = block_position + position * self.DECIMATION_FACTOR
+                    latency.record_since(f'{self.LATENCY_PREFIX}.onset', started)
+                if self.samples_buffered == self.WINDOW_SIZE:
+                    updates.append(self._analyse_window())
+        return updates
+
+    def audio_processing_loop(self, stop_event: threading.Event):
+        self.reset_analysis()
+        # In sliding mode, pre-fill the window from audio captured just before we started.
+        reader = self.audio_engine.reader(history=(self.WINDOW_SIZE - self.HOP_SIZE) * self.DECIMATION_FACTOR)
+        self.position = reader.position
+        print(f"--- ChordDetector: Listening started ({self.ANALYSIS_MODE}) ---")
+
+        while not stop_event.is_set():
+            try:
+                samples = reader.read(len(self.hop_buffer), out=self.hop_buffer)
+                if samples is None:
+                    continue
+                read_at = now()
+                captured_at = self.audio_engine.capture_time_of(reader.position)
+                latency.record(f'{self.LATENCY_PREFIX}.ring_wait', read_at - captured_at)
+                samples *= self.INT16_SCALE
+                # --- FIX: Ensure a value is always put in the queue each loop ---
+                for update_data in self.process_samples(samples):
+                    update_data['timestamps'].update(captured=captured_at, read=read_at, queued=now())
+                    self.update_queue.put(update_data)
             except (IOError, ValueError):
                 # On error, put a "not correct" state in the queue to keep UI updated
                 self.update_queue.put({'found_notes': {}, 'is_correct': False})
                 continue
 
-        if stream: stream.close()
-        p.terminate()
         print("--- ChordDetector: Listening stopped ---")
 
     def start(self):
         if self.is_running: return
         self.is_running = True
-        self.thread = threading.Thread(target=self.audio_processing_loop, daemon=True)
+        # Each run gets its own stop flag, so a quick stop/start never revives the old thread.
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.audio_processing_loop, args=(self.stop_event,), daemon=True)
         self.thread.start()
 
     def stop(self):
-        self.is_running = False
\ No newline at end of file
+        """Stops the analysis thread and waits for it (at most one read timeout) to exit."""
+        if not self.is_running: return
+        self.is_running = False
+        self.stop_event.set()
+        self.thread.join()
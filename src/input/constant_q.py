@@ -0,0 +1,65 @@
+import numpy as np
+
+from src.core.pitch import FIRST_KEY_MIDI, NUM_KEYS
+from src.input.dsp import FFT_SUPPORTS_OUT
+
+
+class ConstantQTransform:
+    """
+    Per-semitone levels from A0 to C8 via a precomputed sparse spectral kernel.
+
+    Each key gets its own windowed complex atom whose length is Q periods of the
+    key's frequency, so bass keys get the long windows they need to be
+    separated while treble keys only look at the last few milliseconds. Atoms
+    are right-aligned in one FFT frame, turned into the frequency domain once
+    and thresholded into a sparse matrix (Brown & Puckette's efficient CQT).
+    Each frame is then one real FFT and one sparse mat-vec.
+
+    `max_window` caps the longest atom. Keys whose Q-period window would be
+    longer get a proportionally lower Q, trading bass resolution for latency.
+    """
+
+    def __init__(self, rate: int = 44100, a4_freq: float = 440.0, max_window: int = 16384,
+                 sparsity: float = 0.01):
+        self.rate = rate
+        self.q_factor = 1.0 / (2 ** (1 / 12) - 1)  # One semitone per bin.
+        self.key_frequencies = a4_freq * 2 ** ((np.arange(NUM_KEYS) + FIRST_KEY_MIDI - 69) / 12)
+        self.window_lengths = np.minimum(np.ceil(self.q_factor * rate / self.key_frequencies),
+                                         max_window).astype(int)
+        self.n_fft = int(2 ** np.ceil(np.log2(self.window_lengths.max())))
+
+        self.kernel = self._build_kernel(sparsity)
+        self.frame = np.empty(self.n_fft, dtype=np.float32)
+        self.spectrum = np.empty(self.n_fft // 2 + 1, dtype=np.complex64)
+        self.levels = np.empty(NUM_KEYS, dtype=np.float32)
+
+    def _build_kernel(self, sparsity: float):
+        from scipy import sparse  # Only the constant-Q verification mode needs it.
+
+        rows = []
+        for freq, length in zip(self.key_frequencies, self.window_lengths):
+            atom = np.zeros(self.n_fft, dtype=np.complex128)
+            n = np.arange(length)
+            # A sinusoid of amplitude A at `freq` correlates to A / 4 against a Hann atom
+            # normalised by its length, hence the factor of 4: levels read as amplitudes.
+            atom[-length:] = 4 * np.hanning(length) / length * np.exp(2j * np.pi * freq * n / self.rate)
+            # Parseval: sum(x * conj(atom)) == sum(X * conj(ATOM)) / n_fft. The atom's energy sits at
+            # positive frequencies, so the real FFT's half spectrum is all we need.
+            row = np.conj(np.fft.fft(atom))[:self.n_fft // 2 + 1] / self.n_fft
+            row[np.abs(row) < sparsity * np.abs(row).max()] = 0
+            rows.append(row)
+        return sparse.csr_matrix(np.array(rows, dtype=np.complex64))
+
+    def semitone_levels(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Returns the level of each key (index 0 = A0) from the newest n_fft
+        samples. Roughly the amplitude of a partial at that key's frequency, in
+        the units of `samples`. The result buffer is reused between calls.
+        """
+        np.copyto(self.frame, samples[-self.n_fft:])
+        if FFT_SUPPORTS_OUT:
+            np.fft.rfft(self.frame, out=self.spectrum)
+        else:
+            self.spectrum[:] = np.fft.rfft(self.frame)
+        np.abs(self.kernel @ self.spectrum, out=self.levels)
+        return self.levels
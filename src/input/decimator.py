@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class Decimator:
+    """
+    Streaming anti-aliased decimation by an integer factor.
+
+    A Kaiser-windowed low-pass FIR is split into `factor` polyphase branches,
+    each run over every factor-th input sample, so only the kept outputs are
+    ever computed (`factor` times fewer multiply-adds than filtering and then
+    dropping samples). Input history and the output phase carry over between
+    calls, so consecutive blocks of any length decimate exactly as if they
+    were one continuous signal.
+    """
+
+    def __init__(self, factor: int, taps_per_phase: int = 32, cutoff: float = 0.9):
+        if factor < 1:
+            raise ValueError(f"Decimation factor must be at least 1, got {factor}")
+        self.factor = factor
+        if factor == 1:
+            taps = np.ones(1)  # process() passes samples straight through.
+        else:
+            from scipy.signal import firwin  # Only decimating front ends need scipy.signal.
+            # `cutoff` is relative to the output Nyquist frequency.
+            taps = firwin(taps_per_phase * factor + 1, cutoff / factor, window=('kaiser', 8.0))
+        self.taps_per_phase = taps_per_phase + 1
+        padded = np.zeros(self.taps_per_phase * factor)
+        padded[:len(taps)] = taps
+        # phase_taps[p, m] == taps[m * factor + p]
+        self.phase_taps = padded.reshape(self.taps_per_phase, factor).T.astype(np.float32).copy()
+        self.history = np.zeros(self.taps_per_phase * factor, dtype=np.float32)
+        self.next_output = 0  # Index into the next block of the next input sample to keep.
+
+    def reset(self):
+        self.history.fill(0)
+        self.next_output = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.factor == 1:
+            return samples
+        factor, taps_per_phase = self.factor, self.taps_per_phase
+        buffer = np.concatenate((self.history, samples))
+        num_outputs = len(range(self.next_output, len(samples), factor))
+        output = np.zeros(num_outputs, dtype=np.float32)
+
+        if num_outputs:
+            first_output = len(self.history) + self.next_output
+            span = (num_outputs + taps_per_phase - 2) * factor + 1
+            for phase in range(factor):
+                start = first_output - phase - (taps_per_phase - 1) * factor
+                output += np.convolve(buffer[start:start + span:factor], self.phase_taps[phase], 'valid')
+
+        self.next_output = (self.next_output - len(samples)) % factor
+        self.history[:] = buffer[len(buffer) - len(self.history):]
+        return output
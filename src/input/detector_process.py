@@ -0,0 +1,197 @@
+import multiprocessing
+import threading
+
+from src.input.audio_engine import AudioEngine
+
+
+class ResultChannel:
+    """
+    Worker side of the result pipe. Each detector gets a queue-like sender
+    tagged with its name, so detectors keep calling update_queue.put(). Every
+    result also carries the sender's generation, the run it belongs to.
+    """
+
+    class Sender:
+        def __init__(self, channel: 'ResultChannel', name: str):
+            self.channel = channel
+            self.name = name
+            self.generation = 0
+
+        def put(self, item):
+            self.channel.send(self.name, item, self.generation)
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.lock = threading.Lock()  # Detector threads share one pipe.
+
+    def sender(self, name: str) -> 'ResultChannel.Sender':
+        return ResultChannel.Sender(self, name)
+
+    def send(self, name: str, item, generation: int = 0):
+        with self.lock:
+            self.connection.send((name, generation, item))
+
+
+def run_worker(command_connection, result_connection, config: dict):
+    """Entry point of the detector process: owns capture and every detector."""
+    # Imported here so the UI process never loads the detectors (or aubio) in process mode.
+    from src.core.latency import latency
+    from src.input.audio_source import FileSource
+    from src.input.chord_detector import ChordDetector
+    from src.input.mic_listener import MicListener
+    from src.input.transcription_detector import TranscriptionDetector
+
+    source = FileSource(config['audio_file'], realtime=True) if config.get('audio_file') else None
+    audio_engine = AudioEngine(source)
+    channel = ResultChannel(result_connection)
+    detector_options = {'a4_freq': config['a4_freq'], 'decimation_factor': config['decimation_factor']}
+    targets = {'engine': audio_engine}
+    senders = {name: channel.sender(name) for name in config['detectors']}
+    for name, sender in senders.items():
+        if name == 'single':
+            targets[name] = MicListener(sender, audio_engine, pitch_estimator=config['pitch_estimator'],
+                                        **detector_options)
+        elif name == 'chord':
+            targets[name] = ChordDetector(sender, audio_engine, **detector_options)
+        elif name == 'transcription':
+            targets[name] = TranscriptionDetector(sender, audio_engine, **detector_options)
+    print(f"--- DetectorProcess: Worker ready ({', '.join(config['detectors'])}) ---")
+
+    try:
+        while True:
+            try:
+                command = command_connection.recv()
+            except EOFError:
+                break  # The UI process is gone.
+            if command is None:
+                break
+            target, method, args = command
+            if target == 'latency':
+                # The per-stage histograms live in this process; the UI asks for a summary.
+                channel.send('latency', latency.summary())
+            elif method == 'set_generation':
+                if target in senders:  # The engine sends no results.
+                    senders[target].generation = args[0]
+            elif method in DetectorProcess.REMOTE_METHODS:
+                getattr(targets[target], method)(*args)
+    finally:
+        for target in targets.values():
+            target.stop()
+        print("--- DetectorProcess: Worker stopped ---")
+
+
+class RemoteDetector:
+    """Stands in for a detector (or the AudioEngine) that lives in the worker process."""
+
+    def __init__(self, process: 'DetectorProcess', name: str):
+        self.process = process
+        self.name = name
+        self.is_running = False
+        # Bumped by every start and stop. Results from the worker carry the generation of the
+        # run that produced them, and any not from the current one are dropped on arrival.
+        self.generation = 0
+
+    def start(self):
+        if self.is_running: return
+        self.is_running = True
+        with self.process.delivery_lock:
+            self.generation += 1
+        self.process.send(self.name, 'set_generation', self.generation)
+        self.process.send(self.name, 'start')
+
+    def stop(self):
+        self.is_running = False
+        with self.process.delivery_lock:
+            self.generation += 1  # Whatever the stopped run left in the pipe is now stale.
+        self.process.send(self.name, 'stop')
+
+    def set_target_notes(self, notes: set[str], window=None):
+        self.process.send(self.name, 'set_target_notes', set(notes), window)
+
+    def warm_up(self):
+        self.process.send(self.name, 'warm_up')
+
+    def follow_score(self, templates, moment_index: int = 0):
+        self.process.send(self.name, 'follow_score', templates, moment_index)
+
+
+class DetectorProcess:
+    """
+    Runs audio capture and the detectors in a separate process, so FFT work
+    and Kivy redraws no longer compete for one GIL.
+
+    Detector events carry their latency timestamps across unchanged, and the
+    worker's per-stage histograms are fetched with request_latency_summary().
+    Capture and its ring buffer live in the worker, next to the detectors
+    that read it; only commands and results cross between the processes.
+    Commands (start, stop, set_target_notes, follow_score) go to the worker
+    over one pipe. Detector results come back over another, where a reader
+    thread hands each one to its detector's output (anything with put(),
+    usually a Mailbox), so the UI hears about results as soon as they arrive.
+    Results still in the pipe when their detector is stopped or restarted are
+    dropped, so a cleared mailbox never gets a stale one. Neither side ever
+    waits for the other.
+    """
+
+    REMOTE_METHODS = ('start', 'stop', 'set_target_notes', 'follow_score', 'warm_up')
+
+    def __init__(self, outputs: dict, a4_freq: float = 440.0, decimation_factor: int = 1,
+                 pitch_estimator: str = 'yin', audio_file: str | None = None):
+        # 'spawn' gives the worker a clean interpreter rather than a fork of the running Kivy app.
+        context = multiprocessing.get_context('spawn')
+        self.command_connection, worker_commands = context.Pipe()
+        self.result_connection, worker_results = context.Pipe(duplex=False)
+        self.command_lock = threading.Lock()
+        # Held while a result is checked and delivered, so once stop() returns none from its run gets through.
+        self.delivery_lock = threading.Lock()
+        self.outputs = outputs
+        detectors = list(outputs)
+        self.worker_latency = {}  # The latest latency summary from the worker.
+        self.audio_engine = RemoteDetector(self, 'engine')
+        self.detectors = {name: RemoteDetector(self, name) for name in detectors}
+
+        config = {'detectors': detectors, 'a4_freq': a4_freq, 'decimation_factor': decimation_factor,
+                  'pitch_estimator': pitch_estimator, 'audio_file': audio_file}
+        self.process = context.Process(target=run_worker, name='detector-process', daemon=True,
+                                       args=(worker_commands, worker_results, config))
+        self.process.start()
+        # The worker holds its own ends now.
+        worker_commands.close()
+        worker_results.close()
+        self.result_thread = threading.Thread(target=self._receive_results, name='detector-results', daemon=True)
+        self.result_thread.start()
+
+    def send(self, target: str, method: str, *args):
+        with self.command_lock:
+            self.command_connection.send((target, method, args))
+
+    def _receive_results(self):
+        """Hands each result to its output as it arrives, until the worker closes its end."""
+        while True:
+            try:
+                name, generation, item = self.result_connection.recv()
+            except (EOFError, OSError):
+                return  # The worker exited; there is nothing more to read.
+            if name == 'latency':
+                self.worker_latency = item
+            else:
+                with self.delivery_lock:
+                    if generation == self.detectors[name].generation:
+                        self.outputs[name].put(item)
+
+    def request_latency_summary(self):
+        """Asks the worker for its latency summary; it lands in `worker_latency` once it arrives."""
+        self.send('latency', 'summary')
+
+    def shutdown(self, timeout: float = 2.0):
+        if self.process.is_alive():
+            with self.command_lock:
+                self.command_connection.send(None)
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+        # The worker's exit closed its end of the result pipe, which ends the reader thread.
+        self.result_thread.join(timeout)
+        self.command_connection.close()
+        self.result_connection.close()
@@ -0,0 +1,51 @@
+import numpy as np
+
+from src.input.note_mapper import NoteMapper
+
+# numpy >= 2.0 can write rfft results into a caller-supplied buffer.
+FFT_SUPPORTS_OUT = np.lib.NumpyVersion(np.__version__) >= '2.0.0'
+
+
+def find_peaks(*args, **kwargs):
+    """scipy.signal.find_peaks, imported on first call so startup doesn't pay for scipy.signal."""
+    from scipy.signal import find_peaks as scipy_find_peaks
+    return scipy_find_peaks(*args, **kwargs)
+
+
+class FrameProcessor:
+    """
+    Allocation-free spectral analysis for fixed-size frames.
+
+    Everything that depends only on (chunk_size, rate) is computed once here:
+    the analysis window, the FFT frequency axis and the bin-to-MIDI lookup.
+    Each frame is then windowed, transformed and reduced to a magnitude
+    spectrum inside preallocated float32/complex64 buffers.
+    """
+
+    def __init__(self, chunk_size: int, rate: int, note_mapper: NoteMapper | None = None):
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self.window = np.hanning(chunk_size).astype(np.float32)
+        self.frequencies = np.fft.rfftfreq(chunk_size, 1.0 / rate).astype(np.float32)
+        # MIDI number of every FFT bin (-1 where the bin isn't a note), so peaks map with one index.
+        self.bin_midi, self.bin_cents = (note_mapper or NoteMapper()).frequencies_to_midi(self.frequencies)
+
+        self.frame = np.empty(chunk_size, dtype=np.float32)
+        self.spectrum = np.empty(len(self.frequencies), dtype=np.complex64)
+        self.magnitude = np.empty(len(self.frequencies), dtype=np.float32)
+
+    def rms(self, samples: np.ndarray) -> float:
+        return float(np.sqrt(np.dot(samples, samples) / len(samples)))
+
+    def magnitude_spectrum(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Returns |rfft(window * samples)|. The result is the processor's own
+        buffer and is overwritten by the next call.
+        """
+        np.multiply(samples, self.window, out=self.frame)
+        if FFT_SUPPORTS_OUT:
+            np.fft.rfft(self.frame, out=self.spectrum)
+        else:
+            self.spectrum[:] = np.fft.rfft(self.frame)
+        np.abs(self.spectrum, out=self.magnitude)
+        return self.magnitude
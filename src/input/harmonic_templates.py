@@ -0,0 +1,97 @@
+import functools
+import numpy as np
+
+from src.input.note_mapper import NoteMapper
+
+
+@functools.lru_cache(maxsize=1024)
+def note_template(midi: int, chunk_size: int, rate: int, a4_freq: float = 440.0,
+                  num_harmonics: int = 4) -> tuple[tuple[np.ndarray, ...], np.ndarray]:
+    """
+    Returns the FFT bins around each harmonic of `midi` and the weight of each
+    harmonic. A harmonic's neighbourhood is every bin within a quarter tone of it,
+    or just the nearest bin where bins are coarser than that (so neighbouring
+    bass semitones don't share bins).
+    Harmonics above Nyquist are dropped and the remaining weights renormalised.
+    Cached, so a note's template is only ever built once per chunk size.
+    """
+    bin_width = rate / chunk_size
+    num_bins = chunk_size // 2 + 1
+    fundamental = a4_freq * 2 ** ((midi - 69) / 12)
+
+    bin_groups = []
+    weights = []
+    for harmonic in range(1, num_harmonics + 1):
+        freq = fundamental * harmonic
+        center = int(round(freq / bin_width))
+        if center >= num_bins - 1:
+            break
+        low = min(center, int(np.ceil(freq * 2 ** (-0.5 / 12) / bin_width)))
+        high = max(center, int(np.floor(freq * 2 ** (0.5 / 12) / bin_width)))
+        bin_groups.append(np.arange(max(low, 1), min(high, num_bins - 1) + 1))
+        weights.append(1.0 / harmonic)
+
+    weights = np.array(weights, dtype=np.float32)
+    return tuple(bin_groups), weights / weights.sum()
+
+
+class HarmonicTemplateBank:
+    """
+    Scores a magnitude spectrum against the current target notes only.
+
+    Setting targets concatenates the cached templates into one flat index, so
+    each frame is scored with a gather, a segmented max and a weighted sum
+    instead of a full-spectrum peak search.
+    """
+
+    def __init__(self, chunk_size: int, rate: int, note_mapper: NoteMapper | None = None, num_harmonics: int = 4):
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self.a4_freq = (note_mapper or NoteMapper()).a4_freq
+        self.num_harmonics = num_harmonics
+        self.target_midi = np.empty(0, dtype=np.int16)
+        self.bin_index = np.empty(0, dtype=np.intp)
+        self.segment_starts = np.empty(0, dtype=np.intp)
+        self.segment_weights = np.empty(0, dtype=np.float32)
+        self.segment_targets = np.empty(0, dtype=np.intp)
+        self.fundamental_segments = np.empty(0, dtype=np.intp)
+
+    def set_targets(self, midi_numbers):
+        """Prepares the flat gather index for a new set of target MIDI numbers."""
+        self.target_midi = np.array(sorted(set(midi_numbers)), dtype=np.int16)
+        bins, starts, weights, targets = [], [], [], []
+        fundamental_segments = []
+        position = 0
+        for target_index, midi in enumerate(self.target_midi):
+            bin_groups, harmonic_weights = note_template(int(midi), self.chunk_size, self.rate,
+                                                         self.a4_freq, self.num_harmonics)
+            if bin_groups:
+                fundamental_segments.append(len(starts))
+            for group, weight in zip(bin_groups, harmonic_weights):
+                bins.append(group)
+                starts.append(position)
+                weights.append(weight)
+                targets.append(target_index)
+                position += len(group)
+
+        self.bin_index = np.concatenate(bins) if bins else np.empty(0, dtype=np.intp)
+        self.segment_starts = np.array(starts, dtype=np.intp)
+        self.segment_weights = np.array(weights, dtype=np.float32)
+        self.segment_targets = np.array(targets, dtype=np.intp)
+        self.fundamental_segments = np.array(fundamental_segments, dtype=np.intp)
+
+    def score(self, magnitude: np.ndarray) -> np.ndarray:
+        """
+        Returns one score per target note (in `target_midi` order): the
+        harmonic-weighted average of the strongest bin near each harmonic,
+        capped by the fundamental's own level. The cap stops a note from
+        being "heard" purely through another note's overtones.
+        """
+        if not len(self.segment_starts):
+            return np.zeros(len(self.target_midi), dtype=np.float32)
+        harmonic_peaks = np.maximum.reduceat(magnitude[self.bin_index], self.segment_starts)
+        weighted = np.bincount(self.segment_targets, weights=harmonic_peaks * self.segment_weights,
+                               minlength=len(self.target_midi))
+        fundamentals = np.zeros(len(self.target_midi))
+        fundamentals[self.segment_targets[self.fundamental_segments]] = harmonic_peaks[self.fundamental_segments]
+        return np.minimum(weighted, fundamentals).astype(np.float32)
@@ -1,70 +1,144 @@
-# This file should contain the robust single-note aubio listener.
-# If you changed it, revert it to this known-good state.
-import pyaudio
 import numpy as np
-import aubio
-import music21
 import queue
 import threading
 import time
 
+from src.core.latency import latency, now
+from src.core.pitch import name_to_midi
+from src.input.audio_engine import AudioEngine
+from src.input.decimator import Decimator
+from src.input.onset_detector import OnsetDetector
+from src.input.pitch_estimators import create_estimator
+
+
 class MicListener:
-    def __init__(self, note_queue: queue.Queue):
+    def __init__(self, note_queue: queue.Queue, audio_engine: AudioEngine, a4_freq: float = 440.0,
+                 decimation_factor: int = 1, onset_gating: bool = True, pitch_estimator: str = 'yin'):
         self.note_queue = note_queue
+        self.audio_engine = audio_engine
         self.is_running = False
         self.thread = None
-        self.BUFFER_SIZE = 2048
-        self.SAMPLE_RATE = 44100
-        self.FORMAT = pyaudio.paFloat32
-        self.pitch_detector = aubio.pitch("yin", self.BUFFER_SIZE, self.BUFFER_SIZE, self.SAMPLE_RATE)
-        self.pitch_detector.set_unit("Hz")
-        self.pitch_detector.set_silence(-40)
+        self.stop_event = None
+        # With decimation, the estimator sees the same 46 ms per buffer at a lower rate.
+        self.DECIMATION_FACTOR = decimation_factor
+        self.decimator = Decimator(decimation_factor)
+        self.BUFFER_SIZE = 2048 // decimation_factor
+        self.SAMPLE_RATE = audio_engine.SAMPLE_RATE // decimation_factor
+        # Any name from src.input.pitch_estimators; polyphonic ones report their strongest note.
+        self.PITCH_ESTIMATOR = pitch_estimator
+        self.A4_FREQ = a4_freq
+        # Built on first use by estimator(): aubio is slow to import and to set up.
+        self.pitch_estimator = None
+        self.estimator_lock = threading.Lock()
         self.CONFIDENCE_THRESHOLD = 0.8
-        self.COOLDOWN_SECONDS = 0.5
+        self.COOLDOWN_SECONDS = 0.5  # Only used without onset gating.
+
+        # With onset gating, the estimator only runs shortly after an attack and each attack
+        # yields at most one note, so a re-struck note is reported again.
+        self.ONSET_GATING = onset_gating
+        self.SILENCE_RMS = 0.003  # The ChordDetector's floor of 100 on the int16 scale.
+        self.onset_detector = OnsetDetector(self.BUFFER_SIZE, self.SAMPLE_RATE, self.SILENCE_RMS, hold_seconds=0.5)
+        # Absolute sample positions, kept across restarts so the lead-in can't repeat a note.
+        self.last_onset_position = -1
+        self.last_emitted_onset_position = -1
+        self.last_note_time = 0
+
+    def estimator(self):
+        """The pitch estimator, built on first use. Raises ImportError if its dependency is missing."""
+        if self.pitch_estimator is None:
+            with self.estimator_lock:
+                if self.pitch_estimator is None:
+                    self.pitch_estimator = create_estimator(self.PITCH_ESTIMATOR, self.BUFFER_SIZE,
+                                                            self.SAMPLE_RATE, self.A4_FREQ)
+        return self.pitch_estimator
+
+    def warm_up(self):
+        """Builds the estimator and runs it once, so the first real buffer isn't slowed by setup."""
+        try:
+            estimator = self.estimator()
+        except ImportError as e:
+            print(f"MicListener: pitch estimator unavailable: {e}")
+            return
+        estimator.process(np.zeros(self.BUFFER_SIZE, dtype=np.float32))
+        estimator.reset()
 
-    def _listen_thread(self):
-        p = pyaudio.PyAudio()
-        stream = p.open(format=self.FORMAT, channels=1, rate=self.SAMPLE_RATE,
-                        input=True, frames_per_buffer=self.BUFFER_SIZE)
+    def process_buffer(self, samples: np.ndarray, buffer_position: int) -> str | None:
+        """
+        Runs one capture-rate buffer through the onset gate and the pitch estimator. Returns the
+        note to report, if any. `buffer_position` is the absolute sample position
+        of the buffer's first sample.
+        """
+        started = now()
+        samples = self.decimator.process(samples)
+        if self.ONSET_GATING:
+            if self.onset_detector.process(samples):
+                self.last_onset_position = buffer_position
+            started = latency.record_since('single.onset', started)
+            if not self.onset_detector.is_active or self.last_onset_position <= self.last_emitted_onset_position:
+                return None  # Between notes, or this attack already gave its note.
+        estimate = self.estimator().process(samples)
+        latency.record_since(f'single.{self.PITCH_ESTIMATOR}', started)
+
+        current_time = time.time()
+        if not self.ONSET_GATING and current_time - self.last_note_time < self.COOLDOWN_SECONDS:
+            return None
+
+        if estimate.confidence > self.CONFIDENCE_THRESHOLD and estimate.notes:
+            note_name = estimate.notes[0]
+            self.last_note_time = current_time
+            self.last_emitted_onset_position = self.last_onset_position
+            return note_name
+        return None
+
+    def _listen_thread(self, stop_event: threading.Event):
+        # A little lead-in catches a note struck just before the listener was (re)started.
+        reader = self.audio_engine.reader(history=2 * self.BUFFER_SIZE * self.DECIMATION_FACTOR)
+        self.decimator.reset()
+        self.onset_detector.reset()
+        try:
+            self.estimator().reset()
+        except ImportError as e:
+            print(f"ERROR in MicListener: pitch estimator unavailable: {e}")
+            return
+        self.last_note_time = 0
         print("--- MicListener (Single Note): Listening started ---")
-        last_note_time = 0
 
-        while self.is_running:
+        while not stop_event.is_set():
             try:
-                data = stream.read(self.BUFFER_SIZE, exception_on_overflow=False)
-                samples = np.frombuffer(data, dtype=np.float32)
-                pitch = self.pitch_detector(samples)[0]
-                confidence = self.pitch_detector.get_confidence()
-
-                current_time = time.time()
-                if current_time - last_note_time < self.COOLDOWN_SECONDS:
+                buffer_position = reader.position
+                samples = reader.read(self.BUFFER_SIZE * self.DECIMATION_FACTOR)
+                if samples is None:
                     continue
-
-                if confidence > self.CONFIDENCE_THRESHOLD and pitch > 0:
-                    try:
-                        p_obj = music21.pitch.Pitch()
-                        p_obj.frequency = pitch
-                        note_name = p_obj.nameWithOctave
-                        self.note_queue.put(note_name)
-                        last_note_time = current_time
-                    except music21.pitch.PitchException:
-                        continue
+                read_at = now()
+                captured_at = self.audio_engine.capture_time_of(reader.position)
+                latency.record('single.ring_wait', read_at - captured_at)
+                note_name = self.process_buffer(samples, buffer_position)
+                if note_name is not None:
+                    timestamps = {'captured': captured_at, 'read': read_at, 'analysed': now()}
+                    timestamps['queued'] = timestamps['analysed']
+                    # The practice engine matches 'midi'; the name is for display.
+                    self.note_queue.put({'note': note_name, 'midi': name_to_midi(note_name),
+                                         'timestamps': timestamps})
             except Exception as e:
                 print(f"ERROR in MicListener loop: {e}")
-                time.sleep(1)
+                stop_event.wait(1)
 
         print("--- MicListener (Single Note): Listening stopped ---")
-        if stream: stream.close()
-        if p: p.terminate()
 
     def start(self):
         if self.is_running: return
         self.is_running = True
-        self.thread = threading.Thread(target=self._listen_thread, daemon=True)
+        # Each run gets its own stop flag, so a quick stop/start never revives the old thread.
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._listen_thread, args=(self.stop_event,), daemon=True)
         self.thread.start()
 
     def stop(self):
+        """
+        Stops the listening thread and waits for it, at most one read timeout, so
+        it can't touch the analysis state or report a note once a new run starts.
+        """
         if not self.is_running: return
         self.is_running = False
-        if self.thread:
-            self.thread.join()
\ No newline at end of file
+        self.stop_event.set()
+        self.thread.join()
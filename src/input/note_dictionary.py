@@ -0,0 +1,57 @@
+import os
+import numpy as np
+
+from src.core.paths import cache_dir
+from src.core.pitch import FIRST_KEY_MIDI, NUM_KEYS
+
+DICTIONARY_VERSION = 1
+
+
+def build_note_dictionary(chunk_size: int, rate: int, a4_freq: float = 440.0, max_freq: float = 8000.0,
+                          num_partials: int = 12, inharmonicity: float = 1e-4) -> np.ndarray:
+    """
+    Builds an 88 x bins float32 matrix of expected magnitude spectra, one row per
+    piano key. Each row is a slightly stretched harmonic series (piano strings
+    run sharp in their upper partials) drawn with the Hann window's main lobe,
+    truncated at `max_freq` and normalised to unit length.
+    """
+    bin_width = rate / chunk_size
+    max_freq = min(max_freq, rate / 2)
+    num_bins = min(int(max_freq / bin_width) + 1, chunk_size // 2 + 1)
+    bin_positions = np.arange(num_bins)
+    dictionary = np.zeros((NUM_KEYS, num_bins), dtype=np.float64)
+
+    for key in range(NUM_KEYS):
+        fundamental = a4_freq * 2 ** ((FIRST_KEY_MIDI + key - 69) / 12)
+        for partial in range(1, num_partials + 1):
+            freq = partial * fundamental * np.sqrt(1 + inharmonicity * partial ** 2)
+            if freq >= max_freq:
+                break
+            offset = bin_positions - freq / bin_width
+            near = np.abs(offset) < 2  # The Hann main lobe is four bins wide.
+            # Magnitude response of a Hann window, sinc(x) / (1 - x^2), normalised to 1 at x = 0.
+            x = offset[near]
+            denominator = 1 - x ** 2
+            lobe = np.full_like(x, 0.5)  # The limit at |x| = 1.
+            regular = np.abs(denominator) > 1e-9
+            lobe[regular] = np.abs(np.sinc(x[regular]) / denominator[regular])
+            dictionary[key, near] += lobe / partial
+
+    dictionary /= np.linalg.norm(dictionary, axis=1, keepdims=True)
+    return dictionary.astype(np.float32)
+
+
+def load_note_dictionary(chunk_size: int, rate: int, a4_freq: float = 440.0) -> np.ndarray:
+    """
+    Returns the dictionary for this analysis shape, memory-mapped from the cache.
+    It is built and written on first use only.
+    """
+    file_name = f"note_dictionary_v{DICTIONARY_VERSION}_{chunk_size}_{rate}_{a4_freq:g}.npy"
+    path = os.path.join(cache_dir('dictionaries'), file_name)
+    if not os.path.exists(path):
+        dictionary = build_note_dictionary(chunk_size, rate, a4_freq)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, dictionary)
+        os.replace(temp_path, path)  # Atomic, so a half-written file is never mapped.
+    return np.load(path, mmap_mode='r')
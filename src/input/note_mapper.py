@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.core.pitch import MIDI_NAMES
+
+
+class NoteMapper:
+    """
+    Vectorised Hz -> MIDI conversion for the detectors.
+
+    A whole array of peak frequencies is mapped with one log2, giving the
+    nearest MIDI number and the deviation from it in cents. `a4_freq` lets
+    pianos tuned away from 440 Hz still land on the right notes.
+    """
+
+    MIN_FREQUENCY = 20.0
+
+    def __init__(self, a4_freq: float = 440.0):
+        self.a4_freq = a4_freq
+
+    def frequencies_to_midi(self, frequencies) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (midi, cents) arrays. MIDI numbers are int16 with -1 for
+        frequencies outside the audible/MIDI range; cents are in [-50, 50].
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        valid = frequencies >= self.MIN_FREQUENCY
+        exact = np.full(frequencies.shape, -1.0)
+        exact[valid] = 69 + 12 * np.log2(frequencies[valid] / self.a4_freq)
+        midi = np.rint(exact)
+        cents = (exact - midi) * 100
+
+        midi = midi.astype(np.int16)
+        midi[~valid | (midi < 0) | (midi > 127)] = -1
+        cents[midi < 0] = 0.0
+        return midi, cents
+
+    def frequencies_to_notes(self, frequencies) -> list[tuple[str, float]]:
+        """Returns (note name, cents) for every frequency that maps to a note."""
+        midi, cents = self.frequencies_to_midi(frequencies)
+        return [(MIDI_NAMES[m], float(c)) for m, c in zip(midi, cents) if m >= 0]
+
+    def frequency_to_note(self, freq: float) -> str | None:
+        midi, _ = self.frequencies_to_midi([freq])
+        return MIDI_NAMES[midi[0]] if midi[0] >= 0 else None
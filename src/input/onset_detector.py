@@ -0,0 +1,90 @@
+import collections
+import numpy as np
+
+
+class OnsetDetector:
+    """
+    Cheap attack detector that gates the expensive pitch analysis.
+
+    While the input is below the silence floor each hop costs one dot product.
+    Above it, a small FFT over the last ~46 ms gives the spectral flux: the
+    rise in log magnitude over the previous hop, measured against a one-bin
+    max filter so beating and slight pitch wobble don't count. An onset is a
+    flux spike above both a fixed floor and its recent average. Unlike a
+    wall-clock cooldown, this also fires when the same note is struck again
+    while it is still ringing.
+
+    `is_active` stays true for `hold_seconds` after an onset, or until the
+    signal drops back under the silence floor.
+
+    After reset() the input may already be sounding, say a note still ringing
+    when a listener restarts. Until a full frame has been seen, or a silent hop
+    shows where the sound starts, hops only set the baseline the flux is
+    measured against and are not reported as attacks.
+    """
+
+    def __init__(self, hop_size: int, rate: int, silence_rms: float, hold_seconds: float = 1.5):
+        self.hop_size = hop_size
+        self.SILENCE_RMS = silence_rms
+        self.FLUX_THRESHOLD = 0.1  # Minimum relative rise in log magnitude for an attack.
+        self.FLUX_RATIO = 2.0      # ...and this many times the recent average flux.
+        self.MIN_ONSET_GAP = max(1, int(0.06 * rate / hop_size))  # Hops between onsets.
+        self.HOLD_HOPS = int(hold_seconds * rate / hop_size)
+
+        frame_size = max(hop_size, 2048 * rate // 44100)
+        self.frame = np.zeros(frame_size, dtype=np.float32)
+        self.window = np.hanning(frame_size).astype(np.float32)
+        # Log compression reference: the FFT peak of a sinusoid at the silence floor.
+        self.magnitude_reference = silence_rms * np.sqrt(2) * frame_size / 4
+        self.previous_magnitude = None
+        self.recent_flux = collections.deque(maxlen=max(4, int(0.25 * rate / hop_size)))
+        self.hops_since_onset = None
+        self.priming_samples = 0  # Samples still to see after a reset before reporting attacks.
+
+    def reset(self):
+        self.frame.fill(0)
+        self.previous_magnitude = None
+        self.recent_flux.clear()
+        self.hops_since_onset = None
+        self.priming_samples = len(self.frame)
+
+    @property
+    def is_active(self) -> bool:
+        return self.hops_since_onset is not None and self.hops_since_onset <= self.HOLD_HOPS
+
+    def process(self, samples: np.ndarray) -> bool:
+        """Consumes one hop of samples. Returns True if it contains an onset."""
+        if self.hops_since_onset is not None:
+            self.hops_since_onset += 1
+        self.frame[:-len(samples)] = self.frame[len(samples):]
+        self.frame[-len(samples):] = samples
+
+        if np.sqrt(np.dot(samples, samples) / len(samples)) < self.SILENCE_RMS:
+            self.previous_magnitude = None
+            self.recent_flux.clear()
+            self.hops_since_onset = None  # Silence ends the analysis window early.
+            self.priming_samples = 0
+            return False
+
+        magnitude = np.log1p(np.abs(np.fft.rfft(self.frame * self.window)) / self.magnitude_reference)
+        previous, self.previous_magnitude = self.previous_magnitude, magnitude
+        if self.priming_samples > 0:
+            self.priming_samples -= len(samples)
+            return False
+        if previous is None:
+            # Coming out of silence is an attack by definition.
+            self.hops_since_onset = 0
+            return True
+
+        reference = previous.copy()
+        np.maximum(reference[1:], previous[:-1], out=reference[1:])
+        np.maximum(reference[:-1], previous[1:], out=reference[:-1])
+        flux = np.maximum(magnitude - reference, 0).sum() / (reference.sum() + 1e-9)
+
+        average_flux = np.mean(self.recent_flux) if self.recent_flux else 0.0
+        self.recent_flux.append(flux)
+        recently_fired = self.hops_since_onset is not None and self.hops_since_onset < self.MIN_ONSET_GAP
+        if flux >= self.FLUX_THRESHOLD and flux >= self.FLUX_RATIO * average_flux and not recently_fired:
+            self.hops_since_onset = 0
+            return True
+        return False
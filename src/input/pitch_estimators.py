@@ -0,0 +1,193 @@
+"""
+Interchangeable pitch estimators behind one streaming interface: consecutive
+float32 frames in, a PitchEstimate per frame out. Pick one by name:
+
+    estimator = create_estimator('yin', frame_size=2048, rate=44100)
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+import numpy as np
+
+from src.core.pitch import FIRST_KEY_MIDI, MIDI_NAMES, NUM_KEYS
+from src.input.dsp import FrameProcessor, find_peaks
+from src.input.note_mapper import NoteMapper
+
+
+@dataclass
+class PitchEstimate:
+    """What one frame sounds like. `notes` is strongest first; empty means unvoiced."""
+    notes: list[str] = field(default_factory=list)
+    confidence: float = 0.0
+    frequency: float | None = None  # Fundamental of notes[0], when the estimator measures one.
+
+
+class PitchEstimator(ABC):
+    """Base class. Subclasses set `name` and `polyphonic` and implement process()."""
+
+    name = None
+    polyphonic = False
+
+    def __init__(self, frame_size: int, rate: int, a4_freq: float = 440.0):
+        self.frame_size = frame_size
+        self.rate = rate
+        self.note_mapper = NoteMapper(a4_freq)
+
+    def reset(self):
+        pass
+
+    @abstractmethod
+    def process(self, frame: np.ndarray) -> PitchEstimate: ...
+
+    def _single_note(self, frequency: float, confidence: float) -> PitchEstimate:
+        note_name = self.note_mapper.frequency_to_note(frequency) if frequency > 0 else None
+        if note_name is None:
+            return PitchEstimate(confidence=0.0)
+        return PitchEstimate([note_name], float(confidence), float(frequency))
+
+
+ESTIMATORS: dict[str, type[PitchEstimator]] = {}
+
+
+def register_estimator(cls: type[PitchEstimator]) -> type[PitchEstimator]:
+    """Class decorator that makes an estimator available to create_estimator() by its `name`."""
+    ESTIMATORS[cls.name] = cls
+    return cls
+
+
+def create_estimator(name: str, frame_size: int, rate: int, a4_freq: float = 440.0) -> PitchEstimator:
+    """Builds a registered estimator. Raises ImportError if its optional dependency is missing."""
+    if name not in ESTIMATORS:
+        raise ValueError(f"Unknown pitch estimator '{name}'. Available: {', '.join(sorted(ESTIMATORS))}")
+    return ESTIMATORS[name](frame_size, rate, a4_freq)
+
+
+class AubioEstimator(PitchEstimator):
+    """One of aubio's monophonic pitch methods; the frame is also the hop."""
+
+    method = None
+
+    def __init__(self, frame_size: int, rate: int, a4_freq: float = 440.0):
+        super().__init__(frame_size, rate, a4_freq)
+        import aubio  # Optional; only needed when an aubio estimator is selected.
+        self.detector = aubio.pitch(self.method, frame_size, frame_size, rate)
+        self.detector.set_unit("Hz")
+        self.detector.set_silence(-40)
+
+    def process(self, frame: np.ndarray) -> PitchEstimate:
+        frequency = self.detector(np.asarray(frame, dtype=np.float32))[0]
+        return self._single_note(frequency, self.detector.get_confidence())
+
+
+@register_estimator
+class YinEstimator(AubioEstimator):
+    """aubio's time-domain YIN, the MicListener default."""
+    name = 'yin'
+    method = 'yin'
+
+
+@register_estimator
+class YinFFTEstimator(AubioEstimator):
+    """aubio's spectrally weighted YIN; steadier on bright piano attacks."""
+    name = 'yinfft'
+    method = 'yinfft'
+
+
+@register_estimator
+class PYinEstimator(PitchEstimator):
+    """
+    librosa's probabilistic YIN, as used by assets/singlenoterecognition.py.
+    Much more expensive than aubio's YIN: every frame runs a full Viterbi
+    decode. The confidence is the voiced probability.
+    """
+
+    name = 'pyin'
+
+    def __init__(self, frame_size: int, rate: int, a4_freq: float = 440.0):
+        super().__init__(frame_size, rate, a4_freq)
+        import librosa  # Optional; only needed when pyin is selected.
+        self.librosa = librosa
+        # The lowest pitch needs two periods in the frame.
+        self.fmin = max(librosa.note_to_hz('A0'), 2 * rate / frame_size)
+        self.fmax = min(librosa.note_to_hz('C8'), rate / 4)
+
+    def process(self, frame: np.ndarray) -> PitchEstimate:
+        f0, voiced_flag, voiced_probs = self.librosa.pyin(
+            np.asarray(frame, dtype=np.float32), fmin=self.fmin, fmax=self.fmax, sr=self.rate,
+            frame_length=self.frame_size, center=False)
+        if not voiced_flag[-1]:
+            return PitchEstimate(confidence=float(voiced_probs[-1]))
+        return self._single_note(f0[-1], voiced_probs[-1])
+
+
+@register_estimator
+class FFTPeaksEstimator(PitchEstimator):
+    """
+    Spectral peak picking, as in ChordDetector's 'peaks' mode. Polyphonic but
+    also reports strong harmonics as notes. Peak picking has no graded
+    confidence, so it is 1 when any note clears the threshold and 0 otherwise.
+    """
+
+    name = 'fft-peaks'
+    polyphonic = True
+
+    def __init__(self, frame_size: int, rate: int, a4_freq: float = 440.0):
+        super().__init__(frame_size, rate, a4_freq)
+        self.frame_processor = FrameProcessor(frame_size, rate, note_mapper=self.note_mapper)
+        # ChordDetector's thresholds, tuned on int16 samples and an 8192-point FFT.
+        self.PEAK_HEIGHT = 50000 / 32768 * frame_size / 8192
+        self.PEAK_PROMINENCE = 10000 / 32768 * frame_size / 8192
+
+    def process(self, frame: np.ndarray) -> PitchEstimate:
+        magnitude_spectrum = self.frame_processor.magnitude_spectrum(frame)
+        peak_indices, properties = find_peaks(magnitude_spectrum, height=self.PEAK_HEIGHT,
+                                              prominence=self.PEAK_PROMINENCE)
+        notes = []
+        strongest = None
+        for index in peak_indices[np.argsort(properties['peak_heights'])[::-1]]:
+            midi = self.frame_processor.bin_midi[index]
+            if midi >= 0 and MIDI_NAMES[midi] not in notes:
+                notes.append(MIDI_NAMES[midi])
+                strongest = strongest if strongest is not None else index
+        if not notes:
+            return PitchEstimate()
+        return PitchEstimate(notes, 1.0, float(self.frame_processor.frequencies[strongest]))
+
+
+@register_estimator
+class ConstantQEstimator(PitchEstimator):
+    """
+    Per-key levels from the sparse constant-Q front end. Its bass atoms are
+    longer than one frame, so it keeps its own sample history. Keys that are
+    local maxima above a floor and within RELATIVE_THRESHOLD of the loudest
+    key are reported; the confidence is how far the loudest key clears the floor.
+    """
+
+    name = 'constant-q'
+    polyphonic = True
+
+    def __init__(self, frame_size: int, rate: int, a4_freq: float = 440.0):
+        super().__init__(frame_size, rate, a4_freq)
+        from src.input.constant_q import ConstantQTransform
+        self.constant_q = ConstantQTransform(rate, a4_freq, max_window=16384 * rate // 44100)
+        self.history = np.zeros(max(self.constant_q.n_fft, frame_size), dtype=np.float32)
+        # ChordDetector's constant-Q floor, converted from int16 scale.
+        self.LEVEL_THRESHOLD = 50000 / 32768 / 2048
+        self.RELATIVE_THRESHOLD = 0.2
+
+    def reset(self):
+        self.history.fill(0)
+
+    def process(self, frame: np.ndarray) -> PitchEstimate:
+        self.history[:-len(frame)] = self.history[len(frame):]
+        self.history[-len(frame):] = frame
+        levels = self.constant_q.semitone_levels(self.history)
+        loudest = float(levels.max())
+        if loudest < self.LEVEL_THRESHOLD:
+            return PitchEstimate()
+        padded = np.pad(levels, 1)
+        is_peak = (levels >= padded[:-2]) & (levels >= padded[2:])
+        keys = np.flatnonzero(is_peak & (levels >= max(self.LEVEL_THRESHOLD, self.RELATIVE_THRESHOLD * loudest)))
+        keys = keys[np.argsort(levels[keys])[::-1]]
+        notes = [MIDI_NAMES[FIRST_KEY_MIDI + int(key)] for key in keys if key < NUM_KEYS]
+        confidence = min(1.0, 1.0 - self.LEVEL_THRESHOLD / loudest)
+        return PitchEstimate(notes, confidence, float(self.constant_q.key_frequencies[keys[0]]))
@@ -0,0 +1,60 @@
+import numpy as np
+
+from src.core.pitch import name_to_midi
+from src.core.sheet_music import Chord, Note, SheetMusic
+
+
+def midi_to_frequency(midi: float, a4_freq: float = 440.0) -> float:
+    return a4_freq * 2 ** ((midi - 69) / 12)
+
+
+def piano_tone(frequencies, duration: float, rate: int = 44100, amplitude: float = 0.1) -> np.ndarray:
+    """A decaying tone with a few harmonics per frequency. Returns float32 samples in [-1, 1]."""
+    t = np.arange(int(duration * rate)) / rate
+    signal = np.zeros_like(t)
+    for freq in frequencies:
+        for harmonic in range(1, 7):
+            if freq * harmonic < rate / 2:
+                signal += np.sin(2 * np.pi * freq * harmonic * t) / harmonic
+    signal *= amplitude * np.exp(-1.5 * t)
+    return signal.astype(np.float32)
+
+
+def render_sheet_music(sheet_music: SheetMusic, tempo_bpm: float = 90.0, rate: int = 44100,
+                       a4_freq: float = 440.0, amplitude: float = 0.1,
+                       lead_in: float = 0.5, tail: float = 1.0) -> tuple[np.ndarray, list[tuple[float, set[str]]]]:
+    """
+    Renders every note of `sheet_music` as a piano_tone lasting its written duration.
+    Returns the float32 samples and, per moment that has notes, its start time
+    in seconds with the set of pitch names starting there.
+    """
+    seconds_per_quarter = 60.0 / tempo_bpm
+    release = int(0.02 * rate)  # Short fade so note ends don't click.
+    timeline = []
+    placed = []
+    end_time = 0.0
+
+    for moment in sheet_music.moments:
+        start_time = lead_in + moment.offset * seconds_per_quarter
+        pitches = set()
+        for event in moment.events:
+            notes = event.notes if isinstance(event, Chord) else [event] if isinstance(event, Note) else []
+            for note in notes:
+                midi = name_to_midi(note.pitch)
+                if midi is None:
+                    continue
+                pitches.add(note.pitch)
+                duration = max(note.duration * seconds_per_quarter, 0.05)
+                placed.append((start_time, midi, duration))
+                end_time = max(end_time, start_time + duration)
+        if pitches:
+            timeline.append((start_time, pitches))
+
+    samples = np.zeros(int((end_time + tail) * rate) + 1, dtype=np.float32)
+    for start_time, midi, duration in placed:
+        tone = piano_tone([midi_to_frequency(midi, a4_freq)], duration, rate, amplitude)
+        fade = min(release, len(tone))
+        tone[len(tone) - fade:] *= np.linspace(1, 0, fade, dtype=np.float32)
+        start = int(start_time * rate)
+        samples[start:start + len(tone)] += tone
+    return samples, timeline
@@ -0,0 +1,88 @@
+import queue
+import numpy as np
+
+from src.core.latency import latency, now
+from src.core.pitch import NUM_KEYS
+from src.input.audio_engine import AudioEngine
+from src.input.chord_detector import ChordDetector, Targets
+from src.input.note_dictionary import load_note_dictionary
+
+
+class TranscriptionDetector(ChordDetector):
+    """
+    Polyphonic detector for single notes and chords alike.
+
+    Each magnitude frame is explained as a non-negative mix of the 88 rows of a
+    precomputed note dictionary. The non-negative least-squares fit uses
+    multiplicative updates on the dictionary's Gram matrix, warm-started from
+    the previous frame's activations, so a handful of 88x88 products per hop is
+    enough. Because a low note's harmonics are part of its own dictionary row,
+    they are not mistaken for higher notes the way raw spectral peaks are.
+
+    The sliding window, confirmation buffer and threading come from ChordDetector;
+    every update additionally carries the per-key activations and the set of
+    notes currently sounding.
+    """
+
+    def __init__(self, update_queue: queue.Queue, audio_engine: AudioEngine | None = None,
+                 analysis_mode: str = 'sliding', hop_size: int = 1024, a4_freq: float = 440.0,
+                 decimation_factor: int = 1, onset_gating: bool = True):
+        super().__init__(update_queue, audio_engine, analysis_mode=analysis_mode, hop_size=hop_size,
+                         a4_freq=a4_freq, decimation_factor=decimation_factor, onset_gating=onset_gating)
+        self.dictionary = load_note_dictionary(self.CHUNK, self.RATE, a4_freq)
+        self.num_dictionary_bins = self.dictionary.shape[1]
+        self.gram = np.asarray(self.dictionary @ self.dictionary.T, dtype=np.float32)
+
+        self.NNLS_ITERATIONS = 8
+        self.ACTIVATION_FLOOR = 1.0  # Multiplicative updates can't revive an exact zero.
+        self.ACTIVATION_THRESHOLD = self.PEAK_HEIGHT
+        self.RELATIVE_THRESHOLD = 0.2  # ...of the strongest key, to ignore fit residue under loud notes.
+
+        self.LATENCY_PREFIX = 'transcription'
+
+        self.activations = np.full(NUM_KEYS, self.ACTIVATION_FLOOR, dtype=np.float32)
+        self.correlation = np.empty(NUM_KEYS, dtype=np.float32)
+        self.update_ratio = np.empty(NUM_KEYS, dtype=np.float32)
+
+    def warm_up(self):
+        super().warm_up()
+        float(self.dictionary.sum())  # Pages the memory-mapped dictionary in.
+
+    def reset_analysis(self):
+        super().reset_analysis()
+        self.activations.fill(self.ACTIVATION_FLOOR)
+
+    def transcribe(self, magnitude_spectrum: np.ndarray) -> np.ndarray:
+        """Updates and returns the per-key activations for one magnitude frame."""
+        np.dot(self.dictionary, magnitude_spectrum[:self.num_dictionary_bins], out=self.correlation)
+        np.maximum(self.activations, self.ACTIVATION_FLOOR, out=self.activations)
+        for _ in range(self.NNLS_ITERATIONS):
+            np.dot(self.gram, self.activations, out=self.update_ratio)
+            self.update_ratio += 1e-6
+            np.divide(self.correlation, self.update_ratio, out=self.update_ratio)
+            self.activations *= self.update_ratio
+        return self.activations
+
+    def verify_silence(self):
+        self.activations.fill(self.ACTIVATION_FLOOR)
+        return super().verify_silence()
+
+    def verify_chord(self, samples: np.ndarray, targets: Targets):
+        if self.frame_processor.rms(samples) < self.SILENCE_RMS:
+            return self.verify_silence()
+
+        started = now()
+        magnitude_spectrum = self.frame_processor.magnitude_spectrum(samples)
+        started = latency.record_since(f'{self.LATENCY_PREFIX}.fft', started)
+        activations = self.transcribe(magnitude_spectrum)
+        started = latency.record_since(f'{self.LATENCY_PREFIX}.nnls', started)
+        threshold = max(self.ACTIVATION_THRESHOLD, self.RELATIVE_THRESHOLD * activations.max())
+        np.greater_equal(activations, threshold, out=self.present_keys)
+        result = self.match_targets(targets)
+        latency.record_since(f'{self.LATENCY_PREFIX}.note_mapping', started)
+        return result
+
+    def _analyse_window(self) -> dict:
+        update_data = super()._analyse_window()
+        update_data['activations'] = self.activations.copy()
+        return update_data
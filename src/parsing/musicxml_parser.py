@@ -1,18 +1,54 @@
-import music21
 from collections import defaultdict
 from src.core.sheet_music import SheetMusic, Note, Chord, Rest, Moment, MusicalEvent
+from src.parsing.score_cache import ScoreCache, file_hash
 
 
 class MusicXMLParser:
     """
     Parses a MusicXML file using a robust two-pass strategy to ensure
     correct timing and staff assignment for all notes.
+
+    Given a ScoreCache, a file whose contents were parsed before is read
+    back from the cache, as a CompactScore, without touching music21.
     """
 
-    def parse(self, file_path: str) -> SheetMusic:
+    # Bump whenever parse() would produce a different SheetMusic, so cached scores are re-parsed.
+    VERSION = 1
+
+    def __init__(self, cache: ScoreCache | None = None):
+        self.cache = cache
+
+    @property
+    def cache_key(self) -> str:
+        return f"music21-v{self.VERSION}"
+
+    def parse(self, file_path: str, progress=None) -> SheetMusic:
         """
         Loads and parses a MusicXML file into a SheetMusic object.
+
+        `progress(fraction, moments)`, if given, is called as parsing goes
+        with the fraction of the file read and the moments finished since
+        the last call, by parsers that can report it (see
+        StreamingMusicXMLParser); music21 and the cache report nothing.
         """
+        if self.cache is None:
+            return self.parse_file(file_path, progress)
+        try:
+            content_hash = file_hash(file_path)
+        except OSError as e:
+            print(f"Error reading file: {e}")
+            return SheetMusic()
+        sheet_music = self.cache.get(content_hash, self.cache_key)
+        if sheet_music is None:
+            sheet_music = self.parse_file(file_path, progress)
+            if sheet_music.moments:
+                self.cache.put(content_hash, self.cache_key, sheet_music)
+        return sheet_music
+
+    def parse_file(self, file_path: str, progress=None) -> SheetMusic:
+        """Parses with music21, bypassing the cache. music21 can't report progress."""
+        import music21  # Imported on first parse; a warm cache never loads it.
+
         try:
             score = music21.converter.parse(file_path)
         except Exception as e:
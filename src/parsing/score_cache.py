@@ -0,0 +1,152 @@
+import hashlib
+import os
+import struct
+import numpy as np
+
+from src.core.paths import cache_dir
+from src.core.compact_score import STAVES, CompactScore, as_compact_score
+from src.core.sheet_music import SheetMusic
+
+FORMAT_VERSION = 1
+MAGIC = b'PNRS'
+# Magic, format version, then the number of moments, events, notes and bytes of pitch names.
+HEADER = struct.Struct('<4sHxxIIII')
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of the file's contents, as hex."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def encode_sheet_music(sheet_music: SheetMusic | CompactScore) -> bytes:
+    """
+    Packs a score into flat little-endian arrays: moment offsets, then per
+    event its kind, staff, duration and first note, then per note its pitch
+    (an index into a table of names), staff and duration. These are the
+    columns of a CompactScore, each read back with one np.frombuffer.
+    """
+    score = as_compact_score(sheet_music)
+    names = '\n'.join(score.pitch_names).encode('utf-8')
+    arrays = [
+        score.offsets.astype('<f8'), score.event_starts.astype('<u4'),
+        score.events['duration'].astype('<f8'), score.note_starts.astype('<u4'),
+        score.notes['duration'].astype('<f8'), score.notes['pitch'].astype('<u2'),
+        score.events['kind'], score.events['staff'], score.notes['staff'],
+    ]
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(score.offsets), len(score.events), len(score.notes), len(names))
+    return b''.join([header, *(array.tobytes() for array in arrays), names])
+
+
+def decode_sheet_music(data: bytes) -> CompactScore:
+    """Inverse of encode_sheet_music. Raises ValueError on data it can't read."""
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated score cache entry")
+    magic, version, num_moments, num_events, num_notes, names_size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Not a version {FORMAT_VERSION} score cache entry")
+
+    position = HEADER.size
+
+    def take(dtype: str, count: int) -> np.ndarray:
+        nonlocal position
+        array = np.frombuffer(data, dtype=dtype, count=count, offset=position)
+        position += array.nbytes
+        return array
+
+    try:
+        offsets = take('<f8', num_moments)
+        event_starts = take('<u4', num_moments + 1)
+        event_durations = take('<f8', num_events)
+        note_starts = take('<u4', num_events + 1)
+        note_durations = take('<f8', num_notes)
+        pitches = take('<u2', num_notes)
+        kinds = take('u1', num_events)
+        event_staves = take('u1', num_events)
+        note_staves = take('u1', num_notes)
+    except ValueError as e:
+        raise ValueError("Truncated score cache entry") from e
+    names = data[position:position + names_size].decode('utf-8').split('\n') if names_size else []
+    if len(note_staves) and (int(pitches.max()) >= len(names) or int(note_staves.max()) >= len(STAVES)):
+        raise ValueError("Corrupt score cache entry")
+    return CompactScore(offsets, event_starts, kinds, event_staves, event_durations,
+                        note_starts, pitches, note_staves, note_durations, names)
+
+
+class ScoreCache:
+    """
+    Parsed scores on disk, keyed by the score file's content hash and the
+    parser that read it, so an edited file or a parser change never returns
+    a stale score. Entries are written atomically. A read refreshes the
+    entry's modification time, and once the directory grows past
+    `max_bytes` the least recently used entries are deleted.
+    """
+
+    SUFFIX = '.score'
+
+    def __init__(self, directory: str | None = None, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory or cache_dir('scores')
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def path_for(self, content_hash: str, parser_key: str) -> str:
+        return os.path.join(self.directory, f"{content_hash}_{parser_key}_v{FORMAT_VERSION}{self.SUFFIX}")
+
+    def get(self, content_hash: str, parser_key: str) -> CompactScore | None:
+        path = self.path_for(content_hash, parser_key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            sheet_music = decode_sheet_music(data)
+        except (ValueError, IndexError, UnicodeDecodeError) as e:
+            print(f"Discarding unreadable score cache entry {path}: {e}")
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # Marks the entry as recently used.
+        except OSError:
+            pass
+        return sheet_music
+
+    def put(self, content_hash: str, parser_key: str, sheet_music: SheetMusic | CompactScore):
+        path = self.path_for(content_hash, parser_key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(encode_sheet_music(sheet_music))
+            os.replace(temp_path, path)  # Atomic, so a half-written entry is never read.
+        except OSError as e:
+            print(f"Could not write score cache entry {path}: {e}")
+            self._remove(temp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Deletes the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,211 @@
+"""
+Indexes a directory tree of MusicXML/MXL scores for search.
+
+Each score is parsed once, in a pool of worker processes, which also fills
+the parsed-score cache, so opening any of them later is a cache hit. The
+index keeps a few facts per file (title, composer, key, moment count, pitch
+range, chord density, content hash) in a JSON file under the cache
+directory. Re-running only parses files whose modification time or size
+changed, and of those only the ones whose content hash changed too.
+
+    python -m src.parsing.score_library ~/Scores --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.core.compact_score import as_compact_score
+from src.core.paths import cache_dir
+from src.core.pitch import MIDI_NAMES, mask_to_midi
+from src.parsing.musicxml_parser import MusicXMLParser
+from src.parsing.score_cache import ScoreCache, file_hash
+from src.parsing.streaming_parser import StreamingMusicXMLParser, read_metadata
+
+INDEX_VERSION = 1
+SCORE_EXTENSIONS = ('.mxl', '.musicxml', '.xml')
+PARSERS = {'streaming': StreamingMusicXMLParser, 'music21': MusicXMLParser}
+
+
+def find_scores(root: str) -> list[str]:
+    """Paths, relative to `root`, of every score file under it, sorted."""
+    paths = []
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories if not name.startswith('.')]
+        paths.extend(os.path.relpath(os.path.join(directory, name), root) for name in files
+                     if name.lower().endswith(SCORE_EXTENSIONS) and not name.startswith('.'))
+    return sorted(paths)
+
+
+def describe_score(sheet_music) -> dict:
+    """Moment count, lowest and highest pitch, and the fraction of sounding moments that are chords."""
+    score = as_compact_score(sheet_music)
+    all_keys = 0
+    sounding = chords = 0
+    for mask in score.target_masks:
+        all_keys |= mask
+        if mask:
+            sounding += 1
+            chords += mask.bit_count() > 1
+    midi = mask_to_midi(all_keys)
+    return {
+        'moments': len(score.moments),
+        'lowest': MIDI_NAMES[midi[0]] if midi else None,
+        'highest': MIDI_NAMES[midi[-1]] if midi else None,
+        'chord_density': round(chords / sounding, 3) if sounding else 0.0,
+    }
+
+
+def index_file(path: str, known: dict | None, parser_backend: str, cache_directory: str | None) -> dict:
+    """
+    Indexes one score; runs in a worker process. `known` is the file's previous
+    entry, reused without parsing when the content hash hasn't changed and the
+    cache still holds the score.
+    """
+    parser = PARSERS[parser_backend](cache=ScoreCache(cache_directory))
+    stat = os.stat(path)
+    content_hash = file_hash(path)
+    entry = {'hash': content_hash, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    if known and known['hash'] == content_hash and os.path.exists(parser.cache.path_for(content_hash,
+                                                                                       parser.cache_key)):
+        return {**known, **entry}
+
+    sheet_music = parser.cache.get(content_hash, parser.cache_key)
+    if sheet_music is None:
+        sheet_music = parser.parse_file(path)
+        if sheet_music.moments:
+            parser.cache.put(content_hash, parser.cache_key, sheet_music)
+    metadata = read_metadata(path)
+    entry['title'] = metadata['title'] or os.path.splitext(os.path.basename(path))[0]
+    entry['composer'] = metadata['composer']
+    entry['key'] = metadata['key']
+    entry.update(describe_score(sheet_music))
+    return entry
+
+
+class ScoreLibrary:
+    """
+    The index of one directory of scores. Loading it reads only the index
+    file; update() brings it up to date with the files on disk.
+    """
+
+    def __init__(self, root: str, index_path: str | None = None):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path or self.default_index_path(self.root)
+        self.parser_key = None
+        self.entries = {}  # Path relative to root -> entry.
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get('version') == INDEX_VERSION and index.get('root') == self.root:
+            self.parser_key = index.get('parser')
+            self.entries = index.get('entries', {})
+
+    @staticmethod
+    def default_index_path(root: str) -> str:
+        name = hashlib.sha256(os.path.abspath(root).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(cache_dir('library'), f"{name}.json")
+
+    def path_of(self, relative_path: str) -> str:
+        return os.path.join(self.root, relative_path)
+
+    def update(self, workers: int | None = None, parser_backend: str = 'streaming',
+               cache_directory: str | None = None) -> dict:
+        """
+        Re-indexes new and changed files with `workers` processes (all cores by default),
+        drops removed ones and saves the index. Returns counts of what was done.
+        """
+        parser_key = PARSERS[parser_backend]().cache_key
+        # A different parser would give different scores, so nothing carries over.
+        known_entries = self.entries if parser_key == self.parser_key else {}
+        cache = ScoreCache(cache_directory)
+        entries = {}
+        changed = []
+        found = find_scores(self.root)
+        for relative_path in found:
+            known = known_entries.get(relative_path)
+            try:
+                stat = os.stat(self.path_of(relative_path))
+            except OSError:
+                continue
+            if (known and known['mtime_ns'] == stat.st_mtime_ns and known['size'] == stat.st_size
+                    and os.path.exists(cache.path_for(known['hash'], parser_key))):
+                entries[relative_path] = known
+            else:
+                changed.append((relative_path, known))
+
+        unchanged = len(entries)
+        failed = 0
+        if changed:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(index_file, self.path_of(relative_path), known, parser_backend,
+                                           cache_directory): relative_path for relative_path, known in changed}
+                for done, future in enumerate(as_completed(futures), 1):
+                    relative_path = futures[future]
+                    try:
+                        entries[relative_path] = future.result()
+                    except Exception as e:
+                        print(f"Could not index {relative_path}: {e}")
+                        failed += 1
+                        continue
+                    print(f"[{done}/{len(changed)}] {relative_path}")
+
+        self.entries = dict(sorted(entries.items()))
+        self.parser_key = parser_key
+        self.save()
+        return {'files': len(self.entries), 'indexed': len(changed) - failed, 'unchanged': unchanged,
+                'removed': len(set(known_entries) - set(found)), 'failed': failed}
+
+    def save(self):
+        index = {'version': INDEX_VERSION, 'root': self.root, 'parser': self.parser_key, 'entries': self.entries}
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(temp_path, self.index_path)  # Atomic, like the score cache.
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[str, dict]]:
+        """
+        (relative path, entry) of the readable scores whose title, composer, key
+        or path contains every word of `query`, case-insensitively, by title.
+        """
+        words = query.lower().split()
+        matches = []
+        for relative_path, entry in self.entries.items():
+            if not entry.get('moments'):
+                continue
+            text = ' '.join(filter(None, (entry['title'], entry['composer'], entry['key'], relative_path))).lower()
+            if all(word in text for word in words):
+                matches.append((relative_path, entry))
+        matches.sort(key=lambda match: (match[1]['title'].lower(), match[0]))
+        return matches[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index a directory of MusicXML/MXL scores and warm the score cache.")
+    parser.add_argument('root', help='Directory to scan, recursively.')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per core).')
+    parser.add_argument('--parser', choices=sorted(PARSERS), default='streaming',
+                        help="Parser to index with; use the app's PARSER_BACKEND.")
+    parser.add_argument('--index', help='Index file (default: under the cache directory).')
+    parser.add_argument('--search', help='Search the index instead of updating it.')
+    args = parser.parse_args()
+
+    library = ScoreLibrary(args.root, args.index)
+    if args.search is not None:
+        for relative_path, entry in library.search(args.search):
+            print(f"{entry['title']}  [{entry['key'] or '?'}, {entry['moments']} moments, "
+                  f"{entry['lowest']}-{entry['highest']}]  {relative_path}")
+        return
+    started = time.perf_counter()
+    counts = library.update(workers=args.workers, parser_backend=args.parser)
+    print(f"{counts['files']} scores: {counts['indexed']} indexed, {counts['unchanged']} unchanged, "
+          f"{counts['removed']} removed, {counts['failed']} failed in {time.perf_counter() - started:.1f} s. "
+          f"Index: {library.index_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from src.core.sheet_music import SheetMusic
+
+
+class LoadCancelled(Exception):
+    """Raised from the progress callback to stop a load that has been cancelled."""
+
+
+class ScoreLoad:
+    """
+    A score being parsed on a worker thread; a small cancellable future.
+
+    cancel() is honoured at the parser's next progress report (each measure,
+    for the streaming parser). music21 can't be interrupted, so a cancelled
+    music21 parse runs to the end and its result is dropped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.progress = 0.0
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._result = None
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self, timeout: float | None = None) -> SheetMusic | None:
+        """Waits for the score. None if the load was cancelled or timed out."""
+        if not self._done.wait(timeout):
+            return None
+        return self._result
+
+    def _finish(self, sheet_music: SheetMusic | None):
+        self._result = None if self.cancelled() else sheet_music
+        self._done.set()
+
+
+class ScoreLoader:
+    """
+    Parses scores on a worker thread, so the UI keeps drawing while a big
+    file loads. Starting a load cancels the one in flight.
+
+    on_progress(load, fraction, moments) gets the moments finished since
+    its last call, at most every PROGRESS_INTERVAL seconds (the first batch
+    straight away, so the start of the score can be shown at once), and
+    on_done(load, sheet_music) gets the whole score. Both are called on the
+    worker thread, and never for a cancelled load.
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.current: ScoreLoad | None = None
+        self.PROGRESS_INTERVAL = 0.05
+
+    def load(self, path: str, on_progress=None, on_done=None) -> ScoreLoad:
+        self.cancel()
+        load = ScoreLoad(path)
+        self.current = load
+        threading.Thread(target=self._run, args=(load, on_progress, on_done), name='score-loader',
+                         daemon=True).start()
+        return load
+
+    def cancel(self):
+        if self.current is not None:
+            self.current.cancel()
+            self.current = None
+
+    def _run(self, load: ScoreLoad, on_progress, on_done):
+        pending = []  # Moments parsed but not yet reported.
+        last_report = None
+
+        def progress(fraction, moments):
+            nonlocal last_report
+            if load.cancelled():
+                raise LoadCancelled()
+            load.progress = fraction
+            pending.extend(moments)
+            if on_progress is None or not pending:
+                return
+            if last_report is None or time.perf_counter() - last_report >= self.PROGRESS_INTERVAL:
+                last_report = time.perf_counter()
+                on_progress(load, fraction, pending[:])
+                pending.clear()
+
+        try:
+            sheet_music = self.parser.parse(load.path, progress=progress)
+        except LoadCancelled:
+            sheet_music = None
+        except Exception as e:
+            print(f"Error loading {load.path}: {e}")
+            sheet_music = SheetMusic()
+        load._finish(sheet_music)
+        if not load.cancelled() and on_done is not None:
+            on_done(load, sheet_music)
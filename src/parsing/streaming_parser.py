@@ -0,0 +1,365 @@
+import heapq
+import os
+import zipfile
+import xml.etree.ElementTree as ElementTree
+from collections import defaultdict
+from fractions import Fraction
+
+from src.core.sheet_music import SheetMusic, Note, Chord, Rest, Moment
+from src.parsing.musicxml_parser import MusicXMLParser
+
+ALTER_SIGNS = {-2: '--', -1: '-', 0: '', 1: '#', 2: '##'}
+# A written <accidental> decides the spelling in music21, whatever <alter> says.
+ACCIDENTAL_SIGNS = {'sharp': '#', 'flat': '-', 'natural': '', 'double-sharp': '##', 'sharp-sharp': '##',
+                    'flat-flat': '--', 'double-flat': '--'}
+# Tonic of the major and minor key with each number of sharps (flats negative), from -7 to 7.
+MAJOR_TONICS = ('C-', 'G-', 'D-', 'A-', 'E-', 'B-', 'F', 'C', 'G', 'D', 'A', 'E', 'B', 'F#', 'C#')
+MINOR_TONICS = ('A-', 'E-', 'B-', 'F', 'C', 'G', 'D', 'A', 'E', 'B', 'F#', 'C#', 'G#', 'D#', 'A#')
+
+
+class UnsupportedNotation(Exception):
+    """The file uses notation the streaming parser doesn't read; music21 takes over."""
+
+
+def quarter_length(value: Fraction) -> float | Fraction:
+    """Like music21's opFrac: a float when exact in binary, otherwise a Fraction."""
+    if value.denominator & (value.denominator - 1) == 0:  # A power of two.
+        return float(value)
+    return value
+
+
+def open_score(file_path: str):
+    """
+    Returns (binary stream of the score's XML, its length in bytes), reading
+    the root file out of an .mxl zip if needed.
+    """
+    if not zipfile.is_zipfile(file_path):
+        return open(file_path, 'rb'), os.path.getsize(file_path)
+    archive = zipfile.ZipFile(file_path)
+    root_file = None
+    if 'META-INF/container.xml' in archive.namelist():
+        container = ElementTree.fromstring(archive.read('META-INF/container.xml'))
+        for element in container.iter():
+            if element.tag.rsplit('}', 1)[-1] == 'rootfile' and element.get('full-path'):
+                root_file = element.get('full-path')
+                break
+    if root_file is None:
+        candidates = [name for name in archive.namelist()
+                      if not name.startswith('META-INF/') and name.endswith(('.xml', '.musicxml'))]
+        if not candidates:
+            raise UnsupportedNotation("No MusicXML file in the archive")
+        root_file = candidates[0]
+    return archive.open(root_file), archive.getinfo(root_file).file_size
+
+
+def read_metadata(file_path: str) -> dict:
+    """
+    {'title', 'composer', 'key'} from the start of a MusicXML or .mxl file,
+    without reading its notes. The key is the first key signature, e.g.
+    'E- major'. Fields the file doesn't give, or that can't be read, are None.
+    """
+    metadata = {'title': None, 'composer': None, 'key': None}
+    movement_title = None
+    try:
+        stream, _ = open_score(file_path)
+        with stream:
+            for _, element in ElementTree.iterparse(stream):
+                tag = element.tag
+                text = (element.text or '').strip() or None
+                if tag == 'work-title':
+                    metadata['title'] = metadata['title'] or text
+                elif tag == 'movement-title':
+                    movement_title = movement_title or text
+                elif tag == 'creator' and element.get('type') == 'composer':
+                    metadata['composer'] = metadata['composer'] or text
+                elif tag == 'key' and metadata['key'] is None and element.findtext('fifths'):
+                    fifths = int(element.findtext('fifths'))
+                    minor = element.findtext('mode') == 'minor'
+                    if -7 <= fifths <= 7:
+                        tonic = (MINOR_TONICS if minor else MAJOR_TONICS)[fifths + 7]
+                        metadata['key'] = f"{tonic} {'minor' if minor else 'major'}"
+                elif tag == 'measure':
+                    break  # The header, and the first measure's attributes, have been read.
+    except (UnsupportedNotation, ElementTree.ParseError, zipfile.BadZipFile, KeyError, ValueError, OSError):
+        pass
+    metadata['title'] = metadata['title'] or movement_title
+    return metadata
+
+
+class StreamingMusicXMLParser(MusicXMLParser):
+    """
+    Reads MusicXML and .mxl files in one incremental pass with ElementTree's
+    iterparse, without music21.
+
+    Offsets come from <duration>, <backup> and <forward> as the notes stream
+    past, and each staff takes its type from its first clef, as in
+    MusicXMLParser. Measure lengths follow music21's reading too: an empty
+    measure is a whole-measure rest by its <time>, an overfull one keeps its
+    length only when overfull by a round amount, and in files from Finale
+    each <forward> is a hidden rest. Each measure is dropped from the tree
+    once it has been read, so memory doesn't grow with the file. The result
+    is the same SheetMusic that MusicXMLParser builds.
+
+    Once the last part is being read, every moment before the current
+    measure is final, so a `progress` callback gets the moments as each
+    measure completes. A single-part piano score streams from its first
+    measure; a multi-part one streams from the start of its last part.
+
+    Only the notation the app uses is read: pitched notes, chords, rests,
+    durations, staves and clefs. Anything else that changes notes or timing
+    (grace and cue notes, microtones, unpitched notes, chord symbols, timewise
+    scores, unmetered or composite time signatures) raises
+    UnsupportedNotation, and the file is parsed with music21 instead.
+    """
+
+    VERSION = 2
+
+    @property
+    def cache_key(self) -> str:
+        return f"stream-v{self.VERSION}"
+
+    def parse_file(self, file_path: str, progress=None) -> SheetMusic:
+        try:
+            stream, size = open_score(file_path)
+            with stream:
+                return self.parse_stream(stream, progress, size)
+        except (UnsupportedNotation, ElementTree.ParseError, zipfile.BadZipFile, KeyError, ValueError) as e:
+            print(f"Streaming parser can't read {os.path.basename(file_path)} ({e}); using music21.")
+            return super().parse_file(file_path, progress)
+
+    def parse_stream(self, stream, progress=None, size: int = 0) -> SheetMusic:
+        # offset -> [(part index, staff number, sequence, event)]
+        events_by_offset = defaultdict(list)
+        pending_offsets = []  # Heap of the offsets in events_by_offset.
+        moments = []
+        num_parts = None  # From the part-list; unknown means nothing is final until the end.
+        sequence = 0
+        part_index = -1
+        part = None
+        staff_types = {}  # Staff number -> 'treble' / 'bass', from its first clef.
+        # [staff number, offset, duration, pitch names] per note, chord or rest (no pitches) of the part.
+        part_events = []
+        divisions = 1
+        bar_length = Fraction(4)  # In quarters, from <time>; music21 assumes 4/4 without one.
+        num_staves = 1
+        finale = False  # Written by Finale, whose <forward>s music21 reads as hidden rests.
+        measure_offset = Fraction(0)  # In quarters.
+        position = 0  # Within the measure, in divisions.
+        measure_length = 0
+        measure_notes = []  # part_events entries of the measure's notes and chords.
+        # (part_events entry, whether music21 would stretch it to the whole measure) per rest.
+        measure_rests = []
+        rest_count = 0  # Of <note> rests, not Finale's.
+        marked_rest = False  # A <rest measure="yes"/> of no type, or a whole or breve.
+        measure_voices = set()
+        trailing_rest = None  # part_events entry of a Finale <forward> after the measure's last note.
+        # trailing_rest of the last measure, which music21 drops if it was the part's last.
+        held_rest = None
+        chord_root = None  # part_events entry of the last note, which a <chord/> note joins.
+
+        for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                if tag == 'part':
+                    part = element
+                    part_index += 1
+                    staff_types = {}
+                    part_events = []
+                    bar_length = Fraction(4)
+                    num_staves = 1
+                    measure_offset = Fraction(0)
+                elif tag == 'measure':
+                    if held_rest is not None:
+                        part_events.append(held_rest)  # Not the part's last measure after all.
+                        held_rest = None
+                    position = measure_length = rest_count = 0
+                    measure_notes = []
+                    measure_rests = []
+                    marked_rest = False
+                    measure_voices = set()
+                    trailing_rest = None
+                    chord_root = None
+                elif tag == 'score-timewise':
+                    raise UnsupportedNotation("timewise score")
+                continue
+
+            if tag == 'note':
+                if element.find('grace') is not None or element.find('cue') is not None:
+                    raise UnsupportedNotation("grace or cue note")
+                pitch = element.find('pitch')
+                if pitch is None and element.find('rest') is None:
+                    raise UnsupportedNotation("unpitched note")
+                measure_voices.add((element.findtext('voice') or '').strip())
+                trailing_rest = None
+                if element.find('chord') is not None:
+                    if chord_root is None or pitch is None:
+                        raise UnsupportedNotation("chord without a pitched first note")
+                    chord_root[3].append(self._pitch_name(element))
+                    continue
+                duration = int(element.findtext('duration', 0))
+                offset = measure_offset + Fraction(position, divisions)
+                entry = [int(element.findtext('staff', 1)), offset, Fraction(duration, divisions),
+                         [] if pitch is None else [self._pitch_name(element)]]
+                part_events.append(entry)
+                if pitch is not None:
+                    measure_notes.append(entry)
+                else:
+                    rest_count += 1
+                    note_type = (element.findtext('type') or '').strip()
+                    marked = element.find('rest').get('measure') == 'yes' and note_type in ('', 'whole', 'breve')
+                    marked_rest = marked_rest or marked
+                    if not note_type:
+                        note_type = self._note_type(entry[2])
+                    plain = element.find('dot') is None and element.find('time-modification') is None
+                    measure_rests.append((entry, marked or (note_type in ('whole', 'breve') and plain)))
+                chord_root = entry if pitch is not None else None
+                position += duration
+                measure_length = max(measure_length, position)
+            elif tag == 'harmony':
+                raise UnsupportedNotation("chord symbol")  # music21 reads it as a chord without length.
+            elif tag == 'backup':
+                position -= int(element.findtext('duration'))
+                chord_root = None
+            elif tag == 'forward':
+                duration = int(element.findtext('duration'))
+                measure_voices.add((element.findtext('voice') or '').strip())
+                if finale:
+                    offset = measure_offset + Fraction(position, divisions)
+                    trailing_rest = [int(element.findtext('staff', 1)), offset, Fraction(duration, divisions), []]
+                    part_events.append(trailing_rest)
+                    measure_rests.append((trailing_rest, self._note_type(trailing_rest[2]) in ('whole', 'breve')))
+                    measure_length = max(measure_length, position + duration)
+                # Otherwise it moves later notes along, but like music21 doesn't make the measure longer by itself.
+                position += duration
+                chord_root = None
+            elif tag == 'attributes':
+                divisions_text = element.findtext('divisions')
+                if divisions_text:
+                    if position:
+                        raise UnsupportedNotation("divisions changed inside a measure")
+                    divisions = int(divisions_text)
+                if element.findtext('staves'):
+                    num_staves = int(element.findtext('staves'))
+                time = element.find('time')
+                if time is not None:
+                    if time.find('senza-misura') is not None or len(time.findall('beats')) != 1:
+                        raise UnsupportedNotation("unmetered or composite time signature")
+                    bar_length = Fraction(4 * int(time.findtext('beats')), int(time.findtext('beat-type')))
+                for clef in element.findall('clef'):
+                    number = int(clef.get('number', 1))
+                    if number not in staff_types:
+                        # music21 only reads an F clef on the fourth line as a BassClef.
+                        is_bass = clef.findtext('sign') == 'F' and clef.findtext('line', '4') == '4'
+                        staff_types[number] = 'bass' if is_bass else 'treble'
+            elif tag == 'measure':
+                length = Fraction(measure_length, divisions)
+                measure_voices.discard('')
+                # Chords don't count as notes here, as in music21.
+                lone_rest = rest_count == 1 and not any(len(entry[3]) == 1 for entry in measure_notes)
+                if measure_rests and (marked_rest or lone_rest) and len(measure_voices) <= 1:
+                    # music21 stretches the measure's first rest to the whole measure, if it's a whole
+                    # or breve rest, or marked measure="yes".
+                    entry, stretches = min(measure_rests, key=lambda rest: rest[0][1])
+                    if stretches:
+                        entry[2] = bar_length
+                        length = max(length, entry[1] - measure_offset + bar_length)
+                if not measure_notes and not measure_rests:
+                    # music21 fills an empty measure with a whole-measure rest on each staff.
+                    part_events.extend([staff, measure_offset, bar_length, []] for staff in range(1, num_staves + 1))
+                    length = bar_length
+                elif length > bar_length:
+                    # music21 keeps an overfull measure's length only if it's over by a round amount.
+                    excess = length - bar_length
+                    if excess <= Fraction(1, 2) and (excess * 16).denominator != 1 and (excess * 12).denominator != 1:
+                        length = bar_length
+                measure_offset += length
+                # music21 drops the rest from a part's last measure if nothing starts after it and the
+                # measure has one voice; whether this measure is the last shows when the next one starts.
+                if (trailing_rest is not None and len(measure_voices) <= 1
+                        and all(entry[1] <= trailing_rest[1] for entry in part_events)):
+                    part_events.remove(trailing_rest)
+                    held_rest = trailing_rest
+                part.remove(element)  # Read; dropping it keeps memory flat however long the file.
+                # A staff's events wait for its first clef, which decides its type.
+                if all(entry[0] in staff_types for entry in part_events):
+                    sequence = self._add_events(events_by_offset, pending_offsets, part_index, part_events,
+                                                staff_types, sequence)
+                    part_events = []
+                if progress is None:
+                    continue
+                finished = []
+                if num_parts and part_index == num_parts - 1:
+                    final_offset = measure_offset if held_rest is None else held_rest[1]
+                    finished = self._take_moments(events_by_offset, pending_offsets, before=final_offset)
+                    moments.extend(finished)
+                progress(min(1.0, stream.tell() / size) if size else 0.0, finished)
+            elif tag == 'part':
+                held_rest = None
+                sequence = self._add_events(events_by_offset, pending_offsets, part_index, part_events,
+                                            staff_types, sequence)
+                part_events = []
+                element.clear()
+            elif tag == 'part-list':
+                num_parts = len(element.findall('score-part'))
+            elif tag == 'encoding':
+                software = [(child.text or '').strip() for child in element.findall('software')]
+                software = [text for text in software if text]
+                finale = bool(software) and 'Finale' in software[0]
+
+        finished = self._take_moments(events_by_offset, pending_offsets)
+        moments.extend(finished)
+        if progress is not None:
+            progress(1.0, finished)
+        return SheetMusic(moments=moments)
+
+    def _add_events(self, events_by_offset, pending_offsets, part_index, part_events, staff_types, sequence) -> int:
+        """Files the part's events by offset; returns the next sequence number."""
+        for staff, offset, duration, pitches in part_events:
+            offset = quarter_length(offset)
+            if offset not in events_by_offset:
+                heapq.heappush(pending_offsets, offset)
+            events_by_offset[offset].append(
+                (part_index, staff, sequence, self._event(pitches, quarter_length(duration),
+                                                          staff_types.get(staff, 'treble'))))
+            sequence += 1
+        return sequence
+
+    @staticmethod
+    def _take_moments(events_by_offset, pending_offsets, before=None) -> list[Moment]:
+        """Removes and returns, in order, the moments before `before` (all of them if None)."""
+        moments = []
+        while pending_offsets and (before is None or pending_offsets[0] < before):
+            offset = heapq.heappop(pending_offsets)
+            # Parts in order, each staff in order (music21 splits staves into parts), then file order.
+            ordered = sorted(events_by_offset.pop(offset), key=lambda entry: entry[:3])
+            moments.append(Moment(events=[entry[3] for entry in ordered], offset=offset))
+        return moments
+
+    @staticmethod
+    def _event(pitches: list[str], duration, staff: str):
+        if not pitches:
+            return Rest(duration=duration, staff=staff)
+        if len(pitches) == 1:
+            return Note(pitch=pitches[0], duration=duration, staff=staff)
+        return Chord(notes=[Note(pitch, duration, staff=staff) for pitch in pitches], duration=duration, staff=staff)
+
+    @staticmethod
+    def _note_type(duration: Fraction) -> str | None:
+        """music21's type for an undotted whole or breve duration; None for any other."""
+        return {4: 'whole', 8: 'breve'}.get(duration)
+
+    @staticmethod
+    def _pitch_name(note) -> str:
+        pitch = note.find('pitch')
+        accidental = (note.findtext('accidental') or '').strip()
+        if accidental:
+            if accidental not in ACCIDENTAL_SIGNS:
+                raise UnsupportedNotation(f"accidental {accidental}")
+            sign = ACCIDENTAL_SIGNS[accidental]
+        else:
+            alter_text = pitch.findtext('alter')
+            alter = float(alter_text) if alter_text else 0.0
+            if not alter.is_integer() or int(alter) not in ALTER_SIGNS:
+                raise UnsupportedNotation(f"alter {alter_text}")
+            sign = ALTER_SIGNS[int(alter)]
+        return f"{pitch.findtext('step')}{sign}{pitch.findtext('octave')}"
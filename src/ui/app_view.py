@@ -1,9 +1,11 @@
+import importlib.util
 import os
-import queue
+import threading
 import time
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
+from kivy.uix.dropdown import DropDown
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.textinput import TextInput
 from kivy.uix.scrollview import ScrollView
@@ -11,42 +13,109 @@ from kivy.uix.label import Label
 from kivy.core.window import Window
 from kivy.clock import Clock
 
+from src.core.latency import dump_summary, latency, now
+from src.core.mailbox import Mailbox
+from src.core.paths import cache_dir
+from src.core.pitch import MIDI_NAMES, mask_to_midi, midi_to_mask
 from src.parsing.musicxml_parser import MusicXMLParser
+from src.parsing.score_cache import ScoreCache
+from src.parsing.score_library import ScoreLibrary
+from src.parsing.score_loader import ScoreLoader
+from src.parsing.streaming_parser import StreamingMusicXMLParser
 from src.core.practice_engine import PracticeEngine
+from src.core.sheet_music import SheetMusic
+from src.input.audio_engine import AudioEngine
+from src.input.audio_source import FileSource
 from src.input.mic_listener import MicListener  # <-- We need this again
 from src.input.chord_detector import ChordDetector
+from src.input.detector_process import DetectorProcess
+from src.input.transcription_detector import TranscriptionDetector
 from src.ui.score_renderer import ScoreRenderer
 from src.ui.chord_display import ChordDisplayWidget
+from src.ui.latency_panel import LatencyPanel
 
-try:
-    import tkinter as tk
-    from tkinter import filedialog
-
-    root_tk = tk.Tk()
-    root_tk.withdraw()
-    FILE_BROWSER_AVAILABLE = True
-except ImportError:
-    FILE_BROWSER_AVAILABLE = False
+# tkinter is only imported, and its hidden root window created, when Browse... is first used.
+FILE_BROWSER_AVAILABLE = importlib.util.find_spec('tkinter') is not None
 
 
 class PianoTutorApp(App):
     def build(self):
         self.title = "Piano Tutor"
         Window.clearcolor = (1, 1, 1, 1)
-        self.parser = MusicXMLParser()
+        # 'streaming' reads MusicXML directly and hands anything it can't read to music21;
+        # 'music21' always parses with music21.
+        self.PARSER_BACKEND = 'streaming'
+        parser_class = StreamingMusicXMLParser if self.PARSER_BACKEND == 'streaming' else MusicXMLParser
+        self.parser = parser_class(cache=ScoreCache())
+        # Scores are parsed on a worker thread and drawn as they stream in.
+        self.score_loader = ScoreLoader(self.parser)
+        self.displayed_load = None  # The load whose moments the renderer is showing as they arrive.
+        # A directory of scores indexed with `python -m src.parsing.score_library <dir>`;
+        # typing in the path box then searches it by title, composer or key.
+        self.LIBRARY_DIR = None
+        self.library = ScoreLibrary(self.LIBRARY_DIR) if self.LIBRARY_DIR else None
         self.engine = PracticeEngine()
+        self.tk_root = None  # Hidden root for the file dialog, created on first use.
+
+        # One capture stream for the whole session; both detectors read from it.
+        # Set to a WAV/FLAC path to practise against a recording instead of the microphone.
+        self.AUDIO_FILE = None
+        self.A4_FREQ = 440.0  # Change for pianos tuned away from concert pitch.
+        self.DECIMATION_FACTOR = 1  # 2 or 4 cuts analysis cost on slow machines.
+        self.PITCH_ESTIMATOR = 'yin'  # Single-note estimator; see src/input/pitch_estimators.py.
+        # 'hybrid' swaps between the single-note and chord detectors; 'transcription' keeps one
+        # polyphonic detector running for single notes and chords alike.
+        self.DETECTOR_BACKEND = 'hybrid'
+        # 'step' waits for each moment in turn; 'follow' tracks a play-through of the whole
+        # score, skips and repeats included, with the transcription detector.
+        self.PRACTICE_MODE = 'step'
+        use_transcription = self.DETECTOR_BACKEND == 'transcription' or self.PRACTICE_MODE == 'follow'
+        # Run capture and detection in their own process, so score redraws can't stall them.
+        self.USE_DETECTOR_PROCESS = False
+        self.detector_process = None
+
+        # Detectors overwrite their latest state in a mailbox, and a changed state wakes
+        # check_for_updates on the next frame. Nothing is polled, and nothing queues up.
+        self.detector_trigger = Clock.create_trigger(self.check_for_updates)
+        self.single_note_mailbox = Mailbox(on_change=self.detector_trigger)
+        self.chord_detector_mailbox = Mailbox(key=detector_state_key, hold=is_confirmation,
+                                              on_change=self.detector_trigger)
+        self.transcription_mailbox = Mailbox(key=detector_state_key, hold=is_confirmation,
+                                             on_change=self.detector_trigger)
+
+        if self.USE_DETECTOR_PROCESS:
+            outputs = {'single': self.single_note_mailbox, 'chord': self.chord_detector_mailbox}
+            if use_transcription:
+                outputs['transcription'] = self.transcription_mailbox
+            self.detector_process = DetectorProcess(outputs, a4_freq=self.A4_FREQ,
+                                                    decimation_factor=self.DECIMATION_FACTOR,
+                                                    pitch_estimator=self.PITCH_ESTIMATOR, audio_file=self.AUDIO_FILE)
+            self.audio_engine = self.detector_process.audio_engine
+            self.mic_listener = self.detector_process.detectors['single']
+            self.chord_detector = self.detector_process.detectors['chord']
+            self.transcription_detector = self.detector_process.detectors.get('transcription')
+        else:
+            self.audio_engine = AudioEngine(FileSource(self.AUDIO_FILE, realtime=True) if self.AUDIO_FILE else None)
+
+            self.mic_listener = MicListener(self.single_note_mailbox, self.audio_engine, a4_freq=self.A4_FREQ,
+                                            decimation_factor=self.DECIMATION_FACTOR,
+                                            pitch_estimator=self.PITCH_ESTIMATOR)
 
-        # --- NEW: We have two queues and two detectors again ---
-        self.single_note_queue = queue.Queue()
-        self.mic_listener = MicListener(self.single_note_queue)
+            self.chord_detector = ChordDetector(self.chord_detector_mailbox, self.audio_engine, a4_freq=self.A4_FREQ,
+                                                decimation_factor=self.DECIMATION_FACTOR)
 
-        self.chord_detector_queue = queue.Queue()
-        self.chord_detector = ChordDetector(self.chord_detector_queue)
+            self.transcription_detector = None
+            if use_transcription:
+                self.transcription_detector = TranscriptionDetector(self.transcription_mailbox, self.audio_engine,
+                                                                    a4_freq=self.A4_FREQ,
+                                                                    decimation_factor=self.DECIMATION_FACTOR)
         self.active_detector = 'none'
 
         self.show_detector_panel = True
-        self.last_correct_time = 0
+        self.last_correct_time = 0  # On the latency clock (src.core.latency.now).
         self.DETECTOR_COOLDOWN = 0.25
+        # Wakes check_for_updates when the cooldown ends, to pick up whatever arrived during it.
+        self.cooldown_trigger = Clock.create_trigger(self.check_for_updates, self.DETECTOR_COOLDOWN)
 
         # --- UI Setup ---
         root_layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
@@ -54,12 +123,18 @@ class PianoTutorApp(App):
         self.path_input = TextInput(text="assets/sample.mxl", multiline=False)
         load_button = Button(text="Load Score", size_hint_x=0.3);
         load_button.bind(on_press=self.load_score_from_path)
+        self.load_status = Label(text="", size_hint_x=0.2, color=(0, 0, 0, 1))
         top_bar.add_widget(self.path_input)
         if FILE_BROWSER_AVAILABLE:
             browse_button = Button(text="Browse...", size_hint_x=0.2);
             browse_button.bind(on_press=self.browse_for_file)
             top_bar.add_widget(browse_button)
         top_bar.add_widget(load_button)
+        top_bar.add_widget(self.load_status)
+        self.search_results = DropDown()
+        self.search_results.bind(on_select=self.on_search_select)
+        if self.library:
+            self.path_input.bind(text=self.on_path_text)
 
         scroll_container = ScrollView(do_scroll_x=False)
         self.score_renderer = ScoreRenderer(size_hint_y=None)
@@ -69,76 +144,184 @@ class PianoTutorApp(App):
 
         self.bottom_bar = BoxLayout(orientation='horizontal', size_hint_y=None, height=50, spacing=10)
         self.chord_display_widget = ChordDisplayWidget()
+        self.latency_panel = LatencyPanel(on_save=self.save_latency_summary)
 
         root_layout.add_widget(top_bar);
         root_layout.add_widget(scroll_container);
         root_layout.add_widget(self.bottom_bar)
 
-        Clock.schedule_interval(self.check_for_updates, 1.0 / 30.0)
+        Clock.schedule_interval(self.refresh_latency_panel, 1.0)
         return root_layout
 
+    def on_start(self):
+        # Runs on the first frame, once the window is up.
+        Clock.schedule_once(self.start_warm_up, 0)
+
+    def start_warm_up(self, dt):
+        """Warms up FFT plans, scipy.signal and the pitch estimator off the main thread."""
+        threading.Thread(target=self.warm_up_detectors, name='warm-up', daemon=True).start()
+
+    def warm_up_detectors(self):
+        started = now()
+        for detector in (self.mic_listener, self.chord_detector, self.transcription_detector):
+            if detector is not None:
+                detector.warm_up()
+        latency.record_since('startup.warm_up', started)
+
     def on_stop(self):
-        self.mic_listener.stop()
-        self.chord_detector.stop()
+        self.score_loader.cancel()
+        self.stop_all_detectors()
+        self.audio_engine.stop()
+        if self.detector_process:
+            self.detector_process.shutdown()
 
     def check_for_updates(self, dt):
-        """Checks the queue of the currently active detector."""
-        if not self.engine.is_listening or (time.time() - self.last_correct_time < self.DETECTOR_COOLDOWN):
-            return  # Implement cooldown by simply not checking queues
+        """Handles the active detector's latest state. Runs when a mailbox changes or the cooldown ends."""
+        if not self.engine.is_listening or (now() - self.last_correct_time < self.DETECTOR_COOLDOWN):
+            return  # Whatever arrives during the cooldown waits in its mailbox for cooldown_trigger.
 
-        # --- RESTORED: Hybrid logic to check the correct queue ---
+        # --- RESTORED: Hybrid logic to check the correct mailbox ---
         if self.active_detector == 'single':
             self.check_single_note_detector()
         elif self.active_detector == 'chord':
-            self.check_chord_detector()
+            self.check_chord_detector(self.chord_detector_mailbox)
+        elif self.active_detector == 'transcription':
+            self.check_chord_detector(self.transcription_mailbox)
+        elif self.active_detector == 'follow':
+            self.check_score_follower()
 
     def check_single_note_detector(self):
-        try:
-            note_name = self.single_note_queue.get_nowait()
-            was_correct = self.engine.check_single_note(note_name)
-            if was_correct:
-                self.last_correct_time = time.time()
-                self.update_score_and_detector()
-            else:
-                # Update the display panel to show the wrong note
-                if self.chord_display_widget.parent:
-                    target_notes = self.engine.get_current_target_notes()
-                    self.chord_display_widget.update_display(target_notes, {note_name: True}, False, True)
-
-        except queue.Empty:
-            # If nothing is played, ensure the display is up-to-date
+        event = self.single_note_mailbox.take()
+        if event is None:
+            return
+        self.record_detection_latency(event)
+        was_correct = self.engine.check_single_note(event['midi'])
+        if was_correct:
+            self.start_cooldown()
+            self.advance_with_latency(event)
+        else:
+            # Update the display panel to show the wrong note
             if self.chord_display_widget.parent:
                 target_notes = self.engine.get_current_target_notes()
-                self.chord_display_widget.update_display(target_notes, {}, False, True)
-
-    def check_chord_detector(self):
-        try:
-            detector_state = self.chord_detector_queue.get_nowait()
-            target_notes = self.engine.get_current_target_notes()
-
-            # --- FIX for flickering ---
-            # We only update the visual display if the panel is actually visible
-            if self.chord_display_widget.parent:
-                self.chord_display_widget.update_display(
-                    target_notes, detector_state['found_notes'], detector_state['is_correct'], True
-                )
+                self.chord_display_widget.update_display(target_notes, {}, False, True,
+                                                         self.extra_notes(midi_to_mask((event['midi'],))))
+
+    def check_chord_detector(self, mailbox: Mailbox):
+        detector_state = mailbox.take()
+        if detector_state is None:
+            return
+        self.record_detection_latency(detector_state)
+        target_notes = self.engine.get_current_target_notes()
 
-            if detector_state.get('is_correct', False):
-                self.engine.advance_after_chord()
-                self.last_correct_time = time.time()
-                self.update_score_and_detector()
-        except queue.Empty:
-            pass
+        # --- FIX for flickering ---
+        # We only update the visual display if the panel is actually visible
+        if self.chord_display_widget.parent:
+            self.chord_display_widget.update_display(
+                target_notes, detector_state['found_notes'], detector_state['is_correct'], True,
+                self.extra_notes(detector_state.get('present_mask', 0))
+            )
+
+        if detector_state.get('is_correct', False):
+            self.engine.advance_after_chord(detector_state.get('matched_moment'))
+            self.start_cooldown()
+            self.advance_with_latency(detector_state)
+
+    def check_score_follower(self):
+        """Moves the cursor to wherever the follower places the performer. No cooldown is needed."""
+        state = self.transcription_mailbox.take()
+        if state is None:
+            return
+        self.record_detection_latency(state)
+        followed_moment = state.get('followed_moment', self.engine.current_moment_index)
+        if followed_moment != self.engine.current_moment_index:
+            self.engine.set_moment(followed_moment)
+            # Only the display target changes; restarting the follower would lose its alignment.
+            self.advance_with_latency(state, update=self.update_followed_moment)
+        elif self.chord_display_widget.parent:
+            self.chord_display_widget.update_display(
+                self.engine.get_current_target_notes(), state['found_notes'], False, True,
+                self.extra_notes(state.get('present_mask', 0))
+            )
+
+    def extra_notes(self, played_mask: int) -> list[str]:
+        """Names of the keys played that the current moment doesn't ask for."""
+        _, extra = self.engine.compare_keys(played_mask)
+        return [MIDI_NAMES[midi] for midi in mask_to_midi(extra)]
+
+    def update_followed_moment(self):
+        self.update_score_view()
+        target_notes = self.engine.get_current_target_notes()
+        self.transcription_detector.set_target_notes(target_notes)
+        if self.chord_display_widget.parent:
+            self.chord_display_widget.update_display(target_notes, {}, False, True)
+
+    def start_cooldown(self):
+        self.last_correct_time = now()
+        self.cooldown_trigger()
+
+    def record_detection_latency(self, event: dict):
+        """Records how long a detector event waited between the detector and this handler."""
+        timestamps = event.get('timestamps')
+        if not timestamps:
+            return
+        handled_at = now()
+        latency.record('detector.capture_to_queued', timestamps['queued'] - timestamps['captured'])
+        # The wait covers the mailbox (and pipe), the wake-up on the next frame and any
+        # DETECTOR_COOLDOWN. The part spent inside the cooldown is also recorded on its own.
+        latency.record('ui.mailbox_wait', handled_at - timestamps['queued'])
+        cooldown_end = self.last_correct_time + self.DETECTOR_COOLDOWN
+        latency.record('ui.cooldown', max(0.0, min(handled_at, cooldown_end) - timestamps['queued']))
+
+    def advance_with_latency(self, event: dict, update=None):
+        """Moves to the next moment and records the redraw and strike-to-screen latencies."""
+        started = now()
+        (update or self.update_score_and_detector)()
+        latency.record_since('ui.redraw', started)
+        timestamps = event.get('timestamps')
+        if timestamps:
+            def on_frame(dt):
+                # Runs once the frame with the new cursor has been drawn.
+                latency.record_since('ui.next_frame', started)
+                latency.record_since('end_to_end', timestamps['captured'])
+            Clock.schedule_once(on_frame, 0)
+
+    def latency_summary(self) -> dict:
+        """This process's stages, plus the worker's when detection runs in its own process."""
+        summary = dict(latency.summary())
+        if self.detector_process:
+            summary.update(self.detector_process.worker_latency)
+        return summary
+
+    def refresh_latency_panel(self, dt):
+        if self.detector_process:
+            self.detector_process.request_latency_summary()
+        if self.latency_panel.parent:
+            self.latency_panel.update_display(self.latency_summary())
+
+    def save_latency_summary(self):
+        path = os.path.join(cache_dir('latency'), time.strftime('latency-%Y%m%d-%H%M%S.json'))
+        dump_summary(self.latency_summary(), path)
+        print(f"Latency summary saved to {path}")
+        self.latency_panel.update_display(self.latency_summary(), f"Saved to {path}")
+
+    def toggle_latency_panel(self, instance):
+        if instance.state == 'down' and not self.latency_panel.parent:
+            self.root.add_widget(self.latency_panel, index=1)
+            self.latency_panel.update_display(self.latency_summary())
+        elif instance.state != 'down' and self.latency_panel.parent:
+            self.root.remove_widget(self.latency_panel)
 
     def toggle_mic(self, instance):
         if instance.state == 'down':
             instance.text = "Mic ON"
             self.engine.is_listening = True
+            self.audio_engine.start()
             self.update_detector_mode()
         else:
             instance.text = "Mic Off"
             self.engine.is_listening = False
             self.stop_all_detectors()
+            self.audio_engine.stop()
             if self.chord_display_widget.parent:
                 self.chord_display_widget.update_display(set(), {}, False, False)
 
@@ -153,6 +336,10 @@ class PianoTutorApp(App):
 
     def update_detector_mode(self):
         """The core of the hybrid logic. Checks the target and starts the correct detector."""
+        if self.transcription_detector:
+            self.update_transcription_targets()
+            return
+
         self.stop_all_detectors()
 
         target_notes = self.engine.get_current_target_notes()
@@ -162,21 +349,42 @@ class PianoTutorApp(App):
             print("==> HYBRID MODE: Activating SINGLE note detector.")
             self.active_detector = 'single'
             self.mic_listener.start()
+            if self.chord_display_widget.parent:
+                self.chord_display_widget.update_display(target_notes, {}, False, True)
         elif num_notes > 1:
             print(f"==> HYBRID MODE: Activating CHORD detector for {num_notes} notes.")
             self.active_detector = 'chord'
-            self.chord_detector.set_target_notes(target_notes)
+            self.chord_detector.set_target_notes(target_notes, self.engine.get_target_window())
             self.chord_detector.start()
         else:
             print("==> HYBRID MODE: It's a rest. No detector active.")
             self.active_detector = 'none'
 
+    def update_transcription_targets(self):
+        """
+        Retargets the always-on transcription detector. Nothing is stopped or restarted.
+        In follow mode this restarts the follower from the cursor, e.g. after a click on the score.
+        """
+        target_notes = self.engine.get_current_target_notes()
+        self.transcription_mailbox.clear()
+        if self.PRACTICE_MODE == 'follow':
+            self.transcription_detector.set_target_notes(target_notes)
+            self.transcription_detector.follow_score(self.engine.follow_templates, self.engine.current_moment_index)
+            self.active_detector = 'follow'
+        else:
+            self.transcription_detector.set_target_notes(target_notes, self.engine.get_target_window())
+            self.active_detector = 'transcription' if target_notes else 'none'
+        self.transcription_detector.start()
+
     def stop_all_detectors(self):
-        """Stops both detectors and clears their queues."""
+        """Stops every detector and clears their mailboxes. The capture stream stays open."""
         self.mic_listener.stop()
         self.chord_detector.stop()
-        while not self.single_note_queue.empty(): self.single_note_queue.get()
-        while not self.chord_detector_queue.empty(): self.chord_detector_queue.get()
+        if self.transcription_detector:
+            self.transcription_detector.stop()
+        self.single_note_mailbox.clear()
+        self.chord_detector_mailbox.clear()
+        self.transcription_mailbox.clear()
 
     def update_score_and_detector(self):
         """Helper to update the score view and then switch detector mode."""
@@ -186,14 +394,74 @@ class PianoTutorApp(App):
 
     # --- Other methods remain the same ---
     def load_score_from_path(self, instance):
+        """Starts parsing on a worker thread; a load already in flight is cancelled."""
         path = self.path_input.text
         if not os.path.exists(path): return
-        sheet_music = self.parser.parse(path)
-        if not sheet_music or not sheet_music.moments: return
+        self.load_status.text = "Loading..."
+        self.score_loader.load(path, on_progress=self.on_load_progress, on_done=self.on_load_done)
+
+    def on_path_text(self, instance, text: str):
+        """Lists library scores matching what is typed, unless it is already a path."""
+        self.search_results.clear_widgets()
+        if len(text.strip()) < 2 or os.path.exists(text):
+            self.search_results.dismiss()
+            return
+        for relative_path, entry in self.library.search(text, limit=8):
+            result = Button(text=f"{entry['title']} ({entry['key'] or '?'}, {entry['moments']} moments)",
+                            size_hint_y=None, height=32)
+            result.bind(on_release=lambda button, path=self.library.path_of(relative_path):
+                        self.search_results.select(path))
+            self.search_results.add_widget(result)
+        if self.search_results.container.children:
+            if not self.search_results.attach_to:
+                self.search_results.open(self.path_input)
+        else:
+            self.search_results.dismiss()
+
+    def on_search_select(self, instance, path: str):
+        self.path_input.text = path
+        self.load_score_from_path(instance)
+
+    def on_load_progress(self, load, fraction: float, moments: list):
+        # Called on the loader thread; Clock hands the batch to the main thread.
+        Clock.schedule_once(lambda dt: self.show_load_progress(load, fraction, moments))
+
+    def on_load_done(self, load, sheet_music: SheetMusic):
+        Clock.schedule_once(lambda dt: self.show_loaded_score(load, sheet_music))
+
+    def show_load_progress(self, load, fraction: float, moments: list):
+        """Draws the moments parsed so far; the first batch replaces the score on screen."""
+        if load is not self.score_loader.current or load.done():
+            return  # Superseded by another load, or the whole score is about to be shown.
+        self.load_status.text = f"Loading {fraction:.0%}"
+        if self.displayed_load is not load:
+            self.displayed_load = load
+            self.close_score()
+            self.score_renderer.sheet_music = SheetMusic(moments=list(moments))
+        else:
+            self.score_renderer.append_moments(moments)
+
+    def show_loaded_score(self, load, sheet_music: SheetMusic):
+        if load is not self.score_loader.current:
+            return
+        if not sheet_music or not sheet_music.moments:
+            self.load_status.text = "Couldn't load score"
+            return
+        self.load_status.text = ""
         self.engine.load_sheet_music(sheet_music)
         self.update_score_view()
         self.update_ui_controls()
 
+    def close_score(self):
+        """Stops listening and puts the practice controls away while another score loads."""
+        if self.engine.is_listening:
+            self.engine.is_listening = False
+            self.stop_all_detectors()
+            self.audio_engine.stop()
+        self.engine.sheet_music = None
+        self.score_renderer.cursor_index = 0
+        self.bottom_bar.clear_widgets()
+
     def update_ui_controls(self):
         self.bottom_bar.clear_widgets()
         if self.engine.sheet_music:
@@ -207,17 +475,21 @@ class PianoTutorApp(App):
             display_toggle.bind(on_press=self.toggle_display_panel)
             mic_button = ToggleButton(text="Mic Off", group='mic_toggle');
             mic_button.bind(on_press=self.toggle_mic)
+            latency_toggle = ToggleButton(text="Latency", group='latency_toggle')
+            latency_toggle.bind(on_press=self.toggle_latency_panel)
             self.bottom_bar.add_widget(Label());
             self.bottom_bar.add_widget(restart_button);
             self.bottom_bar.add_widget(prev_button);
             self.bottom_bar.add_widget(next_button);
             self.bottom_bar.add_widget(display_toggle);
             self.bottom_bar.add_widget(mic_button);
+            self.bottom_bar.add_widget(latency_toggle);
             self.bottom_bar.add_widget(Label())
             if self.show_detector_panel and not self.chord_display_widget.parent:
                 self.root.add_widget(self.chord_display_widget, index=0)
 
     def on_score_click(self, renderer_instance, moment_index: int):
+        if self.engine.sheet_music is None: return  # Still loading.
         self.engine.set_moment(moment_index)
         self.update_score_and_detector()
 
@@ -234,6 +506,16 @@ class PianoTutorApp(App):
         self.update_score_and_detector()
 
     def browse_for_file(self, instance):
+        import tkinter as tk
+        from tkinter import filedialog
+
+        if self.tk_root is None:
+            try:
+                self.tk_root = tk.Tk()
+            except tk.TclError as e:
+                print(f"File browser unavailable: {e}")
+                return
+            self.tk_root.withdraw()
         file_path = filedialog.askopenfilename(title="Select a MusicXML file", filetypes=(
         ("MusicXML files", "*.musicxml *.mxl *.xml"), ("All files", "*.*")))
         if file_path: self.path_input.text = file_path
@@ -241,4 +523,14 @@ class PianoTutorApp(App):
     def update_score_view(self):
         self.score_renderer.sheet_music = self.engine.sheet_music
         self.score_renderer.cursor_index = self.engine.current_moment_index
-        if self.score_renderer.parent and self.engine.current_moment_index == 0: self.root._trigger_layout()
\ No newline at end of file
+        if self.score_renderer.parent and self.engine.current_moment_index == 0: self.root._trigger_layout()
+
+
+def detector_state_key(state: dict):
+    """What the UI shows of a chord or transcription state; states with the same key look identical."""
+    return (tuple(sorted(state['found_notes'].items())), bool(state['is_correct']),
+            state.get('present_mask', 0), state.get('followed_moment'))
+
+
+def is_confirmation(state: dict) -> bool:
+    return bool(state.get('is_correct'))
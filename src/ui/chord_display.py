@@ -27,8 +27,12 @@ class ChordDisplayWidget(BoxLayout):
         self.bg_rect.pos = self.pos
         self.bg_rect.size = self.size
 
-    def update_display(self, target_notes: set, found_notes: dict, is_correct: bool, is_listening: bool):
-        """Rebuilds the display with the latest detection state."""
+    def update_display(self, target_notes: set, found_notes: dict, is_correct: bool, is_listening: bool,
+                       extra_notes=()):
+        """
+        Rebuilds the display with the latest detection state: the target notes, green once
+        found, then in red any `extra_notes` heard that the moment doesn't ask for.
+        """
         # --- NEW: More informative status logic ---
         if not is_listening:
             self.status_label.text = "Mic is Off"
@@ -45,7 +49,6 @@ class ChordDisplayWidget(BoxLayout):
         if not target_notes:
             # Handle rests gracefully
             self.notes_layout.add_widget(Label(text="Rest", font_size='30sp', color=(0.5, 0.5, 0.5, 1)))
-            return
 
         sorted_target_notes = sorted(list(target_notes))
 
@@ -54,4 +57,7 @@ class ChordDisplayWidget(BoxLayout):
             color = (0.1, 1, 0.1, 1) if is_found else (0.5, 0.5, 0.5, 1)
 
             note_label = Label(text=note, font_size='30sp', bold=True, color=color)
-            self.notes_layout.add_widget(note_label)
\ No newline at end of file
+            self.notes_layout.add_widget(note_label)
+
+        for note in extra_notes:
+            self.notes_layout.add_widget(Label(text=note, font_size='24sp', color=(1, 0.3, 0.3, 1)))
\ No newline at end of file
@@ -0,0 +1,40 @@
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.graphics import Color, Rectangle
+
+from src.core.latency import format_summary
+
+
+class LatencyPanel(BoxLayout):
+    """Shows the per-stage latency percentiles, with a button to save them as JSON."""
+
+    def __init__(self, on_save=None, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.size_hint_y = None
+        self.height = 260
+        self.padding = 10
+
+        with self.canvas.before:
+            Color(0.12, 0.12, 0.12, 0.95)
+            self.bg_rect = Rectangle(size=self.size, pos=self.pos)
+        self.bind(size=self._update_bg, pos=self._update_bg)
+
+        self.table_label = Label(text="No latency data yet.", font_name='RobotoMono-Regular', font_size='12sp',
+                                 halign='left', valign='top', color=(0.9, 0.9, 0.9, 1))
+        self.table_label.bind(size=self.table_label.setter('text_size'))
+        save_button = Button(text="Save to File", size_hint=(None, None), size=(140, 32))
+        if on_save:
+            save_button.bind(on_press=lambda instance: on_save())
+
+        self.add_widget(self.table_label)
+        self.add_widget(save_button)
+
+    def _update_bg(self, *args):
+        self.bg_rect.pos = self.pos
+        self.bg_rect.size = self.size
+
+    def update_display(self, summary: dict, note: str = ""):
+        text = format_summary(summary) if summary else "No latency data yet."
+        self.table_label.text = f"{text}\n{note}" if note else text
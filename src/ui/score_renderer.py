@@ -1,11 +1,11 @@
 import os
-import music21
 from kivy.uix.widget import Widget
-from kivy.graphics import Color, Line, Ellipse, InstructionGroup, Rectangle
+from kivy.graphics import Color, Line, Ellipse, InstructionGroup, Rectangle, PushMatrix, PopMatrix, Translate
 from kivy.core.image import Image as CoreImage
 from kivy.properties import ObjectProperty, NumericProperty, StringProperty
 from kivy.event import EventDispatcher
 
+from src.core.pitch import split_name
 from src.core.sheet_music import SheetMusic, Note, Chord
 
 DIATONIC_PITCH_STEPS = {'C': 0, 'D': 1, 'E': 2, 'F': 3, 'G': 4, 'A': 5, 'B': 6}
@@ -15,20 +15,32 @@ class ScoreRenderer(Widget, EventDispatcher):
     sheet_music = ObjectProperty(None, allownone=True)
     minimum_height = NumericProperty(0)
     STAFF_SEPARATION = 130
+    STAFF_LINE_SPACING = 15
+    NOTE_HEAD_DIAMETER = 14
+    LEFT_MARGIN = 80
+    RIGHT_MARGIN = 30
+    SYSTEM_SPACING = 250
+    CURSOR_WIDTH = 20
     cursor_index = NumericProperty(0)
 
     # --- NEW: Property to hold the wrong note to draw ---
-    # It will be a string like 'C#4'. We bind it to the redraw method.
+    # It will be a string like 'C#4', drawn in red at the cursor.
     wrong_note_to_draw = StringProperty(None, allownone=True)
 
     __events__ = ('on_moment_select',)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.moment_hitboxes = []
-        # --- NEW: Bind the new property to the redraw method ---
-        self.bind(sheet_music=self.draw_score, size=self.draw_score, pos=self.draw_score,
-                  cursor_index=self.draw_score, wrong_note_to_draw=self.draw_score)
+        # (x, system y, width) of each moment drawn, for placing the cursor and hit-testing clicks.
+        self.moment_positions = []
+        # Where the next moment goes: (x, system y, systems drawn). None until something is drawn.
+        self.layout_state = None
+        # The notation is only redrawn when the score or width changes. Moving the cursor or showing
+        # a wrong note just repositions the overlays, whatever the length of the score.
+        # A change of height alone (the score growing as moments are appended) only moves the drawing.
+        self.bind(sheet_music=self.draw_score, width=self.draw_score, pos=self.draw_score,
+                  cursor_index=self.place_overlays, wrong_note_to_draw=self.place_overlays,
+                  height=self.move_to_top)
 
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
         assets_path = os.path.join(base_dir, 'assets')
@@ -37,17 +49,32 @@ class ScoreRenderer(Widget, EventDispatcher):
         self.sharp_texture = CoreImage(os.path.join(assets_path, 'sharp_symbol.png')).texture
         self.flat_texture = CoreImage(os.path.join(assets_path, 'flat_symbol.png')).texture
 
+        # The score is drawn with y measured from the top of the widget, so it stays put as the widget grows.
         self.note_instructions = InstructionGroup()
+        self.cursor_color = Color(0, 0.5, 1, 0)
+        self.cursor_rectangle = Rectangle(size=(self.CURSOR_WIDTH, 0))
+        self.wrong_note_color = Color(1, 0, 0, 0)  # Red and slightly transparent when shown.
+        self.wrong_note_head = Ellipse(size=(self.NOTE_HEAD_DIAMETER, self.NOTE_HEAD_DIAMETER))
+        self.overlay_instructions = InstructionGroup()
+        for instruction in (self.cursor_color, self.cursor_rectangle, self.wrong_note_color, self.wrong_note_head):
+            self.overlay_instructions.add(instruction)
+        self.top_translation = Translate(0, self.height)
+        self.canvas.add(PushMatrix())
+        self.canvas.add(self.top_translation)
         self.canvas.add(self.note_instructions)
+        self.canvas.add(self.overlay_instructions)
+        self.canvas.add(PopMatrix())
 
     def on_moment_select(self, moment_index: int):
         pass
 
     def on_touch_down(self, touch):
         if self.collide_point(*touch.pos):
-            local_pos = self.to_local(*touch.pos)
-            for hitbox, index in self.moment_hitboxes:
-                if hitbox.collide_point(*local_pos):
+            local_x, local_y = self.to_local(*touch.pos)
+            local_y -= self.height
+            for index, (x, system_y, width) in enumerate(self.moment_positions):
+                box_y, box_height = self._moment_box(system_y)
+                if x <= local_x <= x + width and box_y <= local_y <= box_y + box_height:
                     self.dispatch('on_moment_select', index)
                     return True
         return super().on_touch_down(touch)
@@ -79,98 +106,121 @@ class ScoreRenderer(Widget, EventDispatcher):
         system_group.add(Line(points=[10, bass_y_base, 10, treble_y_base + (staff_line_spacing * 4)], width=2))
         return system_group
 
+    def move_to_top(self, *args):
+        self.top_translation.y = self.height
+
+    def _moment_box(self, system_y) -> tuple:
+        """Bottom and height of the band a moment's cursor covers, both staves."""
+        return (system_y - self.STAFF_SEPARATION - self.STAFF_LINE_SPACING * 2,
+                self.STAFF_SEPARATION + self.STAFF_LINE_SPACING * 6)
+
+    def place_overlays(self, *args):
+        """Moves the cursor, and the wrong note if there is one, to the moment at cursor_index."""
+        index = int(self.cursor_index)
+        if not 0 <= index < len(self.moment_positions):
+            self.cursor_color.a = self.wrong_note_color.a = 0  # Not drawn yet, or past the end.
+            return
+        x, system_y, _ = self.moment_positions[index]
+        cursor_y, cursor_height = self._moment_box(system_y)
+        self.cursor_rectangle.pos = (x + self.NOTE_HEAD_DIAMETER / 2 - self.CURSOR_WIDTH / 2, cursor_y)
+        self.cursor_rectangle.size = (self.CURSOR_WIDTH, cursor_height)
+        self.cursor_color.a = 0.5
+
+        # The wrong note is drawn at the same horizontal position as the cursor.
+        pitch = split_name(self.wrong_note_to_draw) if self.wrong_note_to_draw else None
+        if pitch is None:
+            self.wrong_note_color.a = 0
+            return
+        _, _, y = self._note_position(pitch, 'treble', system_y)
+        self.wrong_note_head.pos = (x, y)
+        self.wrong_note_color.a = 0.8
+
+    def append_moments(self, moments):
+        """
+        Adds moments to the end of the score, as a load streams in, drawing
+        only the new ones.
+        """
+        if self.sheet_music is None:
+            self.sheet_music = SheetMusic(moments=list(moments))  # Drawn by the property binding.
+            return
+        first = len(self.sheet_music.moments)
+        self.sheet_music.moments.extend(moments)
+        if self.layout_state is None:
+            self.draw_score()
+        else:
+            self._draw_moments(first)
+
     def draw_score(self, *args):
         self.note_instructions.clear()
-        self.moment_hitboxes.clear()
+        self.moment_positions.clear()
+        self.layout_state = None
 
         if not self.sheet_music or not self.sheet_music.moments or self.width <= 100:
             self.minimum_height = self.height
+            self.place_overlays()
             return
 
-        STAFF_LINE_SPACING = 15
-        NOTE_HEAD_DIAMETER = 14
-        STEP_HEIGHT = STAFF_LINE_SPACING / 2
-        LEFT_MARGIN = 80
-        RIGHT_MARGIN = 30
-        SYSTEM_SPACING = 250
+        self._draw_moments(0)
 
-        current_x = LEFT_MARGIN
-        current_system_y = self.height - 100
-        num_systems = 1
-
-        self.note_instructions.add(self._draw_grand_staff_system(current_system_y, STAFF_LINE_SPACING))
+    def _draw_moments(self, first: int):
+        """Draws the moments from `first` on, carrying on from where the last one was drawn."""
+        if self.layout_state is None:
+            current_x, current_system_y, num_systems = self.LEFT_MARGIN, -100, 1
+            self.note_instructions.add(self._draw_grand_staff_system(current_system_y, self.STAFF_LINE_SPACING))
+        else:
+            current_x, current_system_y, num_systems = self.layout_state
 
-        for i, moment in enumerate(self.sheet_music.moments):
+        for moment in self.sheet_music.moments[first:]:
             first_event = moment.events[0]
             moment_width = first_event.duration * 40 + 25
 
-            if current_x + moment_width > self.width - RIGHT_MARGIN:
-                current_x = LEFT_MARGIN
-                current_system_y -= SYSTEM_SPACING
+            if current_x + moment_width > self.width - self.RIGHT_MARGIN:
+                current_x = self.LEFT_MARGIN
+                current_system_y -= self.SYSTEM_SPACING
                 num_systems += 1
-                self.note_instructions.add(self._draw_grand_staff_system(current_system_y, STAFF_LINE_SPACING))
-
-            cursor_y = current_system_y - self.STAFF_SEPARATION - (STAFF_LINE_SPACING * 2)
-            cursor_height = self.STAFF_SEPARATION + (STAFF_LINE_SPACING * 6)
-
-            hitbox = Widget(pos=(current_x, cursor_y), size=(moment_width, cursor_height))
-            self.moment_hitboxes.append((hitbox, i))
-
-            if i == self.cursor_index:
-                # Draw the blue cursor
-                cursor_width = 20
-                cursor_x = current_x + (NOTE_HEAD_DIAMETER / 2) - (cursor_width / 2)
-                self.note_instructions.add(Color(0, 0.5, 1, 0.5))
-                self.note_instructions.add(Rectangle(pos=(cursor_x, cursor_y), size=(cursor_width, cursor_height)))
-
-                # --- NEW: Draw the red "wrong note" if it exists ---
-                if self.wrong_note_to_draw:
-                    # Create a temporary Note object to pass to our drawing function
-                    temp_note = Note(pitch=self.wrong_note_to_draw, duration=0, staff='treble')
-                    # We draw it at the same horizontal position as the cursor
-                    self._draw_note(temp_note, current_x, current_system_y, STEP_HEIGHT, NOTE_HEAD_DIAMETER,
-                                    is_wrong=True)
-
-            # Draw the actual black notes from the score
+                self.note_instructions.add(self._draw_grand_staff_system(current_system_y, self.STAFF_LINE_SPACING))
+
+            self.moment_positions.append((current_x, current_system_y, moment_width))
+
             for event in moment.events:
                 notes_to_draw = event.notes if isinstance(event, Chord) else [event]
                 for note in notes_to_draw:
                     if isinstance(note, Note):
-                        self._draw_note(note, current_x, current_system_y, STEP_HEIGHT, NOTE_HEAD_DIAMETER)
+                        self._draw_note(note, current_x, current_system_y)
 
             current_x += moment_width
 
-        self.minimum_height = num_systems * SYSTEM_SPACING
-
-    def _draw_note(self, note, x, system_y_base, step_height, diameter, is_wrong=False):
-        try:
-            p = music21.pitch.Pitch(note.pitch)
-        except music21.pitch.PitchException:
-            return
+        self.layout_state = (current_x, current_system_y, num_systems)
+        self.minimum_height = num_systems * self.SYSTEM_SPACING
+        if int(self.cursor_index) >= first:
+            self.place_overlays()
 
-        if note.staff == 'treble':
+    def _note_position(self, pitch: tuple, staff: str, system_y_base) -> tuple:
+        """Bottom of the staff, steps above its bottom line, and y of the note head."""
+        step, _, octave = pitch
+        if staff == 'treble':
             staff_y_base = system_y_base
             ref_step = DIATONIC_PITCH_STEPS['E'] + 4 * 7
         else:
             staff_y_base = system_y_base - self.STAFF_SEPARATION
             ref_step = DIATONIC_PITCH_STEPS['G'] + 2 * 7
 
-        total_steps = DIATONIC_PITCH_STEPS[p.step] + p.octave * 7
-        relative_steps = total_steps - ref_step
-        y = staff_y_base + (relative_steps * step_height) - (diameter / 2)
+        relative_steps = DIATONIC_PITCH_STEPS[step] + octave * 7 - ref_step
+        y = staff_y_base + (relative_steps * self.STAFF_LINE_SPACING / 2) - (self.NOTE_HEAD_DIAMETER / 2)
+        return staff_y_base, relative_steps, y
 
-        # --- NEW: Set color based on whether the note is wrong ---
-        if is_wrong:
-            self.note_instructions.add(Color(1, 0, 0, 0.8))  # Red and slightly transparent
-        else:
-            self.note_instructions.add(Color(0, 0, 0, 1))  # Black
+    def _draw_note(self, note, x, system_y_base):
+        pitch = split_name(note.pitch)
+        if pitch is None:
+            return
+        alteration = pitch[1]
+        staff_y_base, relative_steps, y = self._note_position(pitch, note.staff, system_y_base)
+        diameter = self.NOTE_HEAD_DIAMETER
+        step_height = self.STAFF_LINE_SPACING / 2
 
+        self.note_instructions.add(Color(0, 0, 0, 1))
         self.note_instructions.add(Ellipse(pos=(x, y), size=(diameter, diameter)))
 
-        # Don't draw ledger lines or accidentals for temporary wrong notes
-        if is_wrong:
-            return
-
         # Ledger Line Logic
         if relative_steps > 8:
             for i in range(10, int(relative_steps) + 1, 2):
@@ -182,11 +232,11 @@ class ScoreRenderer(Widget, EventDispatcher):
                 self.note_instructions.add(Line(points=[x - 5, ledger_y, x + diameter + 5, ledger_y], width=1.5))
 
         # Accidental Logic
-        if p.accidental:
+        if alteration:
             accidental_texture = None
-            if p.accidental.name == 'sharp':
+            if alteration == 1:
                 accidental_texture = self.sharp_texture
-            elif p.accidental.name == 'flat':
+            elif alteration == -1:
                 accidental_texture = self.flat_texture
             if accidental_texture:
                 acc_height = diameter * 1.8